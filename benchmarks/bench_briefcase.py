@@ -0,0 +1,58 @@
+"""
+Briefcase benchmark: load time of a large briefcase in each format.
+
+Builds a briefcase with many context items (about `--mb` MiB of content),
+saves it as YAML, JSON and AVSB, and times `load_briefcase()` on each.
+
+Usage:
+    uv run python benchmarks/bench_briefcase.py [--mb 50] [--items 500] [--repeat 3]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from avs_toolkit.briefcase import FORMATS, SUFFIXES, load_briefcase, save_briefcase
+
+def generate_briefcase(megabytes: int, items: int) -> dict:
+    """Builds an assembled story whose context content totals about `megabytes` MiB."""
+    line = "Quarterly figures, risks and decisions for the steering committee. ✓\n"
+    per_item = max(1, (megabytes * 1024 * 1024) // items // len(line.encode("utf-8")))
+    return {
+        "metadata": {"story_id": "VS-BENCH", "provider": "ollama", "assembled_at": "2026-01-01T00:00:00"},
+        "goal": {"as_a": "As a Benchmark", "i_want": "To load large briefcases quickly", "so_that": "Runs start fast."},
+        "instructions": {"execution_steps": [{"step_number": 1, "action": "Summarize", "validation_rule": "Done"}]},
+        "context_manifest": [
+            {"key": f"asset_{i}", "description": f"Generated asset {i}", "content": line * per_item}
+            for i in range(items)
+        ],
+        "product": {"output_path": "outputs"},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=50)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    story = generate_briefcase(args.mb, args.items)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in FORMATS:
+            path = save_briefcase(story, Path(tmp) / f"bench{SUFFIXES[fmt]}", fmt)
+            assert load_briefcase(path) == story
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                load_briefcase(path)
+                timings.append(time.perf_counter() - started)
+            results[fmt] = statistics.median(timings)
+            size = path.stat().st_size / (1024 * 1024)
+            print(f"  {fmt:<5} {size:7.1f} MiB   median load {results[fmt] * 1000:9.1f} ms")
+    for fmt in FORMATS[1:]:
+        print(f"  {fmt} is {results['yaml'] / results[fmt]:.1f}x faster than yaml")
+
+if __name__ == "__main__":
+    main()
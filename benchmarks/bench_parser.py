@@ -0,0 +1,110 @@
+"""
+Parser benchmark: the original multi-pass parse pipeline vs the fast path.
+
+The legacy pipeline mirrors what `avs run` used to do with a Markdown story:
+parse and validate it in `run`, then again in `perform_assembly`, with
+uncompiled regexes and the pure-Python YAML loader. The fast path is a single
+`parse_story()` call whose result is reused by the whole command.
+
+Usage:
+    uv run python benchmarks/bench_parser.py [--steps 2000] [--items 2000] [--repeat 5]
+"""
+import argparse
+import re
+import statistics
+import time
+
+import yaml
+
+from avs_toolkit.models import ValueStory
+from avs_toolkit.parser import normalize_story_data, parse_story
+
+def generate_story(steps: int, items: int) -> str:
+    """Builds a Markdown story with fenced YAML sections and `steps`/`items` entries."""
+    lines = [
+        "# VS-BENCH: Generated Story",
+        "",
+        "```yaml",
+        "metadata:",
+        '  story_id: "VS-BENCH"',
+        '  provider: "ollama"',
+        "```",
+        "",
+        "## Goal",
+        "",
+        "```yaml",
+        "goal:",
+        '  as_a: "As a Benchmark"',
+        '  i_want: "To measure parser throughput on very large stories"',
+        '  so_that: "Regressions are caught early."',
+        "```",
+        "",
+        "## Instructions",
+        "",
+        "```yaml",
+        "instructions:",
+        "  execution_steps:",
+    ]
+    for i in range(1, steps + 1):
+        lines += [
+            f"    - step: {i}",
+            f'      action: "Perform generated action number {i} carefully"',
+            f'      validation_rule: "Action {i} verified"',
+        ]
+    lines += ["```", "", "## Context", "", "```yaml", "context_manifest:"]
+    for i in range(items):
+        lines += [
+            f'  - key: "asset_{i}"',
+            f'    description: "Generated asset {i}"',
+            f'    default_path: "inputs/asset_{i}.md"',
+        ]
+    lines += ["```", ""]
+    return "\n".join(lines)
+
+def legacy_parse(content: str) -> dict:
+    """The original pipeline: uncompiled patterns and the pure-Python SafeLoader."""
+    content = content.replace('\r\n', '\n').replace('\r', '\n')
+    yaml_blocks = re.findall(r'```yaml\s*\n(.*?)\n\s*```', content, re.DOTALL)
+    if yaml_blocks:
+        clean_yaml = "\n".join(yaml_blocks)
+    else:
+        clean_yaml = re.sub(r'```[\s\S]*?```', '', content)
+        clean_yaml = re.sub(r'^(#+.*)$', r'# \1', clean_yaml, flags=re.MULTILINE)
+    return normalize_story_data(clean_yaml, loader=yaml.SafeLoader)
+
+def legacy_pipeline(content: str) -> ValueStory:
+    # `run` parsed + validated, then `perform_assembly` parsed + validated again
+    ValueStory(**legacy_parse(content))
+    return ValueStory(**legacy_parse(content))
+
+def fast_pipeline(content: str) -> ValueStory:
+    return parse_story(content).story
+
+def measure(fn, content: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = generate_story(args.steps, args.items)
+    assert legacy_pipeline(content) == fast_pipeline(content)
+
+    print(f"Story: {args.steps} steps, {args.items} manifest items, {len(content) / 1024:.0f} KiB")
+    results = {}
+    for name, fn in (("legacy", legacy_pipeline), ("fast", fast_pipeline)):
+        timings = measure(fn, content, args.repeat)
+        results[name] = statistics.median(timings)
+        print(f"  {name:<7} median {results[name] * 1000:8.1f} ms   min {min(timings) * 1000:8.1f} ms")
+    print(f"  speedup {results['legacy'] / results['fast']:.1f}x")
+
+if __name__ == "__main__":
+    main()
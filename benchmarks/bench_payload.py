@@ -0,0 +1,66 @@
+"""
+Payload benchmark: peak Python heap while sending a large context to a provider.
+
+The inline pipeline mirrors the original runner: content held as strings in the
+briefcase dict, concatenated into one user payload, then JSON-encoded by httpx.
+The blob pipeline keeps the content in a sidecar blob and streams it from a
+memory map into the request body, one chunk at a time.
+
+Usage:
+    uv run python benchmarks/bench_payload.py [--mb 50] [--items 10]
+"""
+import argparse
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from avs_toolkit.blobs import store_text
+from avs_toolkit.payload import PromptPayload, json_request
+
+def inline_pipeline(contents: list) -> int:
+    user_payload = "CONTEXT ASSETS:\n"
+    for i, content in enumerate(contents):
+        user_payload += f"--- START asset_{i} ---\n{content}\n--- END ---\n"
+    return len(json.dumps({"model": "llama3", "prompt": user_payload}).encode("utf-8"))
+
+async def blob_pipeline(paths: list) -> int:
+    payload = PromptPayload()
+    payload.append("CONTEXT ASSETS:\n")
+    for i, path in enumerate(paths):
+        payload.append(f"--- START asset_{i} ---\n")
+        payload.append_blob(path)
+        payload.append("\n--- END ---\n")
+    body = json_request({"model": "llama3", "prompt": payload})["content"]
+    return sum([len(chunk) async for chunk in body])
+
+def peak(fn, *args) -> tuple:
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak_bytes
+
+def main():
+    import asyncio
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=50)
+    parser.add_argument("--items", type=int, default=10)
+    args = parser.parse_args()
+
+    size = args.mb * 1024 * 1024 // args.items
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / store_text(Path(tmp) / "blobs", chr(97 + i % 26) * size)["path"] for i in range(args.items)]
+
+        sent_blob, blob_peak = peak(lambda: asyncio.run(blob_pipeline(paths)))
+        contents, _ = peak(lambda: [p.read_text() for p in paths])
+        sent_inline, inline_peak = peak(inline_pipeline, contents)
+        assert sent_blob == sent_inline
+
+    print(f"Context: {args.mb} MiB in {args.items} items")
+    print(f"  inline  peak heap {inline_peak / 2**20:8.1f} MiB (excluding the loaded contents)")
+    print(f"  blobs   peak heap {blob_peak / 2**20:8.1f} MiB")
+
+if __name__ == "__main__":
+    main()
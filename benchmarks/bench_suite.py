@@ -0,0 +1,140 @@
+"""
+End-to-end benchmark suite: parse, validate, assemble, run and batch against local stubs.
+
+Every network dependency is replaced by a local stand-in: `stubs.py` serves the
+Ollama, Gemini and Tavily APIs over HTTP with fixed latency, and MCP items call
+`stub_mcp_server.py` over stdio. Stories come from `synthetic.py` at the chosen
+scales. Each scenario is timed `--repeat` times (p50/p95), then run once more under
+tracemalloc for its peak Python heap.
+
+Save results with `--json` and compare a later run against them with `--compare`;
+scenarios whose p50 grew by more than `--threshold` are reported as regressions
+(exit status 1).
+
+Usage:
+    uv run python benchmarks/bench_suite.py [--scales small,medium] [--scenarios parse,run]
+        [--repeat 5] [--latency 0.05] [--json results.json] [--compare baseline.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from stubs import StubConfig, StubServer, stub_env
+from synthetic import SCALES, write_story
+
+SCENARIOS = ("parse", "validate", "assemble", "run", "batch")
+BATCH_STORIES = 4
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+def scenario_calls(scale_name: str, workdir: Path) -> Dict[str, Callable[[], object]]:
+    """Builds one zero-argument callable per scenario, with its inputs prepared up front."""
+    # Imported here so the stub environment is in place before any module reads it
+    from avs_toolkit.batch import run_batch
+    from avs_toolkit.main import assemble_story, load_story, run_async
+    from avs_toolkit.parser import parse_story
+    from avs_toolkit.runner import run_story
+
+    scale = SCALES[scale_name]
+    story_path = write_story(workdir, f"VS-{scale_name.upper()}", scale)
+    content = story_path.read_text()
+    batch_paths = [str(write_story(workdir, f"VS-{scale_name.upper()}-B{n}", scale)) for n in range(BATCH_STORIES)]
+
+    briefcase, assembled = run_async(assemble_story(str(story_path), cache_mode="refresh"))
+    assembled_data = assembled.model_dump()
+
+    return {
+        "parse": lambda: parse_story(content),
+        "validate": lambda: run_async(load_story(str(story_path))),
+        "assemble": lambda: run_async(assemble_story(str(story_path), cache_mode="refresh")),
+        "run": lambda: run_async(run_story(str(briefcase), model="llama3.1", story=assembled_data)),
+        "batch": lambda: run_async(run_batch(batch_paths, concurrency=BATCH_STORIES, cache_mode="refresh")),
+    }
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "peak_mib": peak / 2**20,
+    }
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Names of scenarios whose p50 grew by more than `threshold` (a fraction) over the baseline."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result["p50_ms"] > before["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.1f} → {result['p50_ms']:.1f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated: {', '.join(SCALES)}.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=StubConfig.latency, help="Stub API latency in seconds.")
+    parser.add_argument("--tokens", type=int, default=StubConfig.tokens, help="Stub answer length in words.")
+    parser.add_argument("--json", type=Path, help="Write the results to this file.")
+    parser.add_argument("--compare", type=Path, help="A previous --json file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative p50 slowdown reported as a regression.")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS) | set(args.scales.split(",")) - set(SCALES)
+    if unknown:
+        parser.error(f"Unknown scale or scenario: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, dict] = {}
+    config = StubConfig(latency=args.latency, tokens=args.tokens)
+    with StubServer(config) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(stub_env(server.url))
+        os.environ["AVS_CACHE_DIR"] = str(Path(tmp) / "cache")
+        os.chdir(tmp)
+        print(f"Stub APIs on {server.url} (latency {args.latency * 1000:.0f} ms, {args.tokens} words per answer)")
+        print(f"{'scenario':<20} {'p50 ms':>10} {'p95 ms':>10} {'peak MiB':>10}")
+        for scale_name in args.scales.split(","):
+            workdir = Path(tmp) / scale_name
+            workdir.mkdir()
+            with contextlib.redirect_stdout(io.StringIO()):
+                calls = scenario_calls(scale_name, workdir)
+            for scenario in scenarios:
+                name = f"{scenario}/{scale_name}"
+                results[name] = measure(calls[scenario], args.repeat)
+                r = results[name]
+                print(f"{name:<20} {r['p50_ms']:>10.1f} {r['p95_ms']:>10.1f} {r['peak_mib']:>10.1f}")
+        print(f"Stub requests: {dict(sorted(server.requests.items()))}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
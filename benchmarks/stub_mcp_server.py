@@ -0,0 +1,51 @@
+"""
+A stdio MCP server for benchmarks: deterministic tools with configurable cost.
+
+Tools:
+  fetch(size, delay)  returns `size` characters of text after `delay` seconds
+  echo(text)          returns its argument
+
+Usage (as configured in a story's mcp_servers):
+    python benchmarks/stub_mcp_server.py [--startup-delay 0.5] [--name stub]
+"""
+import argparse
+import asyncio
+import time
+import warnings
+
+# Keep the benchmark's stderr free of dependency import warnings
+warnings.filterwarnings("ignore")
+
+from mcp.server.fastmcp import FastMCP
+
+LINE = "Stub MCP content for benchmark runs. "
+
+def build_server(name: str) -> FastMCP:
+    server = FastMCP(name, log_level="WARNING")
+
+    @server.tool()
+    async def fetch(size: int = 4096, delay: float = 0.0) -> str:
+        """Returns `size` characters of text after `delay` seconds."""
+        if delay:
+            await asyncio.sleep(delay)
+        return (LINE * (size // len(LINE) + 1))[:size]
+
+    @server.tool()
+    async def echo(text: str) -> str:
+        """Returns its argument."""
+        return text
+
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--startup-delay", type=float, default=0.0, help="Seconds to sleep before serving (a slow npx launch).")
+    parser.add_argument("--name", default="stub")
+    args = parser.parse_args()
+
+    if args.startup_delay:
+        time.sleep(args.startup_delay)
+    build_server(args.name).run("stdio")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Local stand-ins for the Ollama, Gemini and Tavily HTTP APIs.
+
+One threaded HTTP server answers:
+  POST /api/generate                          Ollama (JSON, or NDJSON when "stream": true)
+  POST /v1beta/models/<m>:generateContent     Gemini
+  POST /v1beta/models/<m>:streamGenerateContent?alt=sse
+  POST /v1beta/cachedContents                 Gemini context caches
+  POST /search                                Tavily
+
+Latency, answer length, streaming pace and the share of 429 responses are
+configurable, so runs are repeatable without network access or API keys.
+Point the toolkit at it with `stub_env(url)` (AVS_OLLAMA_URL, AVS_GEMINI_URL, AVS_TAVILY_URL).
+
+Usage (standalone, for manual runs):
+    uv run python benchmarks/stubs.py [--port 8808] [--latency 0.2] [--tokens 200]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+
+WORD = "value "
+
+@dataclass
+class StubConfig:
+    latency: float = 0.05  # seconds before the first byte of an answer
+    tokens: int = 200  # answer length in words
+    chunk_tokens: int = 8  # words per streamed chunk
+    chunk_delay: float = 0.002  # seconds between streamed chunks
+    error_rate: float = 0.0  # share of requests answered with 429
+
+def read_body(handler: BaseHTTPRequestHandler) -> bytes:
+    """Reads a request body sent with Content-Length or chunked transfer encoding."""
+    if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int(handler.rfile.readline().split(b";")[0].strip(), 16)
+            if size == 0:
+                handler.rfile.readline()
+                return bytes(body)
+            body += handler.rfile.read(size)
+            handler.rfile.readline()
+    return handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, document: dict):
+        raw = json.dumps(document).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def send_chunks(self, content_type: str, chunks: Iterator[bytes]):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def pieces(self) -> Iterator[str]:
+        config = self.server.config
+        for start in range(0, config.tokens, config.chunk_tokens):
+            if start:
+                time.sleep(config.chunk_delay)
+            yield WORD * min(config.chunk_tokens, config.tokens - start)
+
+    def do_POST(self):
+        config = self.server.config
+        body = read_body(self)
+        request = json.loads(body or b"{}")
+        self.server.record(self.path, len(body))
+
+        if config.error_rate and random.random() < config.error_rate:
+            self.send_json(429, {"error": "rate limited (stub)"})
+            return
+        time.sleep(config.latency)
+        prompt_tokens = len(body) // 4
+
+        if self.path.startswith("/api/generate"):
+            usage = {"prompt_eval_count": prompt_tokens, "eval_count": config.tokens}
+            if request.get("stream"):
+                lines = (json.dumps({"response": text, "done": False}).encode() + b"\n" for text in self.pieces())
+                done = [json.dumps({"response": "", "done": True, **usage}).encode() + b"\n"]
+                self.send_chunks("application/x-ndjson", (line for part in (lines, done) for line in part))
+            else:
+                self.send_json(200, {"response": "".join(self.pieces()), "done": True, **usage})
+        elif ":streamGenerateContent" in self.path:
+            def events():
+                for text in self.pieces():
+                    yield b"data: " + json.dumps(gemini_answer(text, prompt_tokens, config.tokens)).encode() + b"\n\n"
+            self.send_chunks("text/event-stream", events())
+        elif ":generateContent" in self.path:
+            self.send_json(200, gemini_answer("".join(self.pieces()), prompt_tokens, config.tokens))
+        elif self.path.startswith("/v1beta/cachedContents"):
+            self.send_json(200, {"name": f"cachedContents/stub-{random.getrandbits(32):08x}"})
+        elif self.path.startswith("/search"):
+            self.send_json(200, {"answer": "".join(self.pieces()), "results": []})
+        else:
+            self.send_json(404, {"error": f"no stub for {self.path}"})
+
+def gemini_answer(text: str, prompt_tokens: int, output_tokens: int) -> dict:
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}],
+        "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens},
+    }
+
+class StubServer(ThreadingHTTPServer):
+    """The stub HTTP server, running on a background thread. Counts requests and request bytes per endpoint."""
+    daemon_threads = True
+
+    def __init__(self, config: Optional[StubConfig] = None, port: int = 0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.config = config or StubConfig()
+        self.requests: Dict[str, int] = {}
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, path: str, size: int):
+        endpoint = path.split("?")[0].rsplit(":", 1)[-1] if ":" in path else path.split("?")[0]
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.bytes_received += size
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+def stub_env(url: str) -> Dict[str, str]:
+    """Environment that points every HTTP backend of the toolkit at the stub server."""
+    return {
+        "AVS_OLLAMA_URL": url,
+        "AVS_GEMINI_URL": f"{url}/v1beta",
+        "AVS_TAVILY_URL": url,
+        "GEMINI_API_KEY": "stub-key",
+        "TAVILY_API_KEY": "stub-key",
+        # The stub has no quotas; client-side limits would only measure the limiter
+        "AVS_RATE_LIMITS": "gemini=0,tavily=0",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=float, default=StubConfig.latency)
+    parser.add_argument("--tokens", type=int, default=StubConfig.tokens)
+    parser.add_argument("--chunk-delay", type=float, default=StubConfig.chunk_delay)
+    parser.add_argument("--error-rate", type=float, default=StubConfig.error_rate)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, tokens=args.tokens, chunk_delay=args.chunk_delay, error_rate=args.error_rate)
+    with StubServer(config, args.port) as server:
+        print(f"Stub APIs listening on {server.url}")
+        for key, value in stub_env(server.url).items():
+            print(f"  export {key}={value}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Synthetic Value Stories for benchmarks, at fixed scales.
+
+A scale sets how many execution steps and context items a story has, and how the
+items split between local files, web research and MCP tool calls. `write_story()`
+writes the story and its input files into a directory, ready for assemble/run.
+"""
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import yaml
+
+STUB_MCP_SERVER = Path(__file__).with_name("stub_mcp_server.py")
+FILE_LINE = "Quarterly figures, risks and decisions for the steering committee.\n"
+
+@dataclass(frozen=True)
+class Scale:
+    name: str
+    steps: int
+    files: int
+    research: int
+    mcp: int
+    file_kib: int  # size of each input file
+    mcp_servers: int = 1
+
+SCALES = {
+    "small": Scale("small", steps=3, files=2, research=1, mcp=1, file_kib=4),
+    "medium": Scale("medium", steps=20, files=20, research=8, mcp=8, file_kib=64, mcp_servers=2),
+    "large": Scale("large", steps=200, files=200, research=40, mcp=40, file_kib=256, mcp_servers=4),
+}
+
+def story_data(story_id: str, scale: Scale, provider: str = "ollama", mcp_startup_delay: float = 0.0) -> dict:
+    """The story as a dict; input files are referenced as inputs/<story_id>/asset_<n>.md."""
+    manifest: List[dict] = []
+    for i in range(scale.files):
+        manifest.append({"key": f"file_{i}", "default_path": f"inputs/{story_id}/asset_{i}.md"})
+    for i in range(scale.research):
+        manifest.append({"key": f"research_{i}", "search_query": f"{story_id} market signal {i}", "cache_ttl": 0})
+    for i in range(scale.mcp):
+        manifest.append({
+            "key": f"mcp_{i}",
+            "mcp_tool_name": "fetch",
+            "mcp_server": f"stub_{i % scale.mcp_servers}",
+            "mcp_tool_args": {"size": 2048, "salt": f"{story_id}-{i}"},
+            "cache_ttl": 0,
+        })
+
+    servers = [
+        {
+            "name": f"stub_{n}",
+            "command": sys.executable,
+            "args": [str(STUB_MCP_SERVER), "--name", f"stub_{n}", "--startup-delay", str(mcp_startup_delay)],
+        }
+        for n in range(scale.mcp_servers)
+    ] if scale.mcp else []
+
+    return {
+        "metadata": {"story_id": story_id, "provider": provider, "preferred_model": "llama3.1"},
+        "goal": {
+            "as_a": "As a Benchmark",
+            "i_want": f"To exercise the toolkit at {scale.name} scale",
+            "so_that": "Regressions show up in repeatable numbers.",
+        },
+        "instructions": {
+            "execution_steps": [
+                {"step_number": n, "action": f"Perform generated action number {n} carefully", "validation_rule": f"Action {n} verified"}
+                for n in range(1, scale.steps + 1)
+            ]
+        },
+        "context_manifest": manifest,
+        "mcp_servers": servers,
+        "product": {"output_path": f"outputs/{story_id}"},
+    }
+
+def write_story(directory: Path, story_id: str, scale: Scale, **kwargs) -> Path:
+    """Writes a Markdown story and its input files under `directory`; returns the story path."""
+    data = story_data(story_id, scale, **kwargs)
+    inputs = directory / "inputs" / story_id
+    inputs.mkdir(parents=True, exist_ok=True)
+    content = FILE_LINE * (scale.file_kib * 1024 // len(FILE_LINE) + 1)
+    for i in range(scale.files):
+        (inputs / f"asset_{i}.md").write_text(f"# Asset {i}\n{content}")
+
+    path = directory / f"{story_id}.md"
+    path.write_text(f"# {story_id}: Synthetic Story\n\n```yaml\n{yaml.safe_dump(data, sort_keys=False)}```\n")
+    return path
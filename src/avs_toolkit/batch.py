@@ -0,0 +1,201 @@
+import asyncio
+import glob
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import typer
+import yaml
+from pydantic import BaseModel, Field
+from rich.console import Console
+from rich.table import Table
+
+from .main import assemble_story, load_story
+from .models import AssemblyLimits, ValueStory
+from .runner import run_story
+
+console = Console()
+
+STORY_SUFFIXES = {".md", ".yaml", ".yml"}
+MANIFEST_SUFFIXES = {".txt", ".lst"}
+
+class BatchResult(BaseModel):
+    """Outcome of one story in a batch run."""
+    source: str
+    story_id: Optional[str] = None
+    provider: Optional[str] = None
+    status: str = Field("pending", description="ok, invalid, failed or empty.")
+    briefcase: Optional[str] = None
+    product: Optional[str] = None
+    error: Optional[str] = None
+    assemble_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+class BatchReport(BaseModel):
+    """Machine-readable summary of a batch run."""
+    started_at: str
+    wall_seconds: float
+    totals: Dict[str, int]
+    results: List[BatchResult]
+
+def discover_stories(target: str) -> List[str]:
+    """
+    Expands a batch target into story sources.
+    Accepts a directory (its .md/.yaml files, skipping assembled briefcases),
+    a glob pattern, or a manifest: a .txt list with one path/URL per line, or a
+    YAML file with a 'stories' list. Manifest paths are relative to the manifest.
+    """
+    path = Path(target)
+    if path.is_dir():
+        return [
+            str(p) for p in sorted(path.iterdir())
+            if p.is_file() and p.suffix in STORY_SUFFIXES and "-assembled." not in p.name
+        ]
+
+    if any(ch in target for ch in "*?["):
+        return sorted(p for p in glob.glob(target, recursive=True) if Path(p).is_file())
+
+    if path.is_file():
+        if path.suffix in MANIFEST_SUFFIXES:
+            entries = [line.strip() for line in path.read_text().splitlines()]
+            entries = [e for e in entries if e and not e.startswith("#")]
+        else:
+            data = yaml.safe_load(path.read_text())
+            if not (isinstance(data, dict) and isinstance(data.get("stories"), list)):
+                return [str(path)]
+            entries = [str(e) for e in data["stories"]]
+        return [
+            e if e.startswith(("http://", "https://")) or Path(e).is_absolute() else str(path.parent / e)
+            for e in entries
+        ]
+
+    raise FileNotFoundError(f"No stories found for '{target}'.")
+
+def parse_provider_limits(values: List[str]) -> Dict[str, int]:
+    """Parses repeated 'provider=N' options."""
+    limits = {}
+    for value in values:
+        name, sep, count = value.partition("=")
+        if not sep or not count.isdigit() or int(count) < 1:
+            raise typer.BadParameter(f"Expected provider=N, got '{value}'.")
+        limits[name.strip().lower()] = int(count)
+    return limits
+
+async def run_batch(
+    sources: List[str],
+    concurrency: int = 4,
+    provider_limits: Optional[Dict[str, int]] = None,
+    model: Optional[str] = None,
+    assemble_only: bool = False,
+    limits: Optional[AssemblyLimits] = None,
+    cache_mode: str = "default",
+    response_cache: bool = False,
+) -> List[BatchResult]:
+    """
+    Validates every story, then assembles and runs the valid ones on a bounded worker pool.
+    LLM calls are additionally capped per provider (default 1 for local Ollama, 4 otherwise).
+    With response_cache=True identical LLM requests are replayed from the response cache.
+    Results come back in the order of `sources`.
+    """
+    provider_limits = {"ollama": 1, **(provider_limits or {})}
+    story_slots = asyncio.Semaphore(concurrency)
+    provider_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def provider_slot(provider: str) -> asyncio.Semaphore:
+        if provider not in provider_slots:
+            provider_slots[provider] = asyncio.Semaphore(provider_limits.get(provider, 4))
+        return provider_slots[provider]
+
+    # 1. Parse & validate everything up front
+    results = [BatchResult(source=source) for source in sources]
+    stories = await asyncio.gather(*(load_story(source) for source in sources), return_exceptions=True)
+
+    async def process(result: BatchResult, story: ValueStory):
+        async with story_slots:
+            try:
+                # 2. Assemble (already assembled briefcases are run as-is)
+                started = time.perf_counter()
+                if story.is_assembled:
+                    briefcase, assembled = result.source, story
+                else:
+                    briefcase, assembled = await assemble_story(result.source, limits, cache_mode, story)
+                result.briefcase = str(briefcase)
+                result.assemble_seconds = round(time.perf_counter() - started, 3)
+
+                if assemble_only:
+                    result.status = "ok"
+                    return
+
+                # 3. Run, bounded per provider
+                started = time.perf_counter()
+                async with provider_slot(result.provider):
+                    product = await run_story(
+                        str(briefcase),
+                        model=model or story.metadata.preferred_model or "llama3",
+                        story=assembled.model_dump(),
+                        response_cache=response_cache,
+                    )
+                result.run_seconds = round(time.perf_counter() - started, 3)
+                result.product = str(product) if product else None
+                result.status = "ok" if product else "empty"
+            except Exception as e:
+                result.status = "failed"
+                result.error = str(e) or type(e).__name__
+
+    workers = []
+    for result, story in zip(results, stories):
+        if isinstance(story, BaseException):
+            result.status = "invalid"
+            result.error = str(story) or type(story).__name__
+            continue
+        result.story_id = story.metadata.story_id
+        result.provider = story.metadata.provider.lower()
+        workers.append(process(result, story))
+
+    await asyncio.gather(*workers)
+    return results
+
+def summarize(results: List[BatchResult]) -> Dict[str, int]:
+    totals = {"total": len(results), "ok": 0, "empty": 0, "failed": 0, "invalid": 0}
+    for result in results:
+        totals[result.status] = totals.get(result.status, 0) + 1
+    return totals
+
+def print_summary(results: List[BatchResult], wall_seconds: float):
+    table = Table(title="Batch Summary", show_header=True, header_style="bold magenta")
+    table.add_column("Story", style="cyan")
+    table.add_column("Provider")
+    table.add_column("Status", justify="center")
+    table.add_column("Assemble (s)", justify="right")
+    table.add_column("Run (s)", justify="right")
+    table.add_column("Product / Error")
+
+    styles = {"ok": "green", "empty": "yellow", "failed": "red", "invalid": "red"}
+    for result in results:
+        style = styles.get(result.status, "white")
+        table.add_row(
+            result.story_id or Path(result.source).name,
+            result.provider or "-",
+            f"[{style}]{result.status}[/{style}]",
+            f"{result.assemble_seconds:.2f}",
+            f"{result.run_seconds:.2f}",
+            (result.product or result.briefcase) if result.status == "ok" else (result.error or "")[:80],
+        )
+    console.print(table)
+
+    totals = summarize(results)
+    console.print(
+        f"[bold]{totals['ok']}/{totals['total']} succeeded[/bold] "
+        f"({totals['failed']} failed, {totals['invalid']} invalid, {totals['empty']} empty) in {wall_seconds:.1f}s"
+    )
+
+def write_report(path: Path, results: List[BatchResult], started_at: str, wall_seconds: float):
+    report = BatchReport(
+        started_at=started_at,
+        wall_seconds=round(wall_seconds, 3),
+        totals=summarize(results),
+        results=results,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report.model_dump(), indent=2))
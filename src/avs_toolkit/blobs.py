@@ -0,0 +1,140 @@
+import base64
+import codecs
+import hashlib
+import mimetypes
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import ContentPart
+
+# Context content at or above this size is stored in a sidecar blob next to the briefcase
+BLOB_MIN_BYTES = int(os.getenv("AVS_BLOB_MIN_BYTES", 1024 * 1024))
+CHUNK_BYTES = 1024 * 1024
+
+def should_spill(size: int) -> bool:
+    return BLOB_MIN_BYTES > 0 and size >= BLOB_MIN_BYTES
+
+def blob_dir(briefcase: Path) -> Path:
+    """
+    Sidecar directory of a briefcase: `VS-001-assembled.yaml` -> `VS-001-assembled.yaml.blobs/`.
+    Keyed on the full name, so the yaml, json and avsb briefcases of a story never prune each other's blobs.
+    """
+    return briefcase.with_name(f"{briefcase.name}.blobs")
+
+def _ref(directory: Path, sha256: str, size: int, suffix: str = ".txt") -> Dict[str, Any]:
+    return {"path": f"{directory.name}/{sha256}{suffix}", "size": size, "sha256": sha256}
+
+def _temp_file(directory: Path) -> Tuple[IO[bytes], Path]:
+    """A uniquely named dot file in `directory`, so concurrent writers never share one."""
+    fd, name = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    return os.fdopen(fd, "wb"), Path(name)
+
+def _publish(tmp: Path, target: Path):
+    # Blobs are content-addressed, so an existing target already holds the same bytes
+    if target.exists():
+        tmp.unlink(missing_ok=True)
+    else:
+        os.replace(tmp, target)
+
+def store_text(directory: Path, text: str) -> Dict[str, Any]:
+    """Writes text to a content-addressed blob and returns its reference."""
+    data = text.encode("utf-8")
+    sha256 = hashlib.sha256(data).hexdigest()
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"{sha256}.txt"
+    if not target.exists():
+        dst, tmp = _temp_file(directory)
+        with dst:
+            dst.write(data)
+        _publish(tmp, target)
+    return _ref(directory, sha256, len(data))
+
+def store_bytes(directory: Path, data: bytes, suffix: str = ".bin") -> Dict[str, Any]:
+    """Writes binary data to a content-addressed blob and returns its reference."""
+    sha256 = hashlib.sha256(data).hexdigest()
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"{sha256}{suffix}"
+    if not target.exists():
+        dst, tmp = _temp_file(directory)
+        with dst:
+            dst.write(data)
+        _publish(tmp, target)
+    return _ref(directory, sha256, len(data), suffix)
+
+def store_parts(directory: Path, parts: List[ContentPart]) -> List[ContentPart]:
+    """
+    Moves binary part data, and text large enough to spill, into blobs.
+    Returns the parts with `ref` set in place of their inline content.
+    """
+    stored = []
+    for part in parts:
+        if part.data is not None:
+            data = base64.b64decode(part.data)
+            suffix = mimetypes.guess_extension(part.mime_type or "") or ".bin"
+            part = part.model_copy(update={"data": None, "size": len(data), "ref": store_bytes(directory, data, suffix)})
+        elif part.text is not None and should_spill(part.size):
+            part = part.model_copy(update={"text": None, "ref": store_text(directory, part.text)})
+        stored.append(part)
+    return stored
+
+def store_file(directory: Path, source: Path) -> Dict[str, Any]:
+    """Copies a file into a content-addressed blob in chunks, without reading it into memory."""
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    dst, tmp = _temp_file(directory)
+    with open(source, "rb") as src, dst:
+        for block in iter(lambda: src.read(CHUNK_BYTES), b""):
+            digest.update(block)
+            dst.write(block)
+            size += len(block)
+    sha256 = digest.hexdigest()
+    _publish(tmp, directory / f"{sha256}.txt")
+    return _ref(directory, sha256, size)
+
+def resolve(ref: Dict[str, Any], briefcase: Path) -> Path:
+    return briefcase.parent / ref["path"]
+
+def _char_boundary(mapped: mmap.mmap, offset: int) -> int:
+    """Moves an offset forward past UTF-8 continuation bytes to the next character start."""
+    while offset < len(mapped) and mapped[offset] & 0xC0 == 0x80:
+        offset += 1
+    return offset
+
+def iter_text(path: Path, chunk_bytes: int = CHUNK_BYTES, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields a blob's text (or the [start, end) byte range of it) from a read-only memory map,
+    a chunk at a time. Chunks end on character boundaries, so each one can be encoded on its own.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = _char_boundary(mapped, start)
+            end = len(mapped) if end is None else _char_boundary(mapped, min(end, len(mapped)))
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for offset in range(start, end, chunk_bytes):
+                text = decoder.decode(mapped[offset:min(offset + chunk_bytes, end)])
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+def read_text(path: Path) -> str:
+    return "".join(iter_text(path))
+
+def prune(directory: Path, keep: Iterable[str]):
+    """Removes blobs no longer referenced by the briefcase (and the directory once empty)."""
+    if not directory.is_dir():
+        return
+    keep = set(keep)
+    for blob in directory.iterdir():
+        # Dot files are blobs still being written
+        if blob.is_file() and not blob.name.startswith(".") and blob.stem not in keep:
+            blob.unlink(missing_ok=True)
+    if not any(directory.iterdir()):
+        directory.rmdir()
@@ -0,0 +1,124 @@
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+try:
+    import orjson
+except ImportError:  # Optional C-accelerated JSON codec
+    orjson = None
+
+from .parser import SafeLoader
+
+# libyaml's C emitter when available, the pure-Python one otherwise
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+FORMATS = ("yaml", "json", "avsb")
+SUFFIXES = {"yaml": ".yaml", "json": ".json", "avsb": ".avsb"}
+
+# AVSB container: magic, big-endian u64 header length, JSON header, then the blob region.
+# The header is the story with every context `content` replaced by {"$blob": index};
+# header["blobs"][index] = [offset, length] into the blob region (UTF-8 bytes).
+AVSB_MAGIC = b"AVSB\x01"
+AVSB_LENGTH = struct.Struct(">Q")
+
+def dumps_json(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads_json(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def briefcase_filename(story_id: str, fmt: str = "yaml") -> str:
+    return f"{story_id}-assembled{SUFFIXES[fmt]}"
+
+def detect_format(path: Path) -> str:
+    """Sniffs a briefcase's format from its first bytes (the suffix is only a hint)."""
+    with open(path, "rb") as f:
+        head = f.read(64)
+    if head.startswith(AVSB_MAGIC):
+        return "avsb"
+    if head.lstrip().startswith(b"{"):
+        return "json"
+    return "yaml"
+
+def _encode_avsb(story: Dict[str, Any]) -> bytes:
+    header = dict(story)
+    manifest = []
+    blobs = []
+    chunks = []
+    offset = 0
+    for item in story.get("context_manifest") or []:
+        content = item.get("content")
+        if isinstance(content, str):
+            data = content.encode("utf-8")
+            item = {**item, "content": {"$blob": len(blobs)}}
+            blobs.append([offset, len(data)])
+            chunks.append(data)
+            offset += len(data)
+        manifest.append(item)
+    header["context_manifest"] = manifest
+    header["blobs"] = blobs
+
+    raw_header = dumps_json(header)
+    return b"".join([AVSB_MAGIC, AVSB_LENGTH.pack(len(raw_header)), raw_header, *chunks])
+
+def _decode_avsb(raw: bytes) -> Dict[str, Any]:
+    start = len(AVSB_MAGIC)
+    (header_length,) = AVSB_LENGTH.unpack_from(raw, start)
+    start += AVSB_LENGTH.size
+    header = loads_json(raw[start:start + header_length])
+    region = start + header_length
+    blobs = header.pop("blobs", [])
+
+    view = memoryview(raw)
+    for item in header.get("context_manifest") or []:
+        content = item.get("content")
+        if isinstance(content, dict) and "$blob" in content:
+            offset, length = blobs[content["$blob"]]
+            item["content"] = str(view[region + offset:region + offset + length], "utf-8")
+    return header
+
+def save_briefcase(story: Dict[str, Any], path: Path, fmt: Optional[str] = None) -> Path:
+    """Writes an assembled story. The format defaults to the one implied by the path suffix."""
+    fmt = fmt or next((f for f, suffix in SUFFIXES.items() if path.suffix == suffix), "yaml")
+    if fmt == "yaml":
+        path.write_text(yaml.dump(story, Dumper=SafeDumper, sort_keys=False, allow_unicode=True))
+    elif fmt == "json":
+        path.write_bytes(dumps_json(story))
+    elif fmt == "avsb":
+        path.write_bytes(_encode_avsb(story))
+    else:
+        raise ValueError(f"Unknown briefcase format '{fmt}'. Expected one of {', '.join(FORMATS)}.")
+    return path
+
+def load_briefcase(path: Path) -> Dict[str, Any]:
+    """Reads an assembled story in any supported format (auto-detected)."""
+    path = Path(path)
+    fmt = detect_format(path)
+    if fmt == "avsb":
+        return _decode_avsb(path.read_bytes())
+    if fmt == "json":
+        return loads_json(path.read_bytes())
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+def convert_briefcase(source: Path, fmt: str, destination: Optional[Path] = None) -> Path:
+    """Re-encodes a briefcase in another format, next to the source by default."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown briefcase format '{fmt}'. Expected one of {', '.join(FORMATS)}.")
+    destination = destination or source.with_suffix(SUFFIXES[fmt])
+    story = load_briefcase(source)
+    # Sidecar blob references are relative to the briefcase; keep them valid from the new location
+    if source.parent.resolve() != destination.parent.resolve():
+        for item in story.get("context_manifest") or []:
+            refs = [item.get("content_ref"), *(part.get("ref") for part in item.get("parts") or [])]
+            for ref in filter(None, refs):
+                ref["path"] = Path(os.path.relpath(source.parent / ref["path"], destination.parent)).as_posix()
+    return save_briefcase(story, destination, fmt)
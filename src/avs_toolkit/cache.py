@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_MB = 512
+
+def default_cache_dir() -> Path:
+    """Root of all AVS caches. Override with AVS_CACHE_DIR."""
+    return Path(os.getenv("AVS_CACHE_DIR", Path.home() / ".avs" / "cache"))
+
+def default_cache_ttl() -> int:
+    """Seconds research and MCP results stay fresh when an item sets no cache_ttl. Override with AVS_CACHE_TTL."""
+    return int(os.getenv("AVS_CACHE_TTL", DEFAULT_TTL))
+
+def canonical_hash(payload: Any) -> str:
+    """Stable SHA-256 of a JSON-serializable payload (key order and whitespace do not matter)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class DiskCache:
+    """
+    Size-bounded on-disk key/value store.
+    Each entry is a JSON file carrying its own expiry. File mtimes double as the
+    LRU clock: hits touch the file, and eviction removes the oldest files first.
+    """
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.getenv("AVS_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        )
+        self._size: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Stores a value. A ttl of None keeps it until evicted.
+        A failed write is reported and skipped: the cache never fails its caller.
+        """
+        path = self._path(key)
+        entry = {
+            "created_at": time.time(),
+            "expires_at": time.time() + ttl if ttl is not None else None,
+            "value": value,
+        }
+        data = json.dumps(entry).encode("utf-8")
+
+        # Write-then-rename so concurrent readers never see a partial entry; each
+        # writer has its own temp file, so parallel sets of one key cannot collide
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+            tmp = Path(name)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+            console.print(f"[dim]Cache write skipped ({self.directory.name}): {e}[/dim]")
+            return
+
+        if self._size is None:
+            self._size = self.total_size()
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _entries(self):
+        return list(self.directory.glob("*/*.json")) if self.directory.exists() else []
+
+    def total_size(self) -> int:
+        return sum(p.stat().st_size for p in self._entries())
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits within max_bytes."""
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, p in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
+
+    def clear(self):
+        for p in self._entries():
+            p.unlink(missing_ok=True)
+        self._size = 0
+
+class AssemblyCache:
+    """
+    Content-addressed cache for research and MCP results.
+    Keys hash (source type, query or tool name, canonicalized args, provider),
+    so the same request is served from disk until its TTL expires.
+
+    Modes: 'default' reads and writes, 'refresh' skips reads but stores fresh
+    results, 'offline' only reads and never lets a miss reach the network.
+    """
+    MODES = ("default", "refresh", "offline")
+
+    def __init__(self, mode: str = "default", store: Optional[DiskCache] = None, default_ttl: Optional[int] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'. Expected one of {', '.join(self.MODES)}.")
+        self.mode = mode
+        self.store = store or DiskCache(default_cache_dir() / "assembly")
+        self.default_ttl = default_ttl if default_ttl is not None else default_cache_ttl()
+
+    @staticmethod
+    def key(source: str, name: str, args: Optional[Dict[str, Any]], provider: str) -> str:
+        return canonical_hash({"source": source, "name": name, "args": args or {}, "provider": provider})
+
+    def ttl_for(self, item_ttl: Optional[int]) -> int:
+        return self.default_ttl if item_ttl is None else item_ttl
+
+    def get(self, key: str) -> Optional[str]:
+        if self.mode == "refresh":
+            return None
+        return self.store.get(key)
+
+    def set(self, key: str, value: str, ttl: int):
+        if self.mode == "offline" or ttl <= 0:
+            return
+        self.store.set(key, value, ttl)
@@ -0,0 +1,85 @@
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .cache import canonical_hash, default_cache_ttl
+from .models import ContextManifestItem
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def item_fingerprint(item: ContextManifestItem, source: str, path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Describes the inputs a context item was gathered from:
+    file path/mtime/size/hash, the research query, or the MCP tool and its arguments.
+    """
+    if source == "files":
+        stat = path.stat()
+        return {
+            "source": "files",
+            "path": str(path.resolve()),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha256": file_sha256(path),
+        }
+
+    fingerprint = {"source": source, "fetched_at": time.time()}
+    if source == "research":
+        fingerprint["query_sha256"] = canonical_hash(item.search_query)
+    else:
+        fingerprint["tool"] = item.mcp_tool_name
+        fingerprint["server"] = item.mcp_server
+        fingerprint["args_sha256"] = canonical_hash(item.mcp_tool_args or {})
+    return fingerprint
+
+def is_unchanged(
+    previous: Dict[str, Any],
+    item: ContextManifestItem,
+    source: str,
+    path: Optional[Path] = None,
+    ttl: Optional[int] = None,
+) -> bool:
+    """
+    True if an item's inputs still match a previous fingerprint.
+    Files are compared by mtime and size first and only hashed when those differ.
+    Research/MCP results are only reused while younger than `ttl`, resolved like the
+    assembly cache does (the item's cache_ttl, else AVS_CACHE_TTL); a ttl of 0 never reuses.
+    """
+    if not previous or previous.get("source") != source:
+        return False
+
+    if source == "files":
+        if path is None or not path.is_file() or previous.get("path") != str(path.resolve()):
+            return False
+        stat = path.stat()
+        if previous.get("mtime") == stat.st_mtime and previous.get("size") == stat.st_size:
+            return True
+        return previous.get("size") == stat.st_size and previous.get("sha256") == file_sha256(path)
+
+    if ttl is None:
+        ttl = default_cache_ttl() if item.cache_ttl is None else item.cache_ttl
+    if ttl <= 0 or time.time() - previous.get("fetched_at", 0) > ttl:
+        return False
+    current = item_fingerprint(item, source)
+    keys = ("query_sha256",) if source == "research" else ("tool", "server", "args_sha256")
+    return all(previous.get(k) == current.get(k) for k in keys)
+
+def item_slot(item: ContextManifestItem, index: int) -> str:
+    """Matches items across assemblies by key, falling back to manifest position."""
+    return f"key:{item.key}" if item.key else f"index:{index}"
+
+def previous_items(items: List[ContextManifestItem]) -> Dict[str, ContextManifestItem]:
+    """
+    Indexes the gathered items of an earlier briefcase that carry a fingerprint.
+    Assembly only fingerprints successful gathers, so failed fetches are never reused.
+    """
+    return {
+        item_slot(item, i): item
+        for i, item in enumerate(items)
+        if item.fingerprint and (item.content_ref or item.content is not None)
+    }
@@ -0,0 +1,123 @@
+import asyncio
+import importlib.util
+import os
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Rate limiting and transient server errors; retried with backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_BASE_DELAY = float(os.getenv("AVS_HTTP_RETRY_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.getenv("AVS_HTTP_RETRY_MAX_DELAY", 30))
+
+def retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying: the server's Retry-After if given, else jittered exponential backoff."""
+    retry_after = response.headers.get("retry-after")
+    if isinstance(retry_after, str) and retry_after.strip().isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) * random.uniform(0.5, 1.0)
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install 'httpx[http2]')."""
+    return importlib.util.find_spec("h2") is not None
+
+class HTTPClientManager:
+    """
+    Process-wide pooled HTTP client shared by research helpers, remote story fetches and providers.
+    Keeps connections alive between calls, speaks HTTP/2 when available, and caps
+    concurrent requests per host so one busy API cannot monopolize the pool.
+
+    Tunable via environment variables:
+      AVS_HTTP_TIMEOUT (s, default 30), AVS_HTTP_CONNECT_TIMEOUT (s, default 10),
+      AVS_HTTP_MAX_CONNECTIONS (default 100), AVS_HTTP_MAX_PER_HOST (default 10),
+      AVS_HTTP_RETRIES (retries on 429/5xx, default 2).
+    """
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_per_host: Optional[int] = None,
+        retries: Optional[int] = None,
+    ):
+        self.timeout = timeout or float(os.getenv("AVS_HTTP_TIMEOUT", 30))
+        self.connect_timeout = connect_timeout or float(os.getenv("AVS_HTTP_CONNECT_TIMEOUT", 10))
+        self.max_connections = max_connections or int(os.getenv("AVS_HTTP_MAX_CONNECTIONS", 100))
+        self.max_per_host = max_per_host or int(os.getenv("AVS_HTTP_MAX_PER_HOST", 10))
+        self.retries = int(os.getenv("AVS_HTTP_RETRIES", 2)) if retries is None else retries
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def client(self) -> httpx.AsyncClient:
+        """
+        Returns the shared client, creating it on first use.
+        A client is bound to the event loop it was created on, so a new one is
+        made whenever the CLI starts a fresh loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=http2_available(),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._loop = loop
+            self._host_slots = {}
+        return self._client
+
+    @asynccontextmanager
+    async def host_slot(self, url: str) -> AsyncIterator[None]:
+        """Holds one of the per-host request slots for the duration of a request."""
+        self.client()
+        host = urlsplit(url).netloc
+        slot = self._host_slots.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with slot:
+            yield
+
+    def _should_retry(self, response: httpx.Response, attempt: int) -> bool:
+        return attempt < self.retries and response.status_code in RETRY_STATUSES
+
+    async def _send(self, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Sends a request, retrying 429/5xx responses. The host slot is released while backing off."""
+        for attempt in range(self.retries + 1):
+            async with self.host_slot(url):
+                response = await send()
+            if not self._should_retry(response, attempt):
+                break
+            await asyncio.sleep(retry_delay(response, attempt))
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self._send(url, lambda: self.client().get(url, **kwargs))
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self._send(url, lambda: self.client().post(url, **kwargs))
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Streams a response body while holding a per-host slot. 429/5xx responses are retried before any body is read."""
+        for attempt in range(self.retries + 1):
+            async with self.host_slot(url):
+                async with self.client().stream(method, url, **kwargs) as response:
+                    if not self._should_retry(response, attempt):
+                        yield response
+                        return
+                    delay = retry_delay(response, attempt)
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Closes the shared client if it belongs to the running loop."""
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed and self._loop is asyncio.get_running_loop():
+            await client.aclose()
+        self._loop = None
+        self._host_slots = {}
+
+http_clients = HTTPClientManager()
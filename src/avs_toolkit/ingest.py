@@ -0,0 +1,123 @@
+import codecs
+import glob
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:  # Optional; without it non-UTF-8 text is decoded as cp1252
+    from_bytes = None
+
+# Files larger than this are injected as a head and tail excerpt instead of whole. 0 disables the cap.
+FILE_MAX_BYTES = int(os.getenv("AVS_FILE_MAX_BYTES", 16 * 1024 * 1024))
+# Caps on what one glob or directory item injects; files past either cap are left out. 0 disables a cap.
+EXPAND_MAX_FILES = int(os.getenv("AVS_EXPAND_MAX_FILES", 1000))
+EXPAND_MAX_BYTES = int(os.getenv("AVS_EXPAND_MAX_BYTES", 64 * 1024 * 1024))
+# Bytes sampled to detect a file's encoding (and to spot binary files)
+SAMPLE_BYTES = 64 * 1024
+EXCERPT_MARKER = "\n\n[... {omitted:,} bytes omitted from {name} ...]\n\n"
+GLOB_CHARS = set("*?[")
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+def is_pattern(path: str) -> bool:
+    return any(ch in GLOB_CHARS for ch in path)
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Guesses the encoding of a file from its first bytes: a BOM, then UTF-8 (allowing
+    a character cut off at the end of the sample), then charset_normalizer if installed.
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if from_bytes is not None:
+        match = from_bytes(sample).best()
+        if match is not None:
+            return match.encoding
+    return "cp1252"
+
+def is_binary(sample: bytes) -> bool:
+    """NUL bytes do not occur in text, except in UTF-16/32."""
+    return b"\x00" in sample and not any(sample.startswith(bom) for bom, _ in BOMS)
+
+def read_sample(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(SAMPLE_BYTES)
+
+def stores_verbatim(path: Path) -> bool:
+    """True if a file can be copied to a blob byte for byte: UTF-8 and within the size cap."""
+    if FILE_MAX_BYTES and path.stat().st_size > FILE_MAX_BYTES:
+        return False
+    return detect_encoding(read_sample(path)) == "utf-8"
+
+def read_text_file(path: Path, max_bytes: Optional[int] = None) -> str:
+    """
+    Reads a text file in its detected encoding. Files over `max_bytes` (default
+    FILE_MAX_BYTES) are read as their first and last halves of the cap, with a
+    marker in between, so a huge log never has to be loaded whole.
+    """
+    max_bytes = FILE_MAX_BYTES if max_bytes is None else max_bytes
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        sample = f.read(SAMPLE_BYTES)
+        encoding = detect_encoding(sample)
+        f.seek(0)
+        if not max_bytes or size <= max_bytes:
+            return f.read().decode(encoding, errors="replace")
+        head = f.read(max_bytes // 2)
+        f.seek(size - (max_bytes - len(head)))
+        tail = f.read()
+    marker = EXCERPT_MARKER.format(omitted=size - len(head) - len(tail), name=path.name)
+    # Cut characters at the seams are replaced rather than failing the read
+    return head.decode(encoding, errors="replace") + marker + tail.decode(encoding, errors="replace")
+
+def expand_paths(pattern: str, bases: Iterable[Path]) -> List[Path]:
+    """
+    Files matched by a glob pattern or contained in a directory (recursively, skipping
+    hidden entries), sorted. Tries each base directory in turn; the first with matches wins.
+    """
+    for base in bases:
+        target = base / pattern
+        if is_pattern(pattern):
+            matches = (Path(p) for p in glob.glob(str(target), recursive=True))
+        elif target.is_dir():
+            matches = (
+                p for p in target.rglob("*")
+                if not any(part.startswith(".") for part in p.relative_to(target).parts)
+            )
+        else:
+            continue
+        files = sorted(p for p in matches if p.is_file())
+        if files:
+            return files
+    return []
+
+def limit_paths(paths: List[Path], max_files: Optional[int] = None, max_bytes: Optional[int] = None) -> List[Path]:
+    """
+    The leading files of an expansion that fit EXPAND_MAX_FILES and EXPAND_MAX_BYTES.
+    A file counts with the bytes it injects: at most FILE_MAX_BYTES, the rest is excerpted away.
+    """
+    max_files = EXPAND_MAX_FILES if max_files is None else max_files
+    max_bytes = EXPAND_MAX_BYTES if max_bytes is None else max_bytes
+    kept: List[Path] = []
+    total = 0
+    for path in paths[:max_files] if max_files else paths:
+        size = path.stat().st_size
+        total += min(size, FILE_MAX_BYTES) if FILE_MAX_BYTES else size
+        if max_bytes and total > max_bytes:
+            break
+        kept.append(path)
+    return kept
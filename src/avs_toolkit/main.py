@@ -1,13 +1,13 @@
 import os
 import typer
-import yaml
+import time
 import asyncio
-import httpx
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from pydantic import ValidationError
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
 from rich.table import Table
 from rich.live import Live
@@ -18,29 +18,54 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Internal Imports
-from .parser import parse_markdown_story
-from .models import ValueStory
+from .parser import parse_story
+from .models import AssemblyLimits, ContextManifestItem, ValueStory
 from .runner import run_story
-from .mcp_client import MCPRuntime, execute_mcp_item
+from .providers.gemini import GeminiProvider
+from .mcp_client import MCPRuntime, MCPToolError, execute_mcp_item_parts, render_text
+from .mcp_pool import MCPPool, PoolClient, config_key, connect_pool, spawn_background_pool
+from .cache import AssemblyCache
+from .http_client import http_clients
+from .routing import Backend, route
+from .ratelimit import throttle
+from .tracing import TRACE_FORMATS, current_span, print_profile, span, tracer, write_trace
+from .packing import estimate_tokens
+from .blobs import blob_dir, prune as prune_blobs, resolve as resolve_blob, should_spill, store_file, store_parts, store_text
+from .briefcase import FORMATS, briefcase_filename, convert_briefcase, detect_format, load_briefcase, save_briefcase
+from .ingest import expand_paths, is_binary, limit_paths, read_sample, read_text_file, stores_verbatim
+from .fingerprint import is_unchanged, item_fingerprint, item_slot, previous_items
 from .diagnostics.mcp_doctor import run_diagnostics
 
 app = typer.Typer(help="AVS Toolkit: Orchestrate Agentic Value Streams.")
+pool_app = typer.Typer(help="Manage the persistent MCP server pool shared across assemblies.")
+app.add_typer(pool_app, name="mcp-pool")
+stream_app = typer.Typer(help="Execute Agentic Value Streams: stories whose products feed each other.")
+app.add_typer(stream_app, name="stream")
 console = Console()
 
+def run_async(coro):
+    """Runs a coroutine on a fresh event loop, closing shared HTTP connections afterwards."""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await http_clients.aclose()
+    return asyncio.run(runner())
+
 async def fetch_remote_story(url: str) -> str:
     """Fetches a Value Story from a remote URL (GitHub, etc)."""
     if "github.com" in url and "/blob/" in url:
         url = url.replace("github.com", "raw.githubusercontent.com").replace("/blob/", "/")
         
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        try:
-            with Live(Spinner("dots", text=f"Fetching remote story..."), transient=True):
-                response = await client.get(url, timeout=30.0)
-                response.raise_for_status()
-                return response.text
-        except Exception as e:
-            console.print(f"[red]Error fetching remote story:[/red] {e}")
-            raise typer.Exit(1)
+    try:
+        with Live(Spinner("dots", text=f"Fetching remote story..."), transient=True), span("story.fetch", url=url) as s:
+            response = await http_clients.get(url, timeout=30.0, follow_redirects=True)
+            response.raise_for_status()
+            s.set(bytes_received=len(response.content))
+            return response.text
+    except Exception as e:
+        console.print(f"[red]Error fetching remote story:[/red] {e}")
+        raise typer.Exit(1)
 
 async def get_story_content(path_or_url: str) -> str:
     """Determines if the input is a local file or a URL."""
@@ -53,107 +78,210 @@ async def get_story_content(path_or_url: str) -> str:
         raise typer.Exit(1)
     return path.read_text()
 
+async def load_story(path_or_url: str) -> ValueStory:
+    """
+    Reads and validates a Value Story (Markdown or assembled YAML) from a path or URL.
+    Commands load a story once and hand the result down instead of re-parsing it.
+    JSON and AVSB briefcases are decoded directly by the briefcase serializer.
+    """
+    with span("story.load", source=path_or_url):
+        if not path_or_url.startswith(("http://", "https://")):
+            path = Path(path_or_url)
+            if path.is_file() and detect_format(path) != "yaml":
+                with span("story.parse", format=detect_format(path), bytes_received=path.stat().st_size):
+                    return ValueStory(**load_briefcase(path))
+        content = await get_story_content(path_or_url)
+        # Parsing includes validation against the ValueStory schema
+        with span("story.parse", format="markdown", bytes_received=len(content)):
+            return parse_story(content).story
+
+# Research endpoints; AVS_TAVILY_URL and AVS_GEMINI_URL point them elsewhere (e.g. local stubs)
+TAVILY_URL = "https://api.tavily.com"
+
 async def research_tavily(query: str) -> Optional[str]:
     """Internal helper for Tavily research."""
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key: return None
     
-    url = "https://api.tavily.com/search"
+    url = f"{os.getenv('AVS_TAVILY_URL', TAVILY_URL).rstrip('/')}/search"
     payload = {"api_key": api_key.strip(), "query": query, "include_answer": True}
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(url, json=payload, timeout=30.0)
-            if res.status_code == 200:
-                return res.json().get("answer")
-        except Exception:
-            pass
+    try:
+        await throttle("tavily", api_key.strip())
+        res = await http_clients.post(url, json=payload, timeout=30.0)
+        current_span().set(status_code=res.status_code, bytes_received=len(res.content))
+        if res.status_code == 200:
+            return res.json().get("answer")
+    except Exception:
+        pass
     return None
 
+# Identifies the research backend chain in cache keys; change it when the chain changes
+RESEARCH_PROVIDER = "gemini-2.5-flash+google_search|tavily"
+
 async def research_gemini(query: str) -> Optional[str]:
     """Internal helper for Gemini 2.5 Flash research."""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key: return None
     
     # Restored to use gemini-2.5-flash as per user requirements
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key.strip()}"
+    base_url = os.getenv("AVS_GEMINI_URL", GeminiProvider.base_url).rstrip("/")
+    url = f"{base_url}/models/gemini-2.5-flash:generateContent?key={api_key.strip()}"
     payload = {"contents": [{"parts": [{"text": query}]}], "tools": [{"google_search": {}}]}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(url, json=payload, timeout=30.0)
-            if res.status_code == 200:
-                data = res.json()
-                if 'candidates' in data and data['candidates']:
-                    return data['candidates'][0]['content']['parts'][0]['text']
-        except Exception:
-            pass
+    try:
+        await throttle("gemini", api_key.strip(), estimate_tokens(query))
+        res = await http_clients.post(url, json=payload, timeout=30.0)
+        current_span().set(status_code=res.status_code, bytes_received=len(res.content))
+        if res.status_code == 200:
+            data = res.json()
+            usage = data.get('usageMetadata') or {}
+            current_span().set(input_tokens=usage.get('promptTokenCount'), output_tokens=usage.get('candidatesTokenCount'))
+            if 'candidates' in data and data['candidates']:
+                return data['candidates'][0]['content']['parts'][0]['text']
+    except Exception:
+        pass
     return None
 
+class ResearchError(RuntimeError):
+    """Raised when no research backend returned an answer."""
+
 async def dispatch_research(query: str) -> str:
-    """Resilient Research: Tries Gemini 2.5 first, then falls back to Tavily."""
-    # 1. Try Gemini first
-    result = await research_gemini(query)
-    if result: return result
-    
-    # 2. Fallback to Tavily
-    result = await research_tavily(query)
+    """
+    Resilient Research: Tries Gemini 2.5 first, then falls back to Tavily.
+    A backend that keeps failing is tried last; with AVS_HEDGE=1 a Gemini call slower than
+    its p95 latency is raced against Tavily instead of stalling the assembly.
+    Raises ResearchError when both fail.
+    """
+    result = await route([
+        Backend("research:gemini", lambda: research_gemini(query)),
+        Backend("research:tavily", lambda: research_tavily(query)),
+    ])
     if result: return result
     
-    return "Error: Research failed. Both Gemini and Tavily were unavailable or rate-limited."
+    raise ResearchError("Error: Research failed. Both Gemini and Tavily were unavailable or rate-limited.")
 
-async def perform_assembly(path_or_url: str) -> Path:
-    content = await get_story_content(path_or_url)
-    is_yaml = "assembled_at" in content
-    data = yaml.safe_load(content) if is_yaml else parse_markdown_story(content)
-    
-    try:
-        story = ValueStory(**data)
-    except Exception as e:
-        console.print(f"[red]Governance Failure:[/red] {e}")
-        raise typer.Exit(1)
-    
-    console.print(f"\n[bold blue]Assembling Briefcase for {story.metadata.story_id}...[/bold blue]")
-    
-    mcp_runtime = MCPRuntime(story.mcp_servers) if story.mcp_servers else None
+def context_source(item: ContextManifestItem, has_mcp: bool) -> Optional[str]:
+    """Classifies a manifest item as 'mcp', 'research' or 'files' (None if nothing to gather)."""
+    if item.mcp_tool_name and has_mcp:
+        return "mcp"
+    if item.search_query:
+        return "research"
+    if item.default_path:
+        return "files"
+    return None
 
-    try:
-        for item in story.context_manifest:
-            # 1. MCP Tools
-            if item.mcp_tool_name and mcp_runtime:
-                item.content = await execute_mcp_item(mcp_runtime, item)
-                if "Error" in (item.content or ""):
-                    console.print(f"  [red]✗ MCP Tool failed:[/red] {item.mcp_tool_name}")
-                else:
-                    console.print(f"  [green]✓ MCP Tool complete:[/green] {item.mcp_tool_name}")
-            
-            # 2. Web Research
-            elif item.search_query:
-                item.content = await dispatch_research(item.search_query)
-                if "Error" in (item.content or ""):
-                    console.print(f"  [red]✗ Research failed:[/red] {item.key}")
-                else:
-                    console.print(f"  [green]✓ Research complete:[/green] {item.key}")
-            
-            # 3. Local Files
-            elif item.default_path:
-                p = Path(item.default_path)
-                # Handle relative pathing for stories fetched from specific directories
-                if not p.exists() and not path_or_url.startswith("http"):
-                    p = Path(path_or_url).parent / item.default_path
-                
-                if p.exists() and p.is_file():
-                    item.content = p.read_text()
-                    console.print(f"  [green]✓ Injected file:[/green] {p.name}")
-                else:
-                    console.print(f"  [yellow]⚠ Warning:[/yellow] {item.default_path} not found.")
+def context_cache_key(item: ContextManifestItem, source: str, mcp_runtime: Optional[MCPRuntime]) -> str:
+    """
+    Cache identity of a research or MCP item. For MCP tools the provider is the set of
+    servers that may answer, so lookups never need to launch a server.
+    """
+    if source == "research":
+        return AssemblyCache.key("research", item.search_query, None, RESEARCH_PROVIDER)
 
-    finally:
-        if mcp_runtime: await mcp_runtime.shutdown()
+    configs = mcp_runtime.configs
+    servers = [configs[item.mcp_server]] if item.mcp_server in configs else list(configs.values())
+    provider = ",".join(sorted(config_key(config) for config in servers))
+    return AssemblyCache.key("mcp", item.mcp_tool_name, item.mcp_tool_args, provider)
 
-    story.metadata.assembled_at = datetime.now().isoformat()
-    story.metadata.status = "assembled"
-    
-    # Determine output path based on story configuration
+async def gather_context_item(
+    item: ContextManifestItem,
+    source: str,
+    mcp_runtime: Optional[MCPRuntime],
+    path_or_url: str,
+    cache: Optional[AssemblyCache] = None,
+) -> Tuple[Optional[str], bool]:
+    """
+    Fetches the content of a single manifest item. Returns (content, failed): content is
+    None if nothing was found, and `failed` marks a failed MCP call or research, whose
+    content is then the error message.
+    """
+    # 1. MCP Tools & 2. Web Research (cacheable)
+    if source in ("mcp", "research"):
+        label = item.mcp_tool_name if source == "mcp" else item.key
+        noun = "MCP Tool" if source == "mcp" else "Research"
+
+        ttl = cache.ttl_for(item.cache_ttl) if cache else 0
+        key = context_cache_key(item, source, mcp_runtime) if ttl > 0 else None
+        if key:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                console.print(f"  [green]✓ {noun} cached:[/green] {label}")
+                return cached, False
+        if cache and cache.mode == "offline":
+            console.print(f"  [yellow]⚠ Offline:[/yellow] no cached result for {label}.")
+            return None, False
+
+        failed = False
+        try:
+            if source == "mcp":
+                # Non-text parts are kept on the item; the caller moves their data to blobs
+                parts = await execute_mcp_item_parts(mcp_runtime, item)
+                content = render_text(parts, item.mcp_tool_name)
+                item.parts = [part for part in parts if part.type not in ("text", "resource") or part.text is None] or None
+            else:
+                content = await dispatch_research(item.search_query)
+        except (MCPToolError, ResearchError) as e:
+            content, failed = str(e), True
+
+        if failed:
+            console.print(f"  [red]✗ {noun} failed:[/red] {label}")
+        else:
+            console.print(f"  [green]✓ {noun} complete:[/green] {label}")
+            # Cached entries are text only; results with other parts rely on incremental re-assembly
+            if key and not item.parts:
+                await asyncio.to_thread(cache.set, key, content, ttl)
+        return content, failed
+
+    # 3. Local Files (read on worker threads, so slow disks never block network work)
+    p = resolve_local_path(item, path_or_url)
+    if p.is_file():
+        text = await asyncio.to_thread(read_text_file, p)
+        console.print(f"  [green]✓ Injected file:[/green] {p.name}")
+        return text, False
+
+    # Glob patterns and directories expand to every matching file, read in parallel
+    paths = await asyncio.to_thread(expand_paths, item.default_path, local_bases(path_or_url))
+    kept = await asyncio.to_thread(limit_paths, paths)
+    if len(kept) < len(paths):
+        console.print(
+            f"  [yellow]⚠ Warning:[/yellow] {item.default_path} matches {len(paths)} files; only the first {len(kept)} "
+            "are injected (AVS_EXPAND_MAX_FILES / AVS_EXPAND_MAX_BYTES)."
+        )
+        if not kept:
+            return None, False
+        paths = kept
+    if paths:
+        texts = await asyncio.gather(*(asyncio.to_thread(read_local_text, path) for path in paths))
+        included = [(path, text) for path, text in zip(paths, texts) if text is not None]
+        console.print(f"  [green]✓ Injected {len(included)} files:[/green] {item.default_path}")
+        return "\n\n".join(f"--- FILE {path} ---\n{text}" for path, text in included), False
+
+    console.print(f"  [yellow]⚠ Warning:[/yellow] {item.default_path} not found.")
+    return None, False
+
+def read_local_text(path: Path) -> Optional[str]:
+    """Reads one file of an expanded pattern; binary files are skipped."""
+    if is_binary(read_sample(path)):
+        return None
+    return read_text_file(path)
+
+def local_bases(path_or_url: str) -> List[Path]:
+    """Directories a relative asset path is resolved against: the working directory, then the story's."""
+    bases = [Path(".")]
+    if not path_or_url.startswith("http"):
+        bases.append(Path(path_or_url).parent)
+    return bases
+
+def resolve_local_path(item: ContextManifestItem, path_or_url: str) -> Path:
+    """Finds a local asset relative to the working directory, then to the story itself."""
+    p = Path(item.default_path)
+    # Handle relative pathing for stories fetched from specific directories
+    if not p.exists() and not path_or_url.startswith("http"):
+        p = Path(path_or_url).parent / item.default_path
+    return p
+
+def briefcase_path(story: ValueStory, fmt: str = "yaml") -> Path:
+    """Determines where a story's briefcase is written, creating the directory."""
     target_dir = Path.cwd()
     if story.product and story.product.output_path:
         specified_path = Path(story.product.output_path)
@@ -165,12 +293,194 @@ async def perform_assembly(path_or_url: str) -> Path:
             
         target_dir.mkdir(parents=True, exist_ok=True)
 
-    output_path = target_dir / f"{story.metadata.story_id}-assembled.yaml"
-    output_path.write_text(yaml.dump(story.model_dump(), sort_keys=False))
+    return target_dir / briefcase_filename(story.metadata.story_id, fmt)
+
+def load_previous_briefcase(output_path: Path) -> Dict[str, ContextManifestItem]:
+    """Reads the gathered items of an existing briefcase, or nothing if it is missing or unreadable."""
+    if not output_path.exists():
+        return {}
+    try:
+        return previous_items(ValueStory(**load_briefcase(output_path)).context_manifest)
+    except Exception:
+        return {}
+
+async def mcp_servers_to_prewarm(
+    story: ValueStory,
+    mcp_runtime: MCPRuntime,
+    previous: Dict[str, ContextManifestItem],
+    cache: AssemblyCache,
+) -> List[str]:
+    """
+    Servers that this assembly will actually call: MCP items that are neither unchanged
+    since the previous briefcase nor answered from the cache. An item without a known
+    mcp_server may need tool discovery, which starts every server.
+    """
+    needed: List[str] = []
+    for index, item in enumerate(story.context_manifest):
+        if context_source(item, True) != "mcp":
+            continue
+        earlier = previous.get(item_slot(item, index))
+        ttl = cache.ttl_for(item.cache_ttl)
+        if earlier and is_unchanged(earlier.fingerprint, item, "mcp", ttl=ttl):
+            continue
+        if ttl > 0 and await asyncio.to_thread(cache.get, context_cache_key(item, "mcp", mcp_runtime)) is not None:
+            continue
+        if item.mcp_server not in mcp_runtime.configs:
+            return list(mcp_runtime.configs)
+        needed.append(item.mcp_server)
+    return list(dict.fromkeys(needed))
+
+async def prewarm_mcp_servers(
+    story: ValueStory,
+    mcp_runtime: MCPRuntime,
+    previous: Dict[str, ContextManifestItem],
+    cache: AssemblyCache,
+):
+    """Starts the servers the manifest needs, concurrently, and reports each one's readiness."""
+    servers = await mcp_servers_to_prewarm(story, mcp_runtime, previous, cache)
+    if not servers:
+        return
+    for name, error in (await mcp_runtime.prewarm(servers)).items():
+        if error:
+            console.print(f"  [red]✗ MCP server failed to start:[/red] {name} [dim]({escape(error)})[/dim]")
+        else:
+            console.print(f"  [dim]✓ MCP server ready:[/dim] {name}")
+
+async def perform_assembly(
+    path_or_url: str,
+    limits: Optional[AssemblyLimits] = None,
+    cache_mode: str = "default",
+    story: Optional[ValueStory] = None,
+    briefcase_format: str = "yaml",
+) -> Path:
+    """Assembles a story into a briefcase and returns the briefcase path."""
+    output_path, _ = await assemble_story(path_or_url, limits, cache_mode, story, briefcase_format)
+    return output_path
+
+async def assemble_story(
+    path_or_url: str,
+    limits: Optional[AssemblyLimits] = None,
+    cache_mode: str = "default",
+    story: Optional[ValueStory] = None,
+    briefcase_format: str = "yaml",
+) -> Tuple[Path, ValueStory]:
+    """
+    The Information Hunt. Returns the briefcase path and the assembled story.
+    Pass an already loaded `story` to skip fetching and parsing it again.
+    `briefcase_format` is one of 'yaml' (default), 'json' or 'avsb' (binary container).
+    """
+    limits = limits or AssemblyLimits()
+    cache = AssemblyCache(cache_mode)
+    if story is None:
+        try:
+            story = await load_story(path_or_url)
+        except (ValidationError, ValueError) as e:
+            console.print(f"[red]Governance Failure:[/red] {e}")
+            raise typer.Exit(1)
+    
+    console.print(f"\n[bold blue]Assembling Briefcase for {story.metadata.story_id}...[/bold blue]")
+    
+    mcp_runtime = None
+    if story.mcp_servers:
+        # Reuse warm servers from `avs mcp-pool` when it is running
+        pool = await connect_pool()
+        if pool:
+            console.print("  [dim]Using persistent MCP pool.[/dim]")
+        mcp_runtime = MCPRuntime(story.mcp_servers, pool=pool)
+
+    # Items are gathered concurrently: a slot is taken from the per-source pool first,
+    # then from the overall pool, so a backlog of one source never starves the others.
+    total_slots = asyncio.Semaphore(limits.total)
+    source_slots = {
+        "mcp": asyncio.Semaphore(limits.mcp),
+        "research": asyncio.Semaphore(limits.research),
+        "files": asyncio.Semaphore(limits.files),
+    }
+
+    # Incremental re-assembly: items whose fingerprint is unchanged are copied from the
+    # existing briefcase instead of being fetched again (--refresh rebuilds everything).
+    output_path = briefcase_path(story, briefcase_format)
+    previous = load_previous_briefcase(output_path) if cache.mode != "refresh" else {}
+
+    # Servers start in the background while files and research are gathered
+    prewarm = None
+    if mcp_runtime and cache.mode != "offline":
+        prewarm = asyncio.create_task(prewarm_mcp_servers(story, mcp_runtime, previous, cache))
+
+    async def gather(index: int, item: ContextManifestItem) -> Optional[str]:
+        label = item.key or item.mcp_tool_name or item.default_path
+        with span("context.item", key=label, source=context_source(item, mcp_runtime is not None)) as s:
+            result = await gather_item(index, item)
+            s.set(bytes_received=item.content_ref["size"] if item.content_ref else len(result or ""))
+            return result
+
+    async def gather_item(index: int, item: ContextManifestItem) -> Optional[str]:
+        source = context_source(item, mcp_runtime is not None)
+        if source is None:
+            return item.content
+
+        path = resolve_local_path(item, path_or_url) if source == "files" else None
+        earlier = previous.get(item_slot(item, index))
+        if earlier and (source != "files" or path.is_file()):
+            refs = [earlier.content_ref, *(part.ref for part in earlier.parts or [])]
+            if not all(resolve_blob(ref, output_path).is_file() for ref in refs if ref):
+                earlier = None
+            if earlier and await asyncio.to_thread(is_unchanged, earlier.fingerprint, item, source, path, cache.ttl_for(item.cache_ttl)):
+                item.fingerprint = earlier.fingerprint
+                item.content_ref = earlier.content_ref
+                item.parts = earlier.parts
+                console.print(f"  [dim]↺ Unchanged:[/dim] {item.key or item.mcp_tool_name or item.default_path}")
+                return earlier.content
+
+        # Large contents go to sidecar blobs; big files are copied without being read into memory
+        item.content_ref = None
+        item.parts = None
+        failed = False
+        async with source_slots[source], total_slots:
+            if source == "files" and path.is_file() and should_spill(path.stat().st_size) \
+                    and await asyncio.to_thread(stores_verbatim, path):
+                item.content_ref = await asyncio.to_thread(store_file, blob_dir(output_path), path)
+                console.print(f"  [green]✓ Injected file:[/green] {path.name} [dim](sidecar blob)[/dim]")
+                result = None
+            else:
+                result, failed = await gather_context_item(item, source, mcp_runtime, path_or_url, cache)
+        if item.parts:
+            item.parts = await asyncio.to_thread(store_parts, blob_dir(output_path), item.parts)
+        if result is not None and not failed and should_spill(len(result)):
+            item.content_ref = await asyncio.to_thread(store_text, blob_dir(output_path), result)
+            result = None
+
+        gathered = item.content_ref or (result is not None and not failed)
+        if gathered and (source != "files" or path.is_file()):
+            item.fingerprint = await asyncio.to_thread(item_fingerprint, item, source, path)
+        if item.content_ref:
+            return None
+        return result if result is not None else item.content
+
+    try:
+        with span("assemble.gather", story_id=story.metadata.story_id, items=len(story.context_manifest)):
+            results = await asyncio.gather(*(gather(i, item) for i, item in enumerate(story.context_manifest)))
+    finally:
+        if prewarm:
+            await asyncio.gather(prewarm, return_exceptions=True)
+        if mcp_runtime: await mcp_runtime.shutdown()
+
+    # Write results back in manifest order
+    for item, result in zip(story.context_manifest, results):
+        item.content = result
+
+    story.metadata.assembled_at = datetime.now().isoformat()
+    story.metadata.status = "assembled"
+    
+    with span("briefcase.save", format=briefcase_format) as s:
+        save_briefcase(story.model_dump(), output_path, briefcase_format)
+        s.set(bytes_sent=output_path.stat().st_size)
+    refs = (ref for item in story.context_manifest for ref in [item.content_ref, *(part.ref for part in item.parts or [])])
+    prune_blobs(blob_dir(output_path), (ref["sha256"] for ref in refs if ref))
     
     console.print(f"\n[bold green]✓ Assembly Complete[/bold green]")
     console.print(f"  Briefcase: {output_path}")
-    return output_path
+    return output_path, story
 
 @app.command()
 def doctor():
@@ -184,45 +494,300 @@ def doctor():
 def validate(path_or_url: str):
     """Checks a Value Story against the Agile Standard Building Code."""
     try:
-        content = asyncio.run(get_story_content(path_or_url))
-        data = yaml.safe_load(content) if "assembled_at" in content else parse_markdown_story(content)
-        ValueStory(**data)
+        run_async(load_story(path_or_url))
         console.print("[bold green]✓ Governance Pass[/bold green]")
     except Exception as e:
         console.print(f"[bold red]❌ Governance Failure:[/bold red] {e}")
         raise typer.Exit(1)
 
+def assembly_limits(
+    concurrency: Optional[int], mcp: Optional[int], research: Optional[int], files: Optional[int]
+) -> AssemblyLimits:
+    """Builds AssemblyLimits from CLI options, keeping model defaults for unset values."""
+    overrides = {"total": concurrency, "mcp": mcp, "research": research, "files": files}
+    return AssemblyLimits(**{k: v for k, v in overrides.items() if v is not None})
+
+ConcurrencyOption = typer.Option(None, "--concurrency", help="Max context items gathered at once (default 16).")
+MCPConcurrencyOption = typer.Option(None, "--mcp-concurrency", help="Max concurrent MCP tool calls (default 16).")
+ResearchConcurrencyOption = typer.Option(None, "--research-concurrency", help="Max concurrent research queries (default 4).")
+FileConcurrencyOption = typer.Option(None, "--file-concurrency", help="Max concurrent local file reads (default 16).")
+RefreshOption = typer.Option(False, "--refresh", help="Ignore cached research/MCP results and fetch fresh ones.")
+OfflineOption = typer.Option(False, "--offline", help="Use only cached research/MCP results; make no network calls.")
+
+FormatOption = typer.Option(
+    os.getenv("AVS_BRIEFCASE_FORMAT", "yaml"), "--format",
+    help="Briefcase format: yaml (readable), json (fast) or avsb (fast binary container)."
+)
+
+ResponseCacheOption = typer.Option(
+    False, "--cache",
+    help="Replay identical LLM requests from the local response cache (for development and CI; off by default)."
+)
+
+TraceOption = typer.Option(None, "--trace", help="Write a JSON trace of every stage (timings, bytes, tokens) to this file.")
+TraceFormatOption = typer.Option("json", "--trace-format", help="Trace file format: json, or otlp (OpenTelemetry OTLP/JSON).")
+ProfileOption = typer.Option(False, "--profile", help="Print a timing waterfall of every stage when done.")
+
+def run_traced(coro, command: str, trace: Optional[Path], trace_format: str, profile: bool):
+    """Runs a command's coroutine like run_async, recording spans when --trace or --profile is given."""
+    if not trace and not profile:
+        return run_async(coro)
+    if trace_format not in TRACE_FORMATS:
+        coro.close()
+        raise typer.BadParameter(f"--trace-format must be one of {', '.join(TRACE_FORMATS)}.")
+
+    async def root():
+        with span(command):
+            return await coro
+
+    tracer.start()
+    try:
+        return run_async(root())
+    finally:
+        spans = tracer.stop()
+        if trace:
+            write_trace(trace, spans, trace_format)
+            console.print(f"[dim]Trace written to {trace} ({len(spans)} spans).[/dim]")
+        if profile:
+            print_profile(spans)
+
+def resolve_cache_mode(refresh: bool, offline: bool) -> str:
+    """Maps the --refresh/--offline switches to an AssemblyCache mode."""
+    if refresh and offline:
+        raise typer.BadParameter("--refresh and --offline cannot be combined.")
+    return "refresh" if refresh else "offline" if offline else "default"
+
 @app.command()
-def assemble(path_or_url: str):
+def assemble(
+    path_or_url: str,
+    concurrency: Optional[int] = ConcurrencyOption,
+    mcp_concurrency: Optional[int] = MCPConcurrencyOption,
+    research_concurrency: Optional[int] = ResearchConcurrencyOption,
+    file_concurrency: Optional[int] = FileConcurrencyOption,
+    refresh: bool = RefreshOption,
+    offline: bool = OfflineOption,
+    briefcase_format: str = FormatOption,
+    trace: Optional[Path] = TraceOption,
+    trace_format: str = TraceFormatOption,
+    profile: bool = ProfileOption,
+):
     """The Information Hunt: Injects context from local, web, or remote sources."""
+    mode = resolve_cache_mode(refresh, offline)
+    if briefcase_format not in FORMATS:
+        raise typer.BadParameter(f"--format must be one of {', '.join(FORMATS)}.")
     try:
-        asyncio.run(perform_assembly(path_or_url))
+        limits = assembly_limits(concurrency, mcp_concurrency, research_concurrency, file_concurrency)
+        run_traced(perform_assembly(path_or_url, limits, mode, briefcase_format=briefcase_format), "avs assemble", trace, trace_format, profile)
     except Exception as e:
         console.print(f"[red]Assembly failed: {e}[/red]")
         raise typer.Exit(1)
 
 @app.command()
-def run(path_or_url: str, local: bool = typer.Option(True, "--local"), model: Optional[str] = typer.Option(None)):
+def run(
+    path_or_url: str,
+    local: bool = typer.Option(True, "--local"),
+    model: Optional[str] = typer.Option(None),
+    concurrency: Optional[int] = ConcurrencyOption,
+    mcp_concurrency: Optional[int] = MCPConcurrencyOption,
+    research_concurrency: Optional[int] = ResearchConcurrencyOption,
+    file_concurrency: Optional[int] = FileConcurrencyOption,
+    refresh: bool = RefreshOption,
+    offline: bool = OfflineOption,
+    stream: bool = typer.Option(False, "--stream", help="Render the answer live and write it to the product file as it arrives."),
+    briefcase_format: str = FormatOption,
+    context_window: Optional[int] = typer.Option(
+        None, "--context-window", min=1,
+        help="Token budget for the prompt (default: the model's window, or AVS_CONTEXT_WINDOW)."
+    ),
+    map_reduce: bool = typer.Option(
+        False, "--map-reduce",
+        help="If the context exceeds the window, process it in chunks concurrently and synthesize the results."
+    ),
+    fan_out: int = typer.Option(4, "--fan-out", min=1, help="Maximum concurrent chunk calls in --map-reduce mode."),
+    prompt_cache: bool = typer.Option(
+        os.getenv("AVS_PROMPT_CACHE", "").lower() in ("1", "true", "yes"), "--prompt-cache/--no-prompt-cache",
+        help="Cache the context on the provider (Gemini cachedContents, Ollama keep_alive) so re-runs send only changes."
+    ),
+    response_cache: bool = ResponseCacheOption,
+    trace: Optional[Path] = TraceOption,
+    trace_format: str = TraceFormatOption,
+    profile: bool = ProfileOption,
+):
     """
     Executes a Value Story. Supports Local files or GitHub URLs.
     Now supports hybrid execution (Ollama or Cloud LLMs) via story configuration.
     """
+    mode = resolve_cache_mode(refresh, offline)
+    if briefcase_format not in FORMATS:
+        raise typer.BadParameter(f"--format must be one of {', '.join(FORMATS)}.")
     try:
-        content = asyncio.run(get_story_content(path_or_url))
-        is_yaml = "assembled_at" in content
-        data = yaml.safe_load(content) if is_yaml else parse_markdown_story(content)
-        story = ValueStory(**data)
-        
-        briefcase = path_or_url if story.is_assembled else asyncio.run(perform_assembly(path_or_url))
-        
-        # Determine the model. If provider is cloud, we might fallback to a different default if not specified.
-        # But run_story handles this logic too.
-        # Note: local flag is deprecated/ignored for provider selection logic, but kept for interface compatibility.
-        
-        asyncio.run(run_story(str(briefcase), model=model or story.metadata.preferred_model or "llama3"))
+        limits = assembly_limits(concurrency, mcp_concurrency, research_concurrency, file_concurrency)
+
+        async def execute():
+            # The story is loaded and validated once, then handed to assembly and execution
+            story = await load_story(path_or_url)
+            if story.is_assembled:
+                briefcase, assembled = path_or_url, story
+            else:
+                with span("assemble"):
+                    briefcase, assembled = await assemble_story(path_or_url, limits, mode, story, briefcase_format)
+            
+            # Determine the model. If provider is cloud, we might fallback to a different default if not specified.
+            # But run_story handles this logic too.
+            # Note: local flag is deprecated/ignored for provider selection logic, but kept for interface compatibility.
+            chosen_model = model or story.metadata.preferred_model or "llama3"
+            await run_story(
+                str(briefcase), model=chosen_model, stream=stream, story=assembled.model_dump(),
+                context_window=context_window, map_reduce=map_reduce, fan_out=fan_out,
+                prompt_cache=prompt_cache, response_cache=response_cache
+            )
+
+        run_traced(execute(), "avs run", trace, trace_format, profile)
     except Exception as e:
         console.print(f"[red]Execution failed: {e}[/red]")
         raise typer.Exit(1)
 
+@app.command()
+def convert(
+    briefcase: Path = typer.Argument(..., help="An assembled briefcase (yaml, json or avsb)."),
+    to: str = typer.Option(..., "--to", help="Target format: yaml, json or avsb."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Destination (default: same name, new suffix)."),
+):
+    """Converts a briefcase between the YAML, JSON and AVSB formats."""
+    if not briefcase.is_file():
+        console.print(f"[red]Error:[/red] File not found: {briefcase}")
+        raise typer.Exit(1)
+    try:
+        destination = convert_briefcase(briefcase, to, output)
+    except Exception as e:
+        console.print(f"[red]Conversion failed:[/red] {e}")
+        raise typer.Exit(1)
+    console.print(f"[bold green]✓ Converted[/bold green] {briefcase} → {destination}")
+
+@app.command()
+def batch(
+    target: str = typer.Argument(..., help="Directory, glob pattern, or manifest (.txt list or YAML with 'stories')."),
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Stories processed at once."),
+    provider_limit: List[str] = typer.Option([], "--provider-limit", help="Concurrent LLM calls per provider, e.g. google-gemini=8 (default: ollama=1, others 4)."),
+    report: Path = typer.Option(Path("batch-report.json"), "--report", help="Where to write the JSON report."),
+    assemble_only: bool = typer.Option(False, "--assemble-only", help="Assemble briefcases without running them."),
+    model: Optional[str] = typer.Option(None, help="Override every story's preferred model."),
+    refresh: bool = RefreshOption,
+    offline: bool = OfflineOption,
+    response_cache: bool = ResponseCacheOption,
+):
+    """Validates, assembles and runs a whole directory of Value Stories in parallel."""
+    from .batch import discover_stories, parse_provider_limits, print_summary, run_batch, write_report
+
+    mode = resolve_cache_mode(refresh, offline)
+    limits_by_provider = parse_provider_limits(provider_limit)
+    try:
+        sources = discover_stories(target)
+    except FileNotFoundError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    if not sources:
+        console.print(f"[yellow]No stories found in {target}.[/yellow]")
+        raise typer.Exit(1)
+
+    console.print(f"[bold blue]Batch: {len(sources)} stories, {concurrency} at a time[/bold blue]")
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    results = run_async(run_batch(
+        sources,
+        concurrency=concurrency,
+        provider_limits=limits_by_provider,
+        model=model,
+        assemble_only=assemble_only,
+        cache_mode=mode,
+        response_cache=response_cache,
+    ))
+    wall_seconds = time.perf_counter() - started
+
+    print_summary(results, wall_seconds)
+    write_report(report, results, started_at, wall_seconds)
+    console.print(f"  Report: {report}")
+    if any(result.status != "ok" for result in results):
+        raise typer.Exit(1)
+
+@stream_app.command("run")
+def stream_run(
+    stream_file: Path = typer.Argument(..., help="Stream definition (YAML with a 'stories' list)."),
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Stories executed at once."),
+    force: bool = typer.Option(False, "--force", help="Re-run every story, even if unchanged."),
+    refresh: bool = RefreshOption,
+    offline: bool = OfflineOption,
+):
+    """
+    Runs every story in a stream. A story whose context uses another story's product
+    waits for it; independent branches run concurrently.
+    """
+    from .value_stream import load_definition, print_stream_summary, run_stream
+
+    mode = resolve_cache_mode(refresh, offline)
+    if not stream_file.exists():
+        console.print(f"[red]Error:[/red] File not found: {stream_file}")
+        raise typer.Exit(1)
+
+    try:
+        nodes = run_async(run_stream(stream_file, concurrency=concurrency, force=force, cache_mode=mode))
+    except Exception as e:
+        console.print(f"[red]Stream failed:[/red] {e}")
+        raise typer.Exit(1)
+
+    print_stream_summary(load_definition(stream_file).name, nodes)
+    if any(node.status not in ("ok", "skipped") for node in nodes.values()):
+        raise typer.Exit(1)
+
+@pool_app.command("start")
+def pool_start(
+    idle_timeout: float = typer.Option(600.0, help="Seconds a server may sit unused before it is stopped."),
+    health_interval: float = typer.Option(30.0, help="Seconds between health checks."),
+    socket: Optional[Path] = typer.Option(None, help="Socket path (default ~/.avs/mcp-pool.sock)."),
+    background: bool = typer.Option(False, "--background", help="Detach and keep running after this shell exits."),
+):
+    """Keeps MCP servers warm so `assemble` and `run` skip cold starts."""
+    if background:
+        pid = spawn_background_pool(idle_timeout, health_interval, socket)
+        console.print(f"[bold green]✓ MCP pool started[/bold green] (pid {pid})")
+        return
+
+    pool = MCPPool(idle_timeout=idle_timeout, health_interval=health_interval)
+    console.print("[bold blue]MCP pool listening.[/bold blue] Press Ctrl+C to stop.")
+    try:
+        run_async(pool.serve(socket))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        console.print(f"[red]MCP pool failed:[/red] {e}")
+        raise typer.Exit(1)
+
+@pool_app.command("stop")
+def pool_stop(socket: Optional[Path] = typer.Option(None, help="Socket path (default ~/.avs/mcp-pool.sock).")):
+    """Stops the MCP pool and all of its servers."""
+    try:
+        run_async(PoolClient(socket).stop())
+        console.print("[bold green]✓ MCP pool stopped[/bold green]")
+    except OSError:
+        console.print("[yellow]No MCP pool is running.[/yellow]")
+
+@pool_app.command("status")
+def pool_status(socket: Optional[Path] = typer.Option(None, help="Socket path (default ~/.avs/mcp-pool.sock).")):
+    """Lists the servers held by the MCP pool."""
+    try:
+        status = run_async(PoolClient(socket).status())
+    except OSError:
+        console.print("[yellow]No MCP pool is running.[/yellow]")
+        raise typer.Exit(1)
+
+    table = Table(title=f"MCP Pool (pid {status['pid']}, up {status['uptime_seconds']}s)")
+    table.add_column("Key", style="cyan")
+    table.add_column("Command")
+    table.add_column("Running", justify="center")
+    table.add_column("Idle (s)", justify="right")
+    for server in status["servers"]:
+        table.add_row(server["key"], server["command"], "✓" if server["running"] else "-", str(server["idle_seconds"]))
+    console.print(table)
+
 if __name__ == "__main__":
     app()
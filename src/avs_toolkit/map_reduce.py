@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from rich.console import Console
+
+from .blobs import resolve as resolve_blob
+from .packing import CHARS_PER_TOKEN, ContextBudgetError, estimate_blob_tokens, estimate_tokens
+from .payload import PromptPayload, display_name
+from .tracing import span
+
+console = Console()
+
+# Upper bound on the context sent to each map or reduce call. Smaller chunks mean more
+# calls in parallel and a smaller Ollama num_ctx; the model's window is the hard limit.
+MAP_CHUNK_TOKENS = int(os.getenv("AVS_MAP_CHUNK_TOKENS", 32_768))
+DEFAULT_FAN_OUT = 4
+MAX_REDUCE_ROUNDS = 8
+
+MAP_HEADER = "CONTEXT ASSETS (part {part} of {parts}):\n"
+MAP_FOOTER = (
+    "\n\nThis is part {part} of {parts} of the context. Work through the execution steps using only this part. "
+    "Report every finding, figure and quotation relevant to the goal, or 'No relevant information.' if there is none. "
+    "Do not write the final product yet."
+)
+PARTIALS_HEADER = "PARTIAL RESULTS:\n"
+MERGE_FOOTER = (
+    "\n\nThe partial results above come from consecutive parts of a larger context. "
+    "Merge them into one set of findings, removing duplicates. Do not write the final product yet."
+)
+REDUCE_FOOTER = (
+    "\n\nThe partial results above come from consecutive parts of the context. "
+    "Combine them into the final product now, following the execution steps. Resolve duplicates and contradictions."
+)
+
+# A piece of one asset: its label, estimated tokens, and how to add its content to a payload
+Piece = Tuple[str, int, Callable[[PromptPayload], None]]
+
+def framing(label: str) -> Tuple[str, str]:
+    return f"--- START {label} ---\n", "\n--- END ---\n"
+
+def asset_pieces(item: dict, briefcase_path: Path, budget: int) -> List[Piece]:
+    """Splits one asset into pieces of at most `budget` tokens (blobs as memory-mapped byte ranges)."""
+    name = display_name(item)
+    ref = item.get("content_ref")
+    content = item.get("content") or ""
+    size = ref["size"] if ref else len(content)
+    step = max(1, int(budget * CHARS_PER_TOKEN))
+    starts = range(0, size, step) if size else [0]
+
+    pieces = []
+    for n, start in enumerate(starts, 1):
+        end = min(start + step, size)
+        label = name if len(starts) == 1 else f"{name} (part {n}/{len(starts)})"
+        if ref:
+            path = resolve_blob(ref, briefcase_path)
+            add = lambda payload, path=path, start=start, end=end: payload.append_blob(path, start, end)
+        else:
+            add = lambda payload, text=content[start:end]: payload.append(text)
+        pieces.append((label, estimate_blob_tokens(end - start), add))
+    return pieces
+
+def split_context(items: List[dict], briefcase_path: Path, chunk_tokens: int) -> List[Union[str, PromptPayload]]:
+    """
+    Packs the context assets, in manifest order, into chunks of at most `chunk_tokens`.
+    Assets larger than a chunk are split across consecutive chunks.
+    """
+    overhead = estimate_tokens(MAP_HEADER + MAP_FOOTER) + 8
+    budget = max(1, chunk_tokens - overhead)
+
+    groups: List[List[Piece]] = [[]]
+    used = 0
+    for item in items:
+        for label, tokens, add in asset_pieces(item, briefcase_path, budget - estimate_tokens("".join(framing(display_name(item))))):
+            tokens += estimate_tokens("".join(framing(label)))
+            if groups[-1] and used + tokens > budget:
+                groups.append([])
+                used = 0
+            groups[-1].append((label, tokens, add))
+            used += tokens
+
+    chunks = []
+    for part, group in enumerate(groups, 1):
+        payload = PromptPayload()
+        payload.append(MAP_HEADER.format(part=part, parts=len(groups)))
+        for label, _, add in group:
+            start, end = framing(label)
+            payload.append(start)
+            add(payload)
+            payload.append(end)
+        payload.append(MAP_FOOTER.format(part=part, parts=len(groups)))
+        chunks.append(payload if payload.has_blobs else str(payload))
+    return chunks
+
+def partials_payload(partials: List[str], footer: str) -> str:
+    body = "".join(f"--- START part {i} ---\n{text}\n--- END ---\n" for i, text in enumerate(partials, 1))
+    return PARTIALS_HEADER + body + footer
+
+def group_partials(partials: List[str], budget: int) -> List[List[str]]:
+    """Groups consecutive partial results so each group fits one call."""
+    groups: List[List[str]] = [[]]
+    used = 0
+    for text in partials:
+        tokens = estimate_tokens(text) + 8
+        if groups[-1] and used + tokens > budget:
+            groups.append([])
+            used = 0
+        groups[-1].append(text)
+        used += tokens
+    return groups
+
+async def run_calls(provider, system_prompt: str, payloads: List, model: str, fan_out: int, noun: str) -> List[str]:
+    """Runs one generate() call per payload, at most `fan_out` at a time. Failed calls are left out."""
+    slots = asyncio.Semaphore(fan_out)
+    started = time.perf_counter()
+
+    async def call(index: int, payload) -> Optional[str]:
+        async with slots:
+            with span("llm.generate", model=model, part=f"{noun} {index}"):
+                text = await provider.generate(system_prompt, payload, model)
+        if text:
+            console.print(f"  [green]✓ {noun} {index}/{len(payloads)}[/green] [dim]{time.perf_counter() - started:.1f}s[/dim]")
+        else:
+            console.print(f"  [yellow]⚠ {noun} {index}/{len(payloads)} returned nothing.[/yellow]")
+        return text
+
+    results = await asyncio.gather(*(call(i, payload) for i, payload in enumerate(payloads, 1)))
+    return [text for text in results if text]
+
+async def map_reduce_payload(
+    provider,
+    system_prompt: str,
+    story: dict,
+    briefcase_path: Path,
+    model: str,
+    budget: int,
+    fan_out: int = DEFAULT_FAN_OUT,
+) -> Optional[str]:
+    """
+    Map: runs the story's instructions over chunks of at most `budget` tokens concurrently.
+    Partial results that do not fit one call are merged in further rounds.
+    Returns the payload of the final synthesis (reduce) call, or None if every map call failed.
+    Raises ContextBudgetError if the partial results cannot be merged into one call.
+    """
+    chunks = split_context(story["context_manifest"], briefcase_path, budget)
+    console.print(f"[bold blue]Map-reduce:[/bold blue] {len(chunks)} chunks of up to ~{budget:,} tokens, fan-out {fan_out}")
+
+    partials = await run_calls(provider, system_prompt, chunks, model, fan_out, "Mapped part")
+    if not partials:
+        return None
+    if len(partials) < len(chunks):
+        console.print(f"[yellow]Warning:[/yellow] {len(chunks) - len(partials)} of {len(chunks)} parts produced no result.")
+
+    reduce_budget = budget - estimate_tokens(PARTIALS_HEADER + REDUCE_FOOTER)
+    for _ in range(MAX_REDUCE_ROUNDS):
+        groups = group_partials(partials, reduce_budget)
+        if len(groups) == 1:
+            break
+        merges = [partials_payload(group, MERGE_FOOTER) for group in groups]
+        merged = await run_calls(provider, system_prompt, merges, model, fan_out, "Merged group")
+        # Failed merges, or merges that come back no fewer than their inputs, would only repeat
+        if len(merged) >= len(partials) or not merged:
+            break
+        partials = merged
+
+    groups = group_partials(partials, reduce_budget)
+    if len(groups) > 1:
+        raise ContextBudgetError(
+            f"Map-reduce could not merge {len(partials)} partial results into one call of ~{budget:,} tokens "
+            f"({len(groups)} groups remain)."
+        )
+    return partials_payload(partials, REDUCE_FOOTER)
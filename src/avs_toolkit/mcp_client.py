@@ -1,26 +1,201 @@
 import asyncio
+import json
 import os
-from typing import Dict, List, Any, Optional, Tuple
-from mcp import ClientSession, StdioServerParameters
+import random
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Any, Optional, Set, Tuple
+from mcp import ClientSession, McpError, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 from contextlib import AsyncExitStack
 
-from .models import MCPServerConfig
+from .models import ContentPart, MCPServerConfig
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .mcp_pool import PoolClient
+
+# Launch plus initialize; npx may have to download the server package first
+DEFAULT_STARTUP_TIMEOUT = float(os.getenv("AVS_MCP_STARTUP_TIMEOUT", 60))
+# Tool calls multiplexed on one session; MCP matches responses to requests by id
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("AVS_MCP_MAX_IN_FLIGHT", 8))
+# A call that outlives its timeout is abandoned and its (possibly wedged) server restarted
+DEFAULT_CALL_TIMEOUT = float(os.getenv("AVS_MCP_CALL_TIMEOUT", 300))
+# Retries of idempotent tools after a timeout or transport failure, with jittered backoff
+DEFAULT_TOOL_RETRIES = int(os.getenv("AVS_MCP_RETRIES", 2))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 15.0
+# Time a server gets to exit cleanly before its host task is cancelled (killing the process)
+SHUTDOWN_GRACE = 5.0
+# Tool output kept per call (text and binary parts together); the rest is cut. 0 disables the cap.
+MAX_RESULT_BYTES = int(os.getenv("AVS_MCP_MAX_RESULT_BYTES", 32 * 1024 * 1024))
+# A server that failed to start is not relaunched for this long, so queued calls fail fast
+STARTUP_RETRY_AFTER = 30.0
+
+class MCPToolError(RuntimeError):
+    """Raised when a tool call fails: no server, no start, a timeout, or an error the tool reports (isError)."""
+
+def result_parts(result: Any, max_bytes: Optional[int] = None) -> List[ContentPart]:
+    """
+    Converts an MCP CallToolResult into typed parts, keeping images, audio, resources
+    and structured content. Parts are taken in order until `max_bytes` is used up:
+    the part that crosses the cap is cut (text) or dropped (binary), later parts are
+    dropped, and a final text part records how much was left out.
+    """
+    limit = MAX_RESULT_BYTES if max_bytes is None else max_bytes
+    budget = limit if limit > 0 else float("inf")
+    parts: List[ContentPart] = []
+    omitted = 0
+
+    def add(part: ContentPart):
+        nonlocal budget, omitted
+        if part.size <= budget:
+            budget -= part.size
+            parts.append(part)
+            return
+        if part.text is not None and budget > 0:
+            kept = part.text.encode("utf-8")[:int(budget)].decode("utf-8", errors="ignore")
+            size = len(kept.encode("utf-8"))
+            parts.append(part.model_copy(update={"text": kept, "size": size}))
+            omitted += part.size - size
+        else:
+            omitted += part.size
+        budget = 0
+
+    def text_part(kind: str, text: str, **fields) -> ContentPart:
+        return ContentPart(type=kind, text=text, size=len(text.encode("utf-8")), **fields)
+
+    def binary_part(kind: str, data: str, **fields) -> ContentPart:
+        # Decoded size, without decoding: 3 bytes per 4 base64 characters, less padding
+        return ContentPart(type=kind, data=data, size=len(data) * 3 // 4 - data.count("=", -2), **fields)
+
+    for content in result.content:
+        if isinstance(content, (types.ImageContent, types.AudioContent)):
+            add(binary_part(content.type, content.data, mime_type=content.mimeType))
+        elif isinstance(content, types.EmbeddedResource):
+            resource = content.resource
+            fields = {"uri": str(resource.uri), "mime_type": resource.mimeType}
+            if isinstance(resource, types.BlobResourceContents):
+                add(binary_part("resource", resource.blob, **fields))
+            else:
+                add(text_part("resource", resource.text, **fields))
+        elif isinstance(content, types.ResourceLink):
+            add(ContentPart(type="resource_link", uri=str(content.uri), mime_type=content.mimeType, text=content.name))
+        elif isinstance(getattr(content, "text", None), str) and content.text:
+            add(text_part("text", content.text))
+
+    structured = getattr(result, "structuredContent", None)
+    if isinstance(structured, dict):
+        add(text_part("structured", json.dumps(structured), mime_type="application/json"))
+
+    if omitted:
+        parts.append(text_part("text", f"[... {omitted:,} bytes of tool output omitted: result exceeds {limit:,} bytes]"))
+    return parts
+
+def render_text(parts: List[ContentPart], tool_name: str) -> str:
+    """
+    The text of a tool result: text parts and text resources in order, one line per
+    binary part or link, and structured content only when the tool returned no text.
+    """
+    lines = []
+    for part in parts:
+        if part.type in ("text", "resource") and part.text is not None:
+            lines.append(part.text)
+        elif part.type == "resource_link":
+            lines.append(f"[resource link {part.uri}]")
+        elif part.type != "structured":
+            lines.append(f"[{part.type} {part.mime_type or 'application/octet-stream'}, {part.size:,} bytes{f' {part.uri}' if part.uri else ''}]")
+    if not lines:
+        lines = [part.text for part in parts if part.type == "structured" and part.text]
+    if not lines:
+        return f"Warning: Tool '{tool_name}' returned no text content."
+    return "\n".join(lines)
 
 class MCPRuntime:
     """
     Orchestrates the lifecycle of ephemeral MCP servers.
     Manages connections, tool execution, and resource cleanup.
+    When a PoolClient is given, tool calls are served by the persistent
+    `avs mcp-pool` process instead, falling back to local launches if it goes away.
     """
-    def __init__(self, server_configs: List[MCPServerConfig]):
+    def __init__(self, server_configs: List[MCPServerConfig], pool: Optional["PoolClient"] = None):
         self.configs = {cfg.name: cfg for cfg in server_configs}
+        self.pool = pool
         self.sessions: Dict[str, ClientSession] = {}
-        self.exit_stack = AsyncExitStack()
+        # Each server lives inside its own host task so that the stdio transport
+        # is entered and exited by the same task, even when tools are called
+        # concurrently from many assembly tasks.
+        self._hosts: Dict[str, Tuple[asyncio.Task, asyncio.Event]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Tool -> server routing index, filled once per runtime by build_tool_index()
+        self.tool_index: Dict[str, str] = {}
+        self._indexed: Set[str] = set()
+        self._index_lock = asyncio.Lock()
+        # Server -> (failure time, error) of the last failed launch
+        self._startup_failures: Dict[str, Tuple[float, BaseException]] = {}
+        self._call_slots: Dict[str, asyncio.Semaphore] = {}
+        # Tool calls in flight per server; failed at once when the server is restarted
+        self._calls: Dict[str, Set[asyncio.Future]] = {}
+        # (server, tool) pairs the server annotated as read-only or idempotent
+        self._idempotent: Set[Tuple[str, str]] = set()
+        # Server -> its list_tools request, shared by concurrent callers until the server closes
+        self._listings: Dict[str, asyncio.Future] = {}
+
+    def startup_timeout(self, server_name: str) -> float:
+        return self.configs[server_name].startup_timeout or DEFAULT_STARTUP_TIMEOUT
+
+    def call_timeout(self, server_name: str) -> float:
+        config = self.configs.get(server_name)
+        return (config.call_timeout if config else None) or DEFAULT_CALL_TIMEOUT
+
+    def is_idempotent(self, server_name: str, tool_name: str) -> bool:
+        config = self.configs.get(server_name)
+        return (server_name, tool_name) in self._idempotent or bool(config and tool_name in config.idempotent_tools)
+
+    def retries(self, server_name: str, tool_name: str) -> int:
+        if not self.is_idempotent(server_name, tool_name):
+            return 0
+        config = self.configs.get(server_name)
+        return DEFAULT_TOOL_RETRIES if config is None or config.retries is None else config.retries
+
+    def call_slots(self, server_name: str) -> asyncio.Semaphore:
+        """Bounds the tool calls in flight on one server's session."""
+        if server_name not in self._call_slots:
+            config = self.configs.get(server_name)
+            limit = (config.max_in_flight if config else None) or DEFAULT_MAX_IN_FLIGHT
+            self._call_slots[server_name] = asyncio.Semaphore(limit)
+        return self._call_slots[server_name]
+
+    async def _host_server(self, config: MCPServerConfig, ready: asyncio.Future, stop: asyncio.Event):
+        """
+        Owns the transport and session of a single server for its whole lifetime.
+        Resolves `ready` with the initialized session, then parks until `stop` is set.
+        """
+        # Configure the subprocess parameters
+        server_params = StdioServerParameters(
+            command=config.command,
+            args=config.args,
+            env={**os.environ, **(config.env or {})}
+        )
+
+        try:
+            async with AsyncExitStack() as stack:
+                read_stream, write_stream = await stack.enter_async_context(stdio_client(server_params))
+                session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+                await session.initialize()
+
+                ready.set_result(session)
+                await stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            if isinstance(e, (asyncio.CancelledError, KeyboardInterrupt, SystemExit)):
+                raise
 
     async def _get_session(self, server_name: str) -> ClientSession:
         """
         Connects to an MCP server on-demand if not already connected.
         Uses StdioServerParameters to launch the subprocess.
+        Concurrent callers for the same server share a single launch.
         """
         if server_name in self.sessions:
             return self.sessions[server_name]
@@ -28,86 +203,340 @@ class MCPRuntime:
         if server_name not in self.configs:
             raise ValueError(f"MCP Server '{server_name}' not found in manifest.")
 
-        config = self.configs[server_name]
-        
-        # Configure the subprocess parameters
-        server_params = StdioServerParameters(
-            command=config.command,
-            args=config.args,
-            env={**os.environ, **(config.env or {})}
-        )
+        lock = self._locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            if server_name in self.sessions:
+                return self.sessions[server_name]
+            failure = self._startup_failures.get(server_name)
+            if failure and time.monotonic() - failure[0] < STARTUP_RETRY_AFTER:
+                raise failure[1]
+
+            ready = asyncio.get_running_loop().create_future()
+            stop = asyncio.Event()
+            task = asyncio.create_task(self._host_server(self.configs[server_name], ready, stop))
+            self._hosts[server_name] = (task, stop)
+            timeout = self.startup_timeout(server_name)
+
+            try:
+                with span("mcp.spawn", server=server_name, command=self.configs[server_name].command):
+                    session = await asyncio.wait_for(ready, timeout)
+            except BaseException as e:
+                self._hosts.pop(server_name, None)
+                stop.set()
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError(f"MCP server '{server_name}' did not start within {timeout:g}s.")
+                if isinstance(e, Exception):
+                    self._startup_failures[server_name] = (time.monotonic(), e)
+                    raise e
+                raise
+
+            self._startup_failures.pop(server_name, None)
+            self.sessions[server_name] = session
+            return session
+
+    async def start_server(self, server_name: str):
+        """Launches a server (or, with a pool, has the pool launch it) without calling a tool."""
+        if self.pool and server_name in self.configs:
+            try:
+                await self.pool.list_tools(self.configs[server_name])
+                return
+            except OSError:
+                self.pool = None
+        await self._get_session(server_name)
+
+    async def prewarm(self, server_names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """
+        Starts servers concurrently (all declared ones by default) so that spawn, package
+        resolution and initialization are off the critical path of the first tool calls.
+        Returns each server's startup error, or None if it is ready.
+        """
+        names = list(dict.fromkeys(name for name in (server_names or self.configs) if name in self.configs))
+
+        async def warm(name: str) -> Optional[str]:
+            try:
+                await self.start_server(name)
+            except Exception as e:
+                return str(e) or type(e).__name__
+            return None
 
-        # Use the AsyncExitStack to ensure the stdio transport is closed later
-        transport_ctx = stdio_client(server_params)
-        read_stream, write_stream = await self.exit_stack.enter_async_context(transport_ctx)
-        
-        session = await self.exit_stack.enter_async_context(ClientSession(read_stream, write_stream))
-        await session.initialize()
-        
-        self.sessions[server_name] = session
-        return session
+        with span("mcp.prewarm", servers=len(names)):
+            errors = await asyncio.gather(*(warm(name) for name in names))
+        return dict(zip(names, errors))
 
-    async def call_tool(self, server_name: str, tool_name: str, tool_args: Dict[str, Any]) -> str:
+    async def call_tool(
+        self, server_name: str, tool_name: str, tool_args: Dict[str, Any], timeout: Optional[float] = None
+    ) -> str:
         """
         Executes a specific tool call on a managed MCP server.
         Returns the text result of the tool execution.
+        `timeout` overrides the server's call_timeout for this call.
         """
+        with span("mcp.call_tool", server=server_name, tool=tool_name) as s:
+            result = await self._via_pool(
+                server_name, lambda pool, config: pool.call_tool(config, tool_name, tool_args, timeout)
+            )
+            if result is None:
+                try:
+                    result = render_text(await self._call_tool(server_name, tool_name, tool_args, timeout), tool_name)
+                except MCPToolError as e:
+                    result = str(e)
+            s.set(bytes_received=len(result.encode("utf-8")))
+            return result
+
+    async def call_tool_parts(
+        self, server_name: str, tool_name: str, tool_args: Dict[str, Any], timeout: Optional[float] = None
+    ) -> List[ContentPart]:
+        """
+        Executes a tool call and returns its result as typed parts (see `result_parts`),
+        so binary and structured content survives. Raises MCPToolError if the call failed.
+        `timeout` overrides the server's call_timeout for this call.
+        """
+        with span("mcp.call_tool", server=server_name, tool=tool_name) as s:
+            parts = await self._via_pool(
+                server_name, lambda pool, config: pool.call_tool_parts(config, tool_name, tool_args, timeout)
+            )
+            if parts is None:
+                parts = await self._call_tool(server_name, tool_name, tool_args, timeout)
+            s.set(bytes_received=sum(part.size for part in parts))
+            return parts
+
+    async def _via_pool(self, server_name: str, call) -> Any:
+        """Runs `call(pool, config)` on the persistent pool; None if the call must run locally."""
+        if self.pool and server_name in self.configs:
+            try:
+                return await call(self.pool, self.configs[server_name])
+            except OSError:
+                # The pool went away mid-assembly; launch servers locally from here on
+                self.pool = None
+        return None
+
+    async def _call_tool(
+        self, server_name: str, tool_name: str, tool_args: Dict[str, Any], timeout: Optional[float] = None
+    ) -> List[ContentPart]:
+        """
+        Runs a call on the local session with a timeout. A call that times out is cancelled
+        and the server restarted, since a wedged stdio server would hold every later call.
+        Idempotent tools are retried with backoff after timeouts and transport failures;
+        errors the server itself reports (McpError, isError results) are not retried.
+        Raises MCPToolError once the call has failed for good.
+        """
+        timeout = timeout or self.call_timeout(server_name)
+        attempt = 0
+        while True:
+            try:
+                session = await self._get_session(server_name)
+            except Exception as e:
+                # The server did not start (a startup timeout is a TimeoutError too); the
+                # failure is remembered by _get_session, so neither retry nor restart here
+                error = f"Error calling MCP tool '{tool_name}' on server '{server_name}': {str(e)}"
+                break
+            if attempt == 0:
+                await self._annotate(server_name, session)
+            try:
+                # Calls share the session; up to max_in_flight requests are outstanding at once
+                async with self.call_slots(server_name):
+                    result = await self._session_call(server_name, session, tool_name, tool_args, timeout)
+                if not result.isError:
+                    return result_parts(result)
+                # The tool ran and reported a failure; running it again would not help
+                error = f"Error calling MCP tool '{tool_name}' on server '{server_name}': {render_text(result_parts(result), tool_name)}"
+                break
+            except asyncio.TimeoutError:
+                error = f"Error calling MCP tool '{tool_name}' on server '{server_name}': timed out after {timeout:g}s"
+                await self.restart_server(server_name, session)
+            except McpError as e:
+                error = f"Error calling MCP tool '{tool_name}' on server '{server_name}': {str(e)}"
+                break
+            except Exception as e:
+                error = f"Error calling MCP tool '{tool_name}' on server '{server_name}': {str(e)}"
+                # The transport failed (e.g. the process died); relaunch before any retry
+                await self.restart_server(server_name, session)
+            if attempt >= self.retries(server_name, tool_name):
+                break
+            await asyncio.sleep(min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) * random.uniform(0.5, 1.0))
+            attempt += 1
+        raise MCPToolError(error)
+
+    async def _annotate(self, server_name: str, session: ClientSession):
+        """
+        Learns which tools a server marks read-only or idempotent before its first call.
+        Items that name their mcp_server skip discovery, so list_tools may not have run yet.
+        If listing fails, only the configured idempotent_tools are retried.
+        """
+        try:
+            await asyncio.shield(self._listing(server_name, session))
+        except Exception:
+            pass
+
+    def _listing(self, server_name: str, session: ClientSession) -> asyncio.Future:
+        """The server's list_tools request: started once and shared; a failed one is tried again."""
+        listing = self._listings.get(server_name)
+        if listing is None or (listing.done() and (listing.cancelled() or listing.exception() is not None)):
+            listing = self._listings[server_name] = asyncio.ensure_future(self._list_tools(server_name, session))
+        return listing
+
+    async def _list_tools(self, server_name: str, session: ClientSession) -> List[str]:
+        try:
+            tools_result = await asyncio.wait_for(session.list_tools(), self.call_timeout(server_name))
+        except asyncio.TimeoutError:
+            await self.restart_server(server_name, session)
+            raise TimeoutError(f"MCP server '{server_name}' did not list its tools within {self.call_timeout(server_name):g}s.")
+        for tool in tools_result.tools:
+            hints = getattr(tool, "annotations", None)
+            if hints is not None and (getattr(hints, "readOnlyHint", None) is True or getattr(hints, "idempotentHint", None) is True):
+                self._idempotent.add((server_name, tool.name))
+        return [t.name for t in tools_result.tools]
+
+    async def _session_call(
+        self, server_name: str, session: ClientSession, tool_name: str, tool_args: Dict[str, Any], timeout: float
+    ) -> Any:
+        """
+        One request on a shared session. The request is registered with its server, so a
+        restart triggered by another call fails it at once instead of leaving it to time out.
+        """
+        call = asyncio.ensure_future(session.call_tool(tool_name, arguments=tool_args))
+        calls = self._calls.setdefault(server_name, set())
+        calls.add(call)
         try:
-            session = await self._get_session(server_name)
-            result = await session.call_tool(tool_name, arguments=tool_args)
-            
-            # MCP results can contain multiple content types; we extract the text
-            text_outputs = [
-                content.text for content in result.content 
-                if hasattr(content, 'text') and content.text
-            ]
-            
-            if not text_outputs:
-                return f"Warning: Tool '{tool_name}' returned no text content."
-                
-            return "\n".join(text_outputs)
-            
-        except Exception as e:
-            return f"Error calling MCP tool '{tool_name}' on server '{server_name}': {str(e)}"
+            done, _ = await asyncio.wait({call}, timeout=timeout)
+        finally:
+            calls.discard(call)
+            if not call.done():
+                call.cancel()
+        if not done:
+            raise asyncio.TimeoutError()
+        if call.cancelled():
+            raise ConnectionResetError(f"MCP server '{server_name}' was restarted while the call was in flight")
+        return call.result()
+
+    async def restart_server(self, server_name: str, session: Optional[ClientSession] = None):
+        """
+        Stops a server whose session is wedged; the next call launches a fresh process.
+        With `session`, does nothing if the server was already restarted by another call.
+        """
+        if session is not None and self.sessions.get(server_name) is not session:
+            return
+        await self.close_server(server_name)
+
+    async def call_tools(self, server_name: str, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Executes a batch of (tool name, args) calls on one server, pipelined on its
+        session up to the server's in-flight limit. Results are returned in call order.
+        """
+        return list(await asyncio.gather(
+            *(self.call_tool(server_name, tool_name, tool_args) for tool_name, tool_args in calls)
+        ))
+
+    async def list_tool_names(self, server_name: str) -> List[str]:
+        if self.pool and server_name in self.configs:
+            try:
+                return await self.pool.list_tools(self.configs[server_name])
+            except OSError:
+                self.pool = None
+        session = await self._get_session(server_name)
+        return list(await asyncio.shield(self._listing(server_name, session)))
+
+    async def build_tool_index(self) -> Dict[str, str]:
+        """
+        Lists the tools of every not-yet-indexed server in parallel and records
+        which server provides each tool. When two servers expose the same tool,
+        the one declared first in the manifest wins.
+        """
+        async with self._index_lock:
+            pending = [name for name in self.configs if name not in self._indexed]
+            if pending:
+                with span("mcp.index", servers=len(pending)):
+                    results = await asyncio.gather(
+                        *(self.list_tool_names(name) for name in pending), return_exceptions=True
+                    )
+                for name, tool_names in zip(pending, results):
+                    self._indexed.add(name)
+                    # If a server fails to list tools, it simply provides nothing
+                    if isinstance(tool_names, BaseException):
+                        continue
+                    for tool_name in tool_names:
+                        self.tool_index.setdefault(tool_name, name)
+        return self.tool_index
 
     async def discover_server_for_tool(self, tool_name: str) -> Optional[str]:
         """
         Identifies which of the defined servers provides the requested tool.
         This enables 'Auto-Routing' for tools like firecrawl_scrape.
+        The index is built on first use, so later lookups are a dict hit.
         """
-        for name in self.configs.keys():
-            try:
-                session = await self._get_session(name)
-                tools_result = await session.list_tools()
-                if any(t.name == tool_name for t in tools_result.tools):
-                    return name
-            except Exception:
-                # If a server fails to list tools, we move to the next one
-                continue
-        return None
+        if tool_name not in self.tool_index:
+            await self.build_tool_index()
+        return self.tool_index.get(tool_name)
+
+    async def close_server(self, server_name: str):
+        """
+        Stops a single server and forgets its session and routing entries.
+        The next call for it launches a fresh process.
+        """
+        host = self._hosts.pop(server_name, None)
+        self.sessions.pop(server_name, None)
+        self._startup_failures.pop(server_name, None)
+        self._listings.pop(server_name, None)
+        # Requests on the old session would never be answered; fail them now
+        for call in self._calls.pop(server_name, set()):
+            call.cancel()
+        self._indexed.discard(server_name)
+        self.tool_index = {tool: name for tool, name in self.tool_index.items() if name != server_name}
+
+        if host:
+            task, stop = host
+            stop.set()
+            # A server that does not exit in time is killed by cancelling its host task
+            await asyncio.wait({task}, timeout=SHUTDOWN_GRACE)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
 
     async def shutdown(self):
         """
         Closes all active server sessions and transports.
         """
-        await self.exit_stack.aclose()
+        hosts = list(self._hosts.values())
+        self._hosts.clear()
         self.sessions.clear()
 
-async def execute_mcp_item(runtime: MCPRuntime, item: Any) -> str:
-    """
-    Helper to route a ContextManifestItem to the correct MCP server and tool.
-    """
+        for _, stop in hosts:
+            stop.set()
+        await asyncio.gather(*(task for task, _ in hosts), return_exceptions=True)
+
+async def route_mcp_item(runtime: MCPRuntime, item: Any) -> Tuple[Optional[str], Optional[str]]:
+    """Finds the server for a ContextManifestItem. Returns (server name, None) or (None, error)."""
     if not item.mcp_tool_name:
-        return "Error: No MCP tool name provided for this context item."
+        return None, "Error: No MCP tool name provided for this context item."
 
-    # Look up which server provides this tool
-    server_name = await runtime.discover_server_for_tool(item.mcp_tool_name)
+    # An explicit server skips discovery; otherwise look up which server provides this tool
+    server_name = getattr(item, "mcp_server", None) or await runtime.discover_server_for_tool(item.mcp_tool_name)
 
     if not server_name:
-        return f"Error: No MCP servers found that provide the tool '{item.mcp_tool_name}'."
+        return None, f"Error: No MCP servers found that provide the tool '{item.mcp_tool_name}'."
+    return server_name, None
+
+async def execute_mcp_item_parts(runtime: MCPRuntime, item: Any) -> List[ContentPart]:
+    """Like `execute_mcp_item`, but returns the result as typed parts. Raises MCPToolError on failure."""
+    server_name, error = await route_mcp_item(runtime, item)
+    if error:
+        raise MCPToolError(error)
+    return await runtime.call_tool_parts(
+        server_name, item.mcp_tool_name, item.mcp_tool_args or {}, getattr(item, "mcp_timeout", None)
+    )
+
+async def execute_mcp_item(runtime: MCPRuntime, item: Any) -> str:
+    """
+    Helper to route a ContextManifestItem to the correct MCP server and tool.
+    """
+    server_name, error = await route_mcp_item(runtime, item)
+    if error:
+        return error
 
     return await runtime.call_tool(
         server_name=server_name,
         tool_name=item.mcp_tool_name,
-        tool_args=item.mcp_tool_args or {}
+        tool_args=item.mcp_tool_args or {},
+        timeout=getattr(item, "mcp_timeout", None),
     )
\ No newline at end of file
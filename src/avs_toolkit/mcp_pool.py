@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .mcp_client import (
+    DEFAULT_CALL_TIMEOUT, DEFAULT_STARTUP_TIMEOUT, DEFAULT_TOOL_RETRIES, RETRY_MAX_DELAY, MCPRuntime, MCPToolError
+)
+from .models import ContentPart, MCPServerConfig
+
+# Large enough for a request line carrying big tool arguments
+STREAM_LIMIT = 64 * 1024 * 1024
+DEFAULT_TCP_PORT = 47813
+# Time a request that does no tool work (ping, status, shutdown) gets to be answered
+CONTROL_TIMEOUT = 5.0
+# Slack on top of the pool's own startup and call limits before a pool is deemed wedged
+REQUEST_MARGIN = 30.0
+
+def default_socket_path() -> Path:
+    """Location of the pool socket. Override with AVS_MCP_POOL_SOCKET."""
+    return Path(os.getenv("AVS_MCP_POOL_SOCKET", Path.home() / ".avs" / "mcp-pool.sock"))
+
+def supports_unix_sockets() -> bool:
+    return hasattr(asyncio, "start_unix_server")
+
+def token_path(socket_path: Path) -> Path:
+    """
+    Where a pool listening on TCP keeps the secret its clients must send. Any local user
+    can reach a TCP port, so only the file's owner (mode 0600) can talk to the pool.
+    """
+    return socket_path.with_suffix(".token")
+
+def write_token(path: Path, token: str):
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with open(fd, "w") as f:
+        f.write(token)
+
+def read_token(path: Path) -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return ""
+
+def config_key(config: MCPServerConfig) -> str:
+    """
+    Identity of a server in the pool: a hash of its launch command, args and env.
+    Two stories declaring the same server under different names share one process.
+    """
+    identity = json.dumps(
+        {"command": config.command, "args": config.args, "env": config.env or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+def call_deadline(config: MCPServerConfig, timeout: Optional[float] = None) -> float:
+    """The longest the pool can legitimately take over one tool call: startup, then every attempt and backoff."""
+    retries = DEFAULT_TOOL_RETRIES if config.retries is None else config.retries
+    timeout = timeout or config.call_timeout or DEFAULT_CALL_TIMEOUT
+    startup = config.startup_timeout or DEFAULT_STARTUP_TIMEOUT
+    return startup + (retries + 1) * timeout + retries * RETRY_MAX_DELAY + REQUEST_MARGIN
+
+async def _open_connection(socket_path: Path):
+    if supports_unix_sockets():
+        return await asyncio.open_unix_connection(str(socket_path), limit=STREAM_LIMIT)
+    port = int(os.getenv("AVS_MCP_POOL_PORT", DEFAULT_TCP_PORT))
+    return await asyncio.open_connection("127.0.0.1", port, limit=STREAM_LIMIT)
+
+class PoolClient:
+    """
+    Client side of the persistent MCP pool.
+    Each request opens a short-lived local connection, so concurrent callers never share a stream.
+    Raises OSError when the pool is not reachable or does not answer in time (TimeoutError),
+    so a wedged pool sends callers back to ephemeral launches.
+    """
+    def __init__(self, socket_path: Optional[Path] = None):
+        self.socket_path = socket_path or default_socket_path()
+
+    async def request(self, payload: Dict[str, Any], timeout: float = CONTROL_TIMEOUT) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(self._request(payload), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"MCP pool did not answer within {timeout:g}s.") from None
+
+    async def _request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not supports_unix_sockets():
+            payload = {**payload, "token": read_token(token_path(self.socket_path))}
+        reader, writer = await _open_connection(self.socket_path)
+        try:
+            writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        if not raw:
+            raise ConnectionResetError("MCP pool closed the connection without a reply.")
+        return json.loads(raw)
+
+    async def ping(self) -> bool:
+        try:
+            return (await self.request({"op": "ping"})).get("ok", False)
+        except (OSError, ValueError):
+            return False
+
+    async def call_tool(
+        self, config: MCPServerConfig, tool_name: str, tool_args: Dict[str, Any], timeout: Optional[float] = None
+    ) -> str:
+        response = await self.request({
+            "op": "call_tool", "server": config.model_dump(), "tool": tool_name, "args": tool_args, "timeout": timeout,
+        }, call_deadline(config, timeout))
+        return response.get("result", "")
+
+    async def call_tool_parts(
+        self, config: MCPServerConfig, tool_name: str, tool_args: Dict[str, Any], timeout: Optional[float] = None
+    ) -> List[ContentPart]:
+        response = await self.request({
+            "op": "call_tool", "server": config.model_dump(), "tool": tool_name, "args": tool_args,
+            "parts": True, "timeout": timeout,
+        }, call_deadline(config, timeout))
+        if not response.get("ok"):
+            raise MCPToolError(response.get("error", f"MCP pool failed to call '{tool_name}'."))
+        if "parts" in response:
+            return [ContentPart(**part) for part in response["parts"]]
+        # A pool started by an older toolkit only answers with text
+        text = response.get("result", "")
+        return [ContentPart(type="text", text=text, size=len(text.encode("utf-8")))]
+
+    async def list_tools(self, config: MCPServerConfig) -> List[str]:
+        response = await self.request({"op": "list_tools", "server": config.model_dump()}, call_deadline(config))
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "MCP pool failed to list tools."))
+        return response.get("tools", [])
+
+    async def status(self) -> Dict[str, Any]:
+        return await self.request({"op": "status"})
+
+    async def stop(self) -> Dict[str, Any]:
+        return await self.request({"op": "shutdown"})
+
+async def connect_pool(socket_path: Optional[Path] = None) -> Optional[PoolClient]:
+    """Returns a PoolClient if a pool is running, otherwise None (use ephemeral launches)."""
+    client = PoolClient(socket_path)
+    return client if await client.ping() else None
+
+class MCPPool:
+    """
+    Long-lived host that keeps MCP server sessions warm across assemblies.
+    Servers are keyed by config_key(), evicted after `idle_timeout` seconds without use,
+    and pinged every `health_interval` seconds; a server that fails its ping is
+    closed so the next call respawns it.
+    """
+    def __init__(self, idle_timeout: float = 600.0, health_interval: float = 30.0, ping_timeout: float = 10.0):
+        self.runtime = MCPRuntime([])
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.last_used: Dict[str, float] = {}
+        self.started_at = time.time()
+        self._stopped = asyncio.Event()
+        # Set when listening on TCP: every request must carry it
+        self.token: Optional[str] = None
+
+    def _register(self, server: Dict[str, Any]) -> str:
+        config = MCPServerConfig(**server)
+        key = config_key(config)
+        if key not in self.runtime.configs:
+            self.runtime.configs[key] = config.model_copy(update={"name": key})
+        self.last_used[key] = time.monotonic()
+        return key
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True}
+
+        if op == "call_tool":
+            key = self._register(request["server"])
+            if request.get("parts"):
+                parts = await self.runtime.call_tool_parts(
+                    key, request["tool"], request.get("args") or {}, request.get("timeout")
+                )
+                response = {"ok": True, "parts": [part.model_dump(exclude_none=True) for part in parts]}
+            else:
+                result = await self.runtime.call_tool(key, request["tool"], request.get("args") or {}, request.get("timeout"))
+                response = {"ok": True, "result": result}
+            self.last_used[key] = time.monotonic()
+            return response
+
+        if op == "list_tools":
+            key = self._register(request["server"])
+            try:
+                tools = await self.runtime.list_tool_names(key)
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "tools": tools}
+
+        if op == "status":
+            now = time.monotonic()
+            servers = [
+                {
+                    "key": key,
+                    "command": " ".join([config.command, *config.args]),
+                    "running": key in self.runtime.sessions,
+                    "idle_seconds": round(now - self.last_used.get(key, now), 1),
+                }
+                for key, config in self.runtime.configs.items()
+            ]
+            return {"ok": True, "pid": os.getpid(), "uptime_seconds": round(time.time() - self.started_at, 1), "servers": servers}
+
+        if op == "shutdown":
+            self._stopped.set()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"Unknown pool operation '{op}'."}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            if line:
+                try:
+                    request = json.loads(line)
+                    if self.token is not None and not hmac.compare_digest(
+                        str(request.get("token", "")).encode("utf-8"), self.token.encode("utf-8")
+                    ):
+                        response = {"ok": False, "error": "Unauthorized: missing or wrong pool token."}
+                    else:
+                        response = await self.handle(request)
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response).encode("utf-8"))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def check_health(self):
+        """Evicts idle servers and closes any running server that fails to answer a ping."""
+        now = time.monotonic()
+        for key in list(self.runtime.sessions):
+            if now - self.last_used.get(key, now) > self.idle_timeout:
+                await self.runtime.close_server(key)
+                continue
+            try:
+                await asyncio.wait_for(self.runtime.sessions[key].send_ping(), self.ping_timeout)
+            except Exception:
+                await self.runtime.close_server(key)
+
+    async def _maintenance(self):
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.health_interval)
+            except asyncio.TimeoutError:
+                await self.check_health()
+
+    async def serve(self, socket_path: Optional[Path] = None):
+        """
+        Listens on the local socket until a shutdown request arrives. The socket is only
+        accessible to its owner (0600, in a 0700 directory when the pool creates it); on TCP,
+        requests must carry the token from token_path().
+        """
+        socket_path = socket_path or default_socket_path()
+        socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if supports_unix_sockets():
+            if socket_path.exists():
+                if await PoolClient(socket_path).ping():
+                    raise RuntimeError(f"An MCP pool is already running at {socket_path}.")
+                socket_path.unlink()
+            server = await asyncio.start_unix_server(self._handle_connection, str(socket_path), limit=STREAM_LIMIT)
+            os.chmod(socket_path, 0o600)
+        else:
+            port = int(os.getenv("AVS_MCP_POOL_PORT", DEFAULT_TCP_PORT))
+            # Required from the first connection; published only once the port is ours
+            self.token = secrets.token_hex(32)
+            server = await asyncio.start_server(self._handle_connection, "127.0.0.1", port, limit=STREAM_LIMIT)
+            write_token(token_path(socket_path), self.token)
+
+        maintenance = asyncio.create_task(self._maintenance())
+        try:
+            async with server:
+                await self._stopped.wait()
+        finally:
+            maintenance.cancel()
+            await asyncio.gather(maintenance, return_exceptions=True)
+            await self.runtime.shutdown()
+            if supports_unix_sockets() and socket_path.exists():
+                socket_path.unlink()
+            if self.token is not None:
+                token_path(socket_path).unlink(missing_ok=True)
+
+def spawn_background_pool(idle_timeout: float, health_interval: float, socket_path: Optional[Path] = None) -> int:
+    """Starts `avs mcp-pool start` as a detached process and returns its PID."""
+    import subprocess
+
+    socket_path = socket_path or default_socket_path()
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # The child keeps its own handle on the log; the parent's is closed once it is spawned
+    with open(socket_path.with_suffix(".log"), "ab") as log_file:
+        process = subprocess.Popen(
+            [
+                sys.executable, "-m", "avs_toolkit.main", "mcp-pool", "start",
+                "--idle-timeout", str(idle_timeout),
+                "--health-interval", str(health_interval),
+                "--socket", str(socket_path),
+            ],
+            stdout=log_file,
+            stderr=log_file,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    return process.pid
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+TRUNCATION_POLICIES = ("head", "tail", "drop", "never")
+
 class Metadata(BaseModel):
     """
     Administrative tracking for the Value Story.
@@ -12,6 +14,10 @@ class Metadata(BaseModel):
     author: Optional[str] = Field(None, description="The Human Architect who designed this story.")
     status: str = Field("draft", description="Lifecycle status: draft, active, or archived.")
     provider: str = Field("ollama", description="The LLM backend provider (e.g., ollama, google-gemini).")
+    fallback_providers: List[str] = Field(
+        default_factory=list,
+        description="Providers tried in order when the primary fails, as 'provider' or 'provider:model' (e.g., ollama:llama3.1)."
+    )
     preferred_model: Optional[str] = Field(
         None, 
         description="The recommended LLM (e.g., llama3, gemma2:27b) for this specific logic."
@@ -21,6 +27,14 @@ class Metadata(BaseModel):
         description="ISO timestamp added during assembly. Indicates the 'Briefcase' is ready."
     )
 
+    @field_validator('fallback_providers', mode='before')
+    @classmethod
+    def split_fallback_providers(cls, v):
+        """Accepts a comma-separated string as well as a list."""
+        if isinstance(v, str):
+            return [entry.strip() for entry in v.split(",") if entry.strip()]
+        return v or []
+
 class Goal(BaseModel):
     """
     The 'North Star' of the Value Story.
@@ -56,6 +70,22 @@ class Instructions(BaseModel):
     )
     execution_steps: List[InstructionStep] = Field(..., description="List of granular actions.")
 
+class ContentPart(BaseModel):
+    """
+    One typed part of an MCP tool result (image, audio, resource or structured content).
+    Binary data is carried base64-encoded until assembly moves it to a sidecar blob.
+    """
+    type: str = Field(..., description="'text', 'image', 'audio', 'resource', 'resource_link' or 'structured'.")
+    mime_type: Optional[str] = Field(None, description="MIME type reported by the server.")
+    uri: Optional[str] = Field(None, description="URI of an embedded or linked resource.")
+    text: Optional[str] = Field(None, description="Inline text (text parts, text resources, structured JSON).")
+    data: Optional[str] = Field(None, description="Base64 data of a binary part that has not been stored yet.")
+    ref: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Sidecar blob holding the part's data or large text (path relative to the briefcase, size, sha256)."
+    )
+    size: int = Field(0, description="Size of the part's data or text in bytes.")
+
 class ContextManifestItem(BaseModel):
     """
     A single asset requirement.
@@ -67,7 +97,47 @@ class ContextManifestItem(BaseModel):
     search_query: Optional[str] = Field(None, description="Grounding query for live web research.")
     mcp_tool_name: Optional[str] = Field(None, description="MCP tool name to invoke (e.g., 'scrape').")
     mcp_tool_args: Optional[Dict[str, Any]] = Field(None, description="Arguments for the MCP tool.")
+    mcp_server: Optional[str] = Field(
+        None,
+        description="Name of the MCP server providing the tool. Skips tool discovery when set."
+    )
+    mcp_timeout: Optional[float] = Field(
+        None, gt=0,
+        description="Seconds this MCP tool call may take (overrides the server's call_timeout)."
+    )
+    cache_ttl: Optional[int] = Field(
+        None,
+        description="Seconds a research/MCP result may be reused from the assembly cache (0 disables caching)."
+    )
+    priority: int = Field(
+        0,
+        description="Packing order when the context exceeds the model's budget. Higher priorities are kept first."
+    )
+    truncation: str = Field(
+        "head",
+        description="What to do when the asset does not fit: keep its 'head' or 'tail', 'drop' it, or 'never' (fail the run)."
+    )
     content: Optional[str] = Field(None, description="The actual text of the asset, populated during assembly.")
+    content_ref: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Sidecar blob holding large content instead of `content` (path relative to the briefcase, size, sha256). Set during assembly."
+    )
+    parts: Optional[List[ContentPart]] = Field(
+        None,
+        description="Non-text parts of an MCP result (images, resources, structured content). Set during assembly."
+    )
+    fingerprint: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Inputs the content was gathered from (file stats/hash, query or tool args hash). Set during assembly."
+    )
+
+    @field_validator('truncation')
+    @classmethod
+    def validate_truncation(cls, v: str):
+        """Only the policies understood by the packing stage are accepted."""
+        if v not in TRUNCATION_POLICIES:
+            raise ValueError(f"truncation must be one of {', '.join(TRUNCATION_POLICIES)}.")
+        return v
 
 class MCPServerConfig(BaseModel):
     """Configuration for ephemeral Model Context Protocol servers."""
@@ -75,6 +145,26 @@ class MCPServerConfig(BaseModel):
     command: str = Field(..., description="The launch command (e.g., 'npx', 'uvx').")
     args: List[str] = Field(default_factory=list, description="Launch arguments.")
     env: Optional[Dict[str, str]] = Field(None, description="Environment variables (e.g., API keys).")
+    startup_timeout: Optional[float] = Field(
+        None, gt=0,
+        description="Seconds allowed for launch and initialization (default: AVS_MCP_STARTUP_TIMEOUT or 60)."
+    )
+    max_in_flight: Optional[int] = Field(
+        None, ge=1,
+        description="Maximum concurrent tool calls on one session (default: AVS_MCP_MAX_IN_FLIGHT or 8)."
+    )
+    call_timeout: Optional[float] = Field(
+        None, gt=0,
+        description="Seconds a tool call may take before the server is restarted (default: AVS_MCP_CALL_TIMEOUT or 300)."
+    )
+    retries: Optional[int] = Field(
+        None, ge=0,
+        description="Retries of a failed or timed-out call to an idempotent tool (default: AVS_MCP_RETRIES or 2)."
+    )
+    idempotent_tools: List[str] = Field(
+        default_factory=list,
+        description="Tools that are safe to retry, in addition to those the server marks read-only or idempotent."
+    )
 
 class Product(BaseModel):
     """Defines the deliverable and the handoff mechanism."""
@@ -117,9 +207,26 @@ class ValueStory(BaseModel):
                 "Context Manifest contains MCP tool calls, but no 'mcp_servers' are defined. "
                 "The Agent will have 'Context Blindness' for these items."
             )
+        server_names = {server.name for server in self.mcp_servers}
+        for item in self.context_manifest:
+            if item.mcp_server and item.mcp_server not in server_names:
+                raise ValueError(
+                    f"Context item '{item.key or item.mcp_tool_name}' targets MCP server "
+                    f"'{item.mcp_server}', which is not defined in 'mcp_servers'."
+                )
         return self
 
     @property
     def is_assembled(self) -> bool:
         """Determines if the story has already been packaged with context."""
-        return self.metadata.assembled_at is not None
\ No newline at end of file
+        return self.metadata.assembled_at is not None
+
+class AssemblyLimits(BaseModel):
+    """
+    Concurrency budget for the Information Hunt.
+    Caps how many context items are gathered at once, overall and per source type.
+    """
+    total: int = Field(16, ge=1, description="Maximum context items gathered concurrently.")
+    mcp: int = Field(16, ge=1, description="Maximum concurrent MCP tool calls (each server also caps its own).")
+    research: int = Field(4, ge=1, description="Maximum concurrent web research queries.")
+    files: int = Field(16, ge=1, description="Maximum concurrent local file reads.")
@@ -0,0 +1,175 @@
+import math
+import os
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from rich.console import Console
+
+console = Console()
+
+# Conservative local estimate (real tokenizers average ~4 characters per token on prose),
+# so a packed context errs on the side of fitting.
+CHARS_PER_TOKEN = 3.5
+
+# Input context windows in tokens, matched by longest prefix of the model name.
+# Ollama tags ("gemma2:27b") are matched on the part before the colon.
+MODEL_WINDOWS: Dict[str, int] = {
+    "gemini-2.5": 1_048_576,
+    "gemini-2.0": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-1.5-flash": 1_048_576,
+    "gemini": 1_048_576,
+    "llama3.1": 131_072,
+    "llama3.2": 131_072,
+    "llama3.3": 131_072,
+    "llama3": 8_192,
+    "gemma3": 131_072,
+    "gemma2": 8_192,
+    "gemma": 8_192,
+    "mistral-nemo": 131_072,
+    "mistral": 32_768,
+    "mixtral": 32_768,
+    "qwen2.5": 32_768,
+    "qwen3": 40_960,
+    "phi3": 4_096,
+    "phi4": 16_384,
+    "deepseek-r1": 131_072,
+}
+DEFAULT_WINDOW = 8_192
+
+# Tokens held back for the answer, and the smallest useful excerpt of a trimmed asset
+MAX_OUTPUT_RESERVE = 4_096
+MIN_TRIM_TOKENS = 256
+
+TRUNCATION_MARKER = "\n[... truncated {tokens} tokens to fit the context window ...]\n"
+
+class ContextBudgetError(ValueError):
+    """Raised before any request is sent when the context cannot be packed into the budget."""
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def estimate_blob_tokens(size: int) -> int:
+    # Blob sizes are bytes, which is never less than the character count
+    return math.ceil(size / CHARS_PER_TOKEN)
+
+def context_window(model: str, override: Optional[int] = None) -> int:
+    """The model's input window: an explicit override, AVS_CONTEXT_WINDOW, then the table."""
+    if override:
+        return override
+    if os.getenv("AVS_CONTEXT_WINDOW"):
+        return int(os.getenv("AVS_CONTEXT_WINDOW"))
+    name = (model or "").lower().split(":")[0].split("/")[-1]
+    matches = [prefix for prefix in MODEL_WINDOWS if name.startswith(prefix)]
+    return MODEL_WINDOWS[max(matches, key=len)] if matches else DEFAULT_WINDOW
+
+def output_reserve(window: int) -> int:
+    return min(MAX_OUTPUT_RESERVE, window // 4)
+
+class PackedItem(BaseModel):
+    """The packing decision for one context asset."""
+    index: int = Field(..., description="Position in the context manifest.")
+    label: str
+    tokens: int = Field(..., description="Estimated tokens of the full asset.")
+    kept_tokens: int = Field(0, description="Estimated tokens sent to the model.")
+    action: str = Field("kept", description="kept, trimmed or dropped.")
+    truncation: str = "head"
+
+class ContextPack(BaseModel):
+    """The result of fitting a story's context assets into a model's token budget."""
+    model: str
+    window: int
+    reserve: int
+    fixed_tokens: int = Field(..., description="System prompt and payload framing.")
+    items: List[PackedItem]
+
+    @property
+    def used_tokens(self) -> int:
+        return self.fixed_tokens + sum(item.kept_tokens for item in self.items)
+
+    @property
+    def changed(self) -> List[PackedItem]:
+        return [item for item in self.items if item.action != "kept"]
+
+def item_label(item: dict) -> str:
+    return item.get("key") or item.get("default_path") or item.get("mcp_tool_name") or "context"
+
+def item_tokens(item: dict) -> int:
+    ref = item.get("content_ref")
+    if ref:
+        return estimate_blob_tokens(ref.get("size", 0))
+    return estimate_tokens(item.get("content") or "")
+
+def pack_context(items: List[dict], model: str, fixed_tokens: int, window: Optional[int] = None) -> ContextPack:
+    """
+    Decides how much of each context asset fits the model's window.
+    Assets are admitted by descending `priority` (manifest order breaks ties). An asset that
+    does not fit is trimmed to the remaining budget ('head' keeps its beginning, 'tail' its end),
+    dropped ('drop', or when too little budget is left to trim to), or fails the run ('never').
+    """
+    window = context_window(model, window)
+    reserve = output_reserve(window)
+    remaining = window - reserve - fixed_tokens
+    if remaining <= 0:
+        raise ContextBudgetError(
+            f"The instructions alone (~{fixed_tokens} tokens) exceed the {window}-token window of '{model}'."
+        )
+
+    packed = [
+        PackedItem(index=i, label=item_label(item), tokens=item_tokens(item), truncation=item.get("truncation") or "head")
+        for i, item in enumerate(items)
+    ]
+    order = sorted(packed, key=lambda p: (-(items[p.index].get("priority") or 0), p.index))
+    for entry in order:
+        if entry.tokens <= remaining:
+            entry.kept_tokens = entry.tokens
+        elif entry.truncation == "never":
+            raise ContextBudgetError(
+                f"Context asset '{entry.label}' (~{entry.tokens} tokens) does not fit the {window}-token window "
+                f"of '{model}' ({max(remaining, 0)} tokens left) and its truncation policy is 'never'."
+            )
+        elif entry.truncation in ("head", "tail") and remaining >= MIN_TRIM_TOKENS:
+            entry.kept_tokens = remaining - estimate_tokens(TRUNCATION_MARKER.format(tokens=entry.tokens))
+            entry.action = "trimmed"
+            remaining = 0
+            continue
+        else:
+            entry.action = "dropped"
+        remaining -= entry.kept_tokens
+
+    return ContextPack(model=model, window=window, reserve=reserve, fixed_tokens=fixed_tokens, items=packed)
+
+def num_ctx_for(prompt_tokens: int, reserve: int, window: int) -> int:
+    """Ollama's `num_ctx` for a prompt: its tokens plus the answer reserve, in 2K steps."""
+    return min(window, max(2048, math.ceil((prompt_tokens + reserve) / 2048) * 2048))
+
+def ollama_num_ctx(pack: ContextPack) -> int:
+    return num_ctx_for(pack.used_tokens, pack.reserve, pack.window)
+
+def context_fits(items: List[dict], model: str, fixed_tokens: int, window: Optional[int] = None) -> bool:
+    """True if every asset fits the window whole, without packing."""
+    window = context_window(model, window)
+    return fixed_tokens + sum(item_tokens(item) for item in items) <= window - output_reserve(window)
+
+def trim_text(text: str, entry: PackedItem) -> str:
+    """Cuts an inline asset down to its packed size, marking where text was removed."""
+    keep = int(entry.kept_tokens * CHARS_PER_TOKEN)
+    marker = TRUNCATION_MARKER.format(tokens=entry.tokens - entry.kept_tokens)
+    if entry.truncation == "tail":
+        return marker + text[-keep:]
+    return text[:keep] + marker
+
+def print_pack_report(pack: ContextPack):
+    """Summarizes the packing decisions that changed what the model will see."""
+    console.print(
+        f"[dim]Context packed for {pack.model}: ~{pack.used_tokens:,} of {pack.window:,} tokens "
+        f"({pack.reserve:,} reserved for the answer).[/dim]"
+    )
+    for item in pack.changed:
+        if item.action == "trimmed":
+            console.print(
+                f"  [yellow]✂ Trimmed:[/yellow] {item.label} ~{item.tokens:,} → ~{item.kept_tokens:,} tokens "
+                f"(kept {item.truncation})"
+            )
+        else:
+            console.print(f"  [yellow]✗ Dropped:[/yellow] {item.label} (~{item.tokens:,} tokens)")
@@ -1,5 +1,58 @@
 import re
 import yaml
+from typing import List, Tuple
+from pydantic import BaseModel, Field
+
+from .models import ValueStory
+
+# libyaml's C loader is an order of magnitude faster than the pure-Python one
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Compiled once: fenced ```yaml blocks, any fenced block, and Markdown headers
+YAML_FENCE_RE = re.compile(r'```yaml\s*\n(.*?)\n\s*```', re.DOTALL)
+FENCE_RE = re.compile(r'```[\s\S]*?```')
+HEADER_RE = re.compile(r'^(#+.*)$', re.MULTILINE)
+
+class SourceSpan(BaseModel):
+    """A region of the source document that contributed YAML to the story."""
+    kind: str = Field(..., description="'yaml_block' for fenced blocks, 'document' for hybrid mode.")
+    start_line: int = Field(..., description="1-based first line of the region.")
+    end_line: int = Field(..., description="1-based last line of the region.")
+
+class ParsedStory(BaseModel):
+    """A validated Value Story together with the raw data and spans it was built from."""
+    story: ValueStory
+    data: dict
+    spans: List[SourceSpan] = Field(default_factory=list)
+
+def extract_yaml(content: str) -> Tuple[str, List[SourceSpan]]:
+    """
+    Returns the YAML to parse and the source spans it came from.
+    Fenced ```yaml blocks are collected in a single scan; only documents without
+    any fall back to hybrid mode (code blocks removed, headers commented out).
+    """
+    # --- STRATEGY 1: FENCED YAML BLOCKS ---
+    yaml_blocks = []
+    spans = []
+    position = 0
+    line = 1
+    for match in YAML_FENCE_RE.finditer(content):
+        line += content.count('\n', position, match.start())
+        end_line = line + content.count('\n', match.start(), match.end())
+        yaml_blocks.append(match.group(1))
+        spans.append(SourceSpan(kind="yaml_block", start_line=line, end_line=end_line))
+        line, position = end_line, match.end()
+
+    if yaml_blocks:
+        # Combine content from all YAML blocks in the file
+        return "\n".join(yaml_blocks), spans
+
+    # --- STRATEGY 2: HYBRID FALLBACK ---
+    # 1. Remove entire code blocks (including Architect Guides)
+    clean_yaml = FENCE_RE.sub('', content)
+    # 2. Comment out Markdown headers so they don't break YAML keys
+    clean_yaml = HEADER_RE.sub(r'# \1', clean_yaml)
+    return clean_yaml, [SourceSpan(kind="document", start_line=1, end_line=content.count('\n') + 1)]
 
 def parse_markdown_story(content: str) -> dict:
     """
@@ -11,25 +64,15 @@ def parse_markdown_story(content: str) -> dict:
     """
     # Normalize line endings
     content = content.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # --- STRATEGY 1: FENCED YAML BLOCKS ---
-    # This looks for blocks tagged specifically with 'yaml'
-    yaml_blocks = re.findall(r'```yaml\s*\n(.*?)\n\s*```', content, re.DOTALL)
-    
-    if yaml_blocks:
-        # Combine content from all YAML blocks in the file
-        clean_yaml = "\n".join(yaml_blocks)
-    else:
-        # --- STRATEGY 2: HYBRID FALLBACK ---
-        # 1. Remove entire code blocks (including Architect Guides)
-        clean_yaml = re.sub(r'```[\s\S]*?```', '', content)
-        # 2. Comment out Markdown headers so they don't break YAML keys
-        clean_yaml = re.sub(r'^(#+.*)$', r'# \1', clean_yaml, flags=re.MULTILINE)
-    
+    clean_yaml, _ = extract_yaml(content)
+    return normalize_story_data(clean_yaml)
+
+def normalize_story_data(clean_yaml: str, loader=SafeLoader) -> dict:
+    """Loads story YAML and maps its (possibly legacy) keys onto the ValueStory schema."""
     data = {}
 
     try:
-        yaml_data = yaml.safe_load(clean_yaml)
+        yaml_data = yaml.load(clean_yaml, Loader=loader)
         if isinstance(yaml_data, dict):
             # Metadata extraction
             meta = yaml_data.get('metadata', {})
@@ -39,6 +82,7 @@ def parse_markdown_story(content: str) -> dict:
                 "author": meta.get('author'),
                 "status": meta.get('status', 'draft'),
                 "provider": meta.get('provider', 'ollama'),
+                "fallback_providers": meta.get('fallback_providers') or [],
                 "preferred_model": meta.get('preferred_model'),
                 "assembled_at": meta.get('assembled_at')
             }
@@ -93,7 +137,12 @@ def parse_markdown_story(content: str) -> dict:
                             "default_path": item.get('default_path'),
                             "search_query": item.get('search_query'),
                             "mcp_tool_name": item.get('mcp_tool_name'),
-                            "mcp_tool_args": item.get('mcp_tool_args', {})
+                            "mcp_tool_args": item.get('mcp_tool_args', {}),
+                            "mcp_server": item.get('mcp_server'),
+                            "mcp_timeout": item.get('mcp_timeout'),
+                            "cache_ttl": item.get('cache_ttl'),
+                            "priority": item.get('priority', 0),
+                            "truncation": item.get('truncation', 'head')
                         })
                     else:
                         assets.append({"default_path": str(item)})
@@ -116,4 +165,21 @@ def parse_markdown_story(content: str) -> dict:
         # Fail gracefully if YAML is totally malformed
         pass
 
-    return data
\ No newline at end of file
+    return data
+
+def parse_story(content: str) -> ParsedStory:
+    """
+    Fast-path pipeline: scans a story once and returns it validated, with source spans.
+    Accepts both Markdown stories and assembled YAML briefcases.
+    Raises pydantic.ValidationError (or ValueError) if the story fails governance.
+    """
+    content = content.replace('\r\n', '\n').replace('\r', '\n')
+    if "assembled_at" in content:
+        data = yaml.load(content, Loader=SafeLoader)
+        if not isinstance(data, dict):
+            raise ValueError("Briefcase does not contain a YAML mapping.")
+        spans = [SourceSpan(kind="document", start_line=1, end_line=content.count('\n') + 1)]
+    else:
+        clean_yaml, spans = extract_yaml(content)
+        data = normalize_story_data(clean_yaml)
+    return ParsedStory(story=ValueStory(**data), data=data, spans=spans)
@@ -0,0 +1,164 @@
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .blobs import iter_text, resolve as resolve_blob
+from .packing import CHARS_PER_TOKEN, TRUNCATION_MARKER, ContextPack, PackedItem, estimate_tokens, trim_text
+
+# Stands in for the payload while the rest of a request body is encoded
+PAYLOAD_MARKER = "__AVS_PROMPT_PAYLOAD__"
+
+class BlobSlice(NamedTuple):
+    """A byte range of a sidecar blob (the whole blob when end is None)."""
+    path: Path
+    start: int = 0
+    end: Optional[int] = None
+
+class PromptPayload:
+    """
+    A user payload made of text segments and sidecar blobs. Blob contents are read from
+    memory maps only when the payload is sent, so the whole context is never held as one string.
+    """
+
+    def __init__(self):
+        self.segments: List[Union[str, BlobSlice]] = []
+
+    def append(self, text: str):
+        self.segments.append(text)
+
+    def append_blob(self, path: Path, start: int = 0, end: Optional[int] = None):
+        self.segments.append(BlobSlice(Path(path), start, end))
+
+    @property
+    def has_blobs(self) -> bool:
+        return any(isinstance(segment, BlobSlice) for segment in self.segments)
+
+    def size(self) -> int:
+        """Characters of text plus bytes of blob ranges, without reading the blobs."""
+        total = 0
+        for segment in self.segments:
+            if isinstance(segment, BlobSlice):
+                end = segment.path.stat().st_size if segment.end is None else segment.end
+                total += max(end - segment.start, 0)
+            else:
+                total += len(segment)
+        return total
+
+    def chunks(self) -> Iterator[str]:
+        for segment in self.segments:
+            if isinstance(segment, BlobSlice):
+                yield from iter_text(segment.path, start=segment.start, end=segment.end)
+            elif segment:
+                yield segment
+
+    def __str__(self) -> str:
+        return "".join(self.chunks())
+
+def as_text(user_payload: Union[str, PromptPayload]) -> str:
+    """Materializes a payload for code paths that need a plain string."""
+    return user_payload if isinstance(user_payload, str) else str(user_payload)
+
+def _encode(body: Dict[str, Any]) -> Tuple[str, Optional[PromptPayload]]:
+    """Encodes a body as JSON with any PromptPayload replaced by a marker, and returns that payload."""
+    found: List[PromptPayload] = []
+
+    def placeholder(o):
+        if isinstance(o, PromptPayload):
+            found.append(o)
+            return PAYLOAD_MARKER
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    encoded = json.dumps(body, ensure_ascii=False, default=placeholder)
+    if len(found) > 1:
+        raise ValueError("A request body can stream only one PromptPayload.")
+    return encoded, (found[0] if found else None)
+
+async def stream_json(encoded: str, user_payload: PromptPayload) -> AsyncIterator[bytes]:
+    """Streams an encoded body, writing the payload's chunks where its marker stands."""
+    head, tail = encoded.split(json.dumps(PAYLOAD_MARKER), 1)
+    yield f'{head}"'.encode("utf-8")
+    for chunk in user_payload.chunks():
+        yield json.dumps(chunk, ensure_ascii=False)[1:-1].encode("utf-8")
+    yield f'"{tail}'.encode("utf-8")
+
+class JSONStream:
+    """A streamed request body that starts over on each iteration, so a retried request can resend it."""
+
+    def __init__(self, encoded: str, user_payload: PromptPayload):
+        self.encoded = encoded
+        self.user_payload = user_payload
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return stream_json(self.encoded, self.user_payload)
+
+def json_request(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    httpx keyword arguments that send `body` as JSON. A PromptPayload inside the body is
+    streamed with chunked transfer encoding; any other body is an ordinary `json=` body.
+    """
+    encoded, user_payload = _encode(body)
+    if user_payload is None:
+        return {"json": body}
+    return {"content": JSONStream(encoded, user_payload), "headers": {"Content-Type": "application/json"}}
+
+PAYLOAD_HEADER = "CONTEXT ASSETS:\n"
+PAYLOAD_FOOTER = "\n\nBased on the context above, produce the final product now."
+
+def display_name(item: dict) -> str:
+    # FIX: Handle cases where default_path is None (e.g., Web Research tasks)
+    raw_path = item.get('default_path')
+    if raw_path:
+        return Path(raw_path).name
+    # Fallback to key or search query snippet for the label
+    return item.get('key') or "Web-Research-Result"
+
+def framing_tokens(story: dict, system_prompt: str) -> int:
+    """Estimated tokens of everything sent besides the context contents."""
+    framing = PAYLOAD_HEADER + PAYLOAD_FOOTER + "".join(
+        f"--- START {display_name(item)} ---\n\n--- END ---\n" for item in story['context_manifest']
+    )
+    return estimate_tokens(system_prompt) + estimate_tokens(framing)
+
+def append_content(payload: PromptPayload, item: dict, briefcase_path: Path, entry: Optional[PackedItem] = None):
+    """Adds one asset's content, cut down to its packed size when the pack trimmed it."""
+    trimmed = entry is not None and entry.action == "trimmed"
+    ref = item.get('content_ref')
+    if ref:
+        path = resolve_blob(ref, briefcase_path)
+        if not trimmed:
+            payload.append_blob(path)
+            return
+        keep = int(entry.kept_tokens * CHARS_PER_TOKEN)
+        marker = TRUNCATION_MARKER.format(tokens=entry.tokens - entry.kept_tokens)
+        if entry.truncation == "tail":
+            payload.append(marker)
+            payload.append_blob(path, start=max(ref['size'] - keep, 0))
+        else:
+            payload.append_blob(path, end=keep)
+            payload.append(marker)
+        return
+
+    content = item.get('content')
+    if content is None:
+        content = '[Context Missing - Assemble required]'
+    payload.append(trim_text(content, entry) if trimmed else content)
+
+def build_user_payload(story: dict, briefcase_path: Path, pack: Optional[ContextPack] = None) -> Union[str, PromptPayload]:
+    """
+    Renders the context assets of a story, applying the packing decisions if given.
+    Returns a PromptPayload when any content lives in a sidecar blob, so the blob is
+    streamed to the provider instead of loaded here.
+    """
+    entries = {entry.index: entry for entry in pack.items} if pack else {}
+    payload = PromptPayload()
+    payload.append(PAYLOAD_HEADER)
+    for i, item in enumerate(story['context_manifest']):
+        entry = entries.get(i)
+        if entry and entry.action == "dropped":
+            continue
+        payload.append(f"--- START {display_name(item)} ---\n")
+        append_content(payload, item, briefcase_path, entry)
+        payload.append("\n--- END ---\n")
+
+    payload.append(PAYLOAD_FOOTER)
+    return payload if payload.has_blobs else str(payload)
@@ -0,0 +1,69 @@
+import hashlib
+import os
+from typing import Optional, Union
+
+from .cache import DiskCache, canonical_hash, default_cache_dir
+from .packing import estimate_blob_tokens
+from .payload import PromptPayload
+
+# Lifetime of provider-side caches, and the smallest context worth caching
+# (Gemini rejects cachedContents below a model-specific minimum token count).
+PROMPT_CACHE_TTL = int(os.getenv("AVS_PROMPT_CACHE_TTL", 3600))
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("AVS_PROMPT_CACHE_MIN_TOKENS", 4096))
+
+# How long Ollama keeps a model (and the KV cache of its last prompt) loaded between runs
+OLLAMA_KEEP_ALIVE = os.getenv("AVS_OLLAMA_KEEP_ALIVE", "30m")
+
+# Handles are forgotten a little before the provider expires them
+EXPIRY_MARGIN = 60
+
+INSTRUCTIONS_HEADER = "INSTRUCTIONS:\n"
+
+def instructions_turn(system_prompt: str) -> str:
+    """
+    With prompt caching the stable context comes first and the instructions follow it,
+    so editing a story's steps leaves the cached context prefix intact.
+    """
+    return INSTRUCTIONS_HEADER + system_prompt
+
+def context_first(system_prompt: str, user_payload: Union[str, PromptPayload]) -> Union[str, PromptPayload]:
+    """A single prompt with the context first and the instructions last."""
+    tail = "\n\n" + instructions_turn(system_prompt)
+    if isinstance(user_payload, str):
+        return user_payload + tail
+    combined = PromptPayload()
+    combined.segments = [*user_payload.segments, tail]
+    return combined
+
+def payload_hash(user_payload: Union[str, PromptPayload]) -> str:
+    """SHA-256 of a payload's text; blobs are hashed from their memory maps chunk by chunk."""
+    digest = hashlib.sha256()
+    chunks = [user_payload] if isinstance(user_payload, str) else user_payload.chunks()
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+def payload_tokens(user_payload: Union[str, PromptPayload]) -> int:
+    size = len(user_payload) if isinstance(user_payload, str) else user_payload.size()
+    return estimate_blob_tokens(size)
+
+class PromptCacheRegistry:
+    """
+    Local registry of provider-side context caches (e.g. Gemini cachedContents).
+    Maps (provider, model, context hash) to a cache handle until shortly before it expires.
+    """
+    def __init__(self, store: Optional[DiskCache] = None):
+        self.store = store or DiskCache(default_cache_dir() / "prompt-cache")
+
+    @staticmethod
+    def key(provider: str, model: str, context_hash: str) -> str:
+        return canonical_hash({"provider": provider, "model": model, "context": context_hash})
+
+    def get(self, provider: str, model: str, context_hash: str) -> Optional[str]:
+        return self.store.get(self.key(provider, model, context_hash))
+
+    def put(self, provider: str, model: str, context_hash: str, handle: str, ttl: int):
+        self.store.set(self.key(provider, model, context_hash), handle, max(ttl - EXPIRY_MARGIN, 1))
+
+    def forget(self, provider: str, model: str, context_hash: str):
+        self.store.delete(self.key(provider, model, context_hash))
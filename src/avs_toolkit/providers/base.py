@@ -1,5 +1,14 @@
+import os
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional, Union
+
+from ..payload import PromptPayload
+
+# Generation calls can legitimately run for minutes on large briefcases
+LLM_TIMEOUT = float(os.getenv("AVS_LLM_TIMEOUT", 600))
+
+# Large briefcases hand providers a PromptPayload whose blobs are streamed into the request body
+UserPayload = Union[str, PromptPayload]
 
 class LLMProvider(ABC):
     """
@@ -7,17 +16,38 @@ class LLMProvider(ABC):
     Enables switching between local (Ollama) and cloud (Gemini, OpenAI) backends.
     """
 
+    # False while a native stream is in flight, True once it ended normally
+    # (a stream cut short by an error stops without raising)
+    stream_finished: bool = True
+
     @abstractmethod
-    async def generate(self, system_prompt: str, user_payload: str, model: str) -> Optional[str]:
+    async def generate(self, system_prompt: str, user_payload: UserPayload, model: str) -> Optional[str]:
         """
         Generates text from the LLM.
         
         Args:
             system_prompt: The persona and instructions for the agent.
-            user_payload: The context (Briefcase) and input data.
+            user_payload: The context (Briefcase) and input data, as a string or a PromptPayload.
             model: The specific model identifier (e.g., 'llama3', 'gemini-1.5-pro').
             
         Returns:
             The generated text response, or None if failed.
         """
         pass
+
+    def generation_config(self) -> dict:
+        """
+        Settings besides the prompts and the model that shape the output
+        (sampling options, prompt layout). Part of the response cache key.
+        """
+        return {}
+
+    async def stream(self, system_prompt: str, user_payload: UserPayload, model: str) -> AsyncIterator[str]:
+        """
+        Streams the generated text as it is produced.
+        Providers without native streaming yield the whole generate() result as one chunk.
+        Yields nothing if generation failed.
+        """
+        text = await self.generate(system_prompt, user_payload, model)
+        if text:
+            yield text
@@ -1,31 +1,50 @@
 import os
-import httpx
+import json
+import asyncio
+from typing import AsyncIterator, Optional, Tuple
 from rich.console import Console
-from .base import LLMProvider
+from .base import LLMProvider, LLM_TIMEOUT, UserPayload
+from ..payload import json_request
+from ..prompt_cache import (
+    PROMPT_CACHE_MIN_TOKENS, PROMPT_CACHE_TTL, PromptCacheRegistry, instructions_turn, payload_hash, payload_tokens
+)
+from ..http_client import http_clients
+from ..packing import estimate_tokens
+from ..ratelimit import throttle
+from ..tracing import current_span
 
 console = Console()
 
+GENERATION_CONFIG = {"temperature": 0.2}
+
 class GeminiProvider(LLMProvider):
     """
     Provider for Google Gemini API.
-    Requires GEMINI_API_KEY environment variable.
+    Requires GEMINI_API_KEY environment variable. AVS_GEMINI_URL overrides the API base URL.
     """
-    async def generate(self, system_prompt: str, user_payload: str, model: str) -> str:
+    base_url = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(self, prompt_cache: bool = False, registry: Optional[PromptCacheRegistry] = None):
+        self.base_url = os.getenv("AVS_GEMINI_URL", self.base_url).rstrip("/")
+        # Explicit context caching: the context is uploaded once as cachedContents and reused
+        self.prompt_cache = prompt_cache
+        self.registry = registry or (PromptCacheRegistry() if prompt_cache else None)
+
+    def generation_config(self) -> dict:
+        return {"generationConfig": GENERATION_CONFIG, "context_first": self.prompt_cache}
+
+    def _api_key(self) -> Optional[str]:
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             console.print("[red]Error:[/red] GEMINI_API_KEY not found in environment variables.")
-            return None
+        return api_key
 
-        # Gemini API expects the model name in the URL
-        # e.g., "gemini-2.5-flash" or "gemini-1.5-pro"
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-        
+    def _payload(self, system_prompt: str, user_payload: UserPayload) -> dict:
         # Construct Gemini payload
         # System instructions are supported in v1beta for some models, but simpler to append to prompt for broad compatibility
         # unless specifically using the systemInstruction field.
         # Let's use the systemInstruction field for better adherence.
-        
-        payload = {
+        return {
             "systemInstruction": {
                 "parts": [
                     {"text": system_prompt}
@@ -38,29 +57,166 @@ class GeminiProvider(LLMProvider):
                     ]
                 }
             ],
-            "generationConfig": {
-                "temperature": 0.2
-            }
+            "generationConfig": GENERATION_CONFIG
+        }
+
+    @staticmethod
+    def _extract_text(result: dict) -> str:
+        """Joins the text parts of the first candidate."""
+        if 'candidates' in result and result['candidates']:
+            content = result['candidates'][0].get('content', {})
+            parts = content.get('parts', [])
+            return "".join(part.get('text', "") for part in parts)
+        return ""
+
+    @staticmethod
+    def _record_usage(result: dict):
+        """Adds the token counts Gemini reports in usageMetadata to the current trace span."""
+        usage = result.get('usageMetadata')
+        if usage:
+            current_span().set(
+                input_tokens=usage.get('promptTokenCount'),
+                output_tokens=usage.get('candidatesTokenCount'),
+                cached_tokens=usage.get('cachedContentTokenCount'),
+            )
+
+    def _cached_payload(self, handle: str, system_prompt: str) -> dict:
+        # Requests against cachedContent may not set systemInstruction; the instructions
+        # follow the cached context as the next user turn instead.
+        return {
+            "cachedContent": handle,
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [
+                        {"text": instructions_turn(system_prompt)}
+                    ]
+                }
+            ],
+            "generationConfig": GENERATION_CONFIG
         }
 
+    async def _context_cache(self, user_payload: UserPayload, model: str, api_key: str) -> Optional[Tuple[str, str]]:
+        """
+        Returns (context hash, cachedContents name) for the payload, uploading it only when
+        the registry has no live cache for it. None when caching is off, the context is too
+        small to cache, or the cache could not be created.
+        """
+        if not self.prompt_cache or payload_tokens(user_payload) < PROMPT_CACHE_MIN_TOKENS:
+            return None
+
+        context_hash = await asyncio.to_thread(payload_hash, user_payload)
+        handle = await asyncio.to_thread(self.registry.get, "google-gemini", model, context_hash)
+        if handle:
+            console.print(f"[dim]Reusing cached context {handle}.[/dim]")
+            return context_hash, handle
+
+        body = {
+            "model": f"models/{model}",
+            "contents": [{"role": "user", "parts": [{"text": user_payload}]}],
+            "ttl": f"{PROMPT_CACHE_TTL}s",
+        }
         try:
-            async with httpx.AsyncClient(timeout=600.0) as client:
-                response = await client.post(url, json=payload)
-                
-                if response.status_code != 200:
-                    console.print(f"[red]Error (Gemini):[/red] {response.status_code} - {response.text}")
-                    return None
-                    
-                result = response.json()
-                # Extract text from response
-                if 'candidates' in result and result['candidates']:
-                    content = result['candidates'][0].get('content', {})
-                    parts = content.get('parts', [])
-                    if parts:
-                        return parts[0].get('text', "")
-                
-                return ""
+            response = await http_clients.post(
+                f"{self.base_url}/cachedContents?key={api_key}", **json_request(body), timeout=LLM_TIMEOUT
+            )
+        except Exception as e:
+            console.print(f"[yellow]Context cache unavailable:[/yellow] {e}")
+            return None
+        if response.status_code != 200:
+            console.print(f"[yellow]Context cache unavailable ({response.status_code}); sending the full context.[/yellow]")
+            return None
+
+        handle = response.json().get("name")
+        if not handle:
+            return None
+        await asyncio.to_thread(self.registry.put, "google-gemini", model, context_hash, handle, PROMPT_CACHE_TTL)
+        console.print(f"[dim]Cached context as {handle} for {PROMPT_CACHE_TTL}s.[/dim]")
+        return context_hash, handle
+
+    async def _request(self, system_prompt: str, user_payload: UserPayload, model: str, api_key: str) -> Tuple[dict, Optional[str]]:
+        """Request arguments for a generation call, and the context hash when it goes through the cache."""
+        cached = await self._context_cache(user_payload, model, api_key)
+        if cached:
+            context_hash, handle = cached
+            return {"json": self._cached_payload(handle, system_prompt)}, context_hash
+        return json_request(self._payload(system_prompt, user_payload)), None
+
+    async def _throttle(self, system_prompt: str, user_payload: UserPayload, api_key: str):
+        """Queues the call until the key's requests and tokens per minute allow it."""
+        await throttle("gemini", api_key, estimate_tokens(system_prompt) + payload_tokens(user_payload))
+
+    def _cache_lost(self, status_code: int, context_hash: Optional[str], model: str) -> bool:
+        """True if a request failed because its cached context expired or was deleted (it is forgotten)."""
+        if context_hash and status_code in (403, 404):
+            self.registry.forget("google-gemini", model, context_hash)
+            console.print("[dim]Cached context is gone; uploading it again.[/dim]")
+            return True
+        return False
+
+    async def generate(self, system_prompt: str, user_payload: UserPayload, model: str) -> str:
+        api_key = self._api_key()
+        if not api_key:
+            return None
+
+        # Gemini API expects the model name in the URL
+        # e.g., "gemini-2.5-flash" or "gemini-1.5-pro"
+        url = f"{self.base_url}/models/{model}:generateContent?key={api_key}"
+
+        try:
+            await self._throttle(system_prompt, user_payload, api_key)
+            for attempt in range(2):
+                request, context_hash = await self._request(system_prompt, user_payload, model, api_key)
+                response = await http_clients.post(url, **request, timeout=LLM_TIMEOUT)
+                if attempt == 0 and self._cache_lost(response.status_code, context_hash, model):
+                    continue
+                break
+            
+            if response.status_code != 200:
+                console.print(f"[red]Error (Gemini):[/red] {response.status_code} - {response.text}")
+                return None
                 
+            # Extract text from response
+            result = response.json()
+            current_span().set(bytes_received=len(response.content))
+            self._record_usage(result)
+            return self._extract_text(result)
+            
         except Exception as e:
             console.print(f"[red]Error communicating with Gemini:[/red] {e}")
             return None
+
+    async def stream(self, system_prompt: str, user_payload: UserPayload, model: str) -> AsyncIterator[str]:
+        """Streams chunks from the streamGenerateContent endpoint (Server-Sent Events)."""
+        api_key = self._api_key()
+        if not api_key:
+            return
+
+        url = f"{self.base_url}/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+        self.stream_finished = False
+
+        try:
+            await self._throttle(system_prompt, user_payload, api_key)
+            for attempt in range(2):
+                request, context_hash = await self._request(system_prompt, user_payload, model, api_key)
+                async with http_clients.stream("POST", url, **request, timeout=LLM_TIMEOUT) as response:
+                    if attempt == 0 and self._cache_lost(response.status_code, context_hash, model):
+                        continue
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        console.print(f"[red]Error (Gemini):[/red] {response.status_code} - {body}")
+                        return
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        event = json.loads(line[len("data:"):])
+                        self._record_usage(event)
+                        text = self._extract_text(event)
+                        if text:
+                            yield text
+                    self.stream_finished = True
+                    return
+
+        except Exception as e:
+            console.print(f"[red]Error communicating with Gemini:[/red] {e}")
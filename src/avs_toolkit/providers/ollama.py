@@ -1,45 +1,123 @@
+import json
+import os
 import httpx
+from typing import AsyncIterator, Optional
 from rich.console import Console
-from .base import LLMProvider
+from .base import LLMProvider, LLM_TIMEOUT, UserPayload
+from ..payload import json_request
+from ..prompt_cache import OLLAMA_KEEP_ALIVE, context_first
+from ..http_client import http_clients
+from ..tracing import current_span
 
 console = Console()
 
 class OllamaProvider(LLMProvider):
     """
     Provider for local Ollama execution.
+    The server address can be changed with AVS_OLLAMA_URL (e.g. a remote host or a local stub).
     """
-    async def generate(self, system_prompt: str, user_payload: str, model: str) -> str:
-        base_url = "http://127.0.0.1:11434"
-        generate_url = f"{base_url}/api/generate"
-        
-        payload = {
+    base_url = "http://127.0.0.1:11434"
+
+    def __init__(self, num_ctx: Optional[int] = None, prompt_cache: bool = False):
+        self.base_url = os.getenv("AVS_OLLAMA_URL", self.base_url).rstrip("/")
+        # Ollama silently truncates prompts longer than num_ctx (its default is small)
+        self.num_ctx = num_ctx
+        # Ollama reuses the KV cache of a loaded model for a repeated prompt prefix. With
+        # prompt caching the context goes first and the model is kept loaded between runs.
+        self.prompt_cache = prompt_cache
+
+    def _options(self) -> dict:
+        options = {"temperature": 0.2}
+        if self.num_ctx:
+            options["num_ctx"] = self.num_ctx
+        return options
+
+    def generation_config(self) -> dict:
+        return {"options": self._options(), "context_first": self.prompt_cache}
+
+    def _payload(self, system_prompt: str, user_payload: UserPayload, model: str, stream: bool) -> dict:
+        options = self._options()
+        if self.prompt_cache:
+            return {
+                "model": model,
+                "prompt": context_first(system_prompt, user_payload),
+                "stream": stream,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "options": options
+            }
+        return {
             "model": model,
             "prompt": user_payload,
             "system": system_prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.2
-            }
+            "stream": stream,
+            "options": options
         }
 
+    @staticmethod
+    def _record_usage(result: dict):
+        """Adds the token counts Ollama reports (on the final chunk) to the current trace span."""
+        current_span().set(input_tokens=result.get("prompt_eval_count"), output_tokens=result.get("eval_count"))
+
+    def _report_status(self, status_code: int, model: str) -> bool:
+        """Prints a friendly message for known error statuses. Returns True if the call failed."""
+        if status_code == 404:
+            console.print(f"[red]Error:[/red] Ollama endpoint not found.")
+            return True
+        elif status_code == 400:
+            console.print(f"[red]Error:[/red] Bad request. Does model '{model}' exist? Run 'ollama pull {model}'")
+            return True
+        return False
+
+    async def generate(self, system_prompt: str, user_payload: UserPayload, model: str) -> str:
+        generate_url = f"{self.base_url}/api/generate"
+        payload = self._payload(system_prompt, user_payload, model, stream=False)
+
         try:
-            async with httpx.AsyncClient(timeout=600.0) as client:
-                response = await client.post(generate_url, json=payload)
-                
-                if response.status_code == 404:
-                    console.print(f"[red]Error:[/red] Ollama endpoint not found.")
-                    return None
-                elif response.status_code == 400:
-                    console.print(f"[red]Error:[/red] Bad request. Does model '{model}' exist? Run 'ollama pull {model}'")
-                    return None
-                    
-                response.raise_for_status()
-                result = response.json()
-                return result.get("response", "")
+            response = await http_clients.post(generate_url, **json_request(payload), timeout=LLM_TIMEOUT)
+            
+            if self._report_status(response.status_code, model):
+                return None
                 
+            response.raise_for_status()
+            result = response.json()
+            current_span().set(bytes_received=len(response.content))
+            self._record_usage(result)
+            return result.get("response", "")
+            
         except httpx.ConnectError:
             console.print(f"[red]Error:[/red] Could not connect to Ollama. Is the app running?")
             return None
         except Exception as e:
             console.print(f"[red]Error communicating with Ollama:[/red] {e}")
             return None
+
+    async def stream(self, system_prompt: str, user_payload: UserPayload, model: str) -> AsyncIterator[str]:
+        """Streams chunks from Ollama's NDJSON /api/generate endpoint."""
+        generate_url = f"{self.base_url}/api/generate"
+        payload = self._payload(system_prompt, user_payload, model, stream=True)
+        self.stream_finished = False
+
+        try:
+            async with http_clients.stream("POST", generate_url, **json_request(payload), timeout=LLM_TIMEOUT) as response:
+                if self._report_status(response.status_code, model):
+                    return
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        console.print(f"[red]Error communicating with Ollama:[/red] {chunk['error']}")
+                        return
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        self._record_usage(chunk)
+                        self.stream_finished = True
+                        return
+
+        except httpx.ConnectError:
+            console.print(f"[red]Error:[/red] Could not connect to Ollama. Is the app running?")
+        except Exception as e:
+            console.print(f"[red]Error communicating with Ollama:[/red] {e}")
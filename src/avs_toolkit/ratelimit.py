@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from rich.console import Console
+
+from .cache import default_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: limits are shared within a process only
+    fcntl = None
+
+console = Console()
+
+class RateLimit(NamedTuple):
+    """Requests and (estimated input) tokens per minute; None means unlimited."""
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+
+# Conservative defaults for the hosted APIs, overridden by AVS_RATE_LIMITS
+DEFAULT_LIMITS: Dict[str, RateLimit] = {
+    "gemini": RateLimit(rpm=60, tpm=1_000_000),
+    "tavily": RateLimit(rpm=100),
+}
+
+# Waits shorter than this are not worth mentioning
+REPORT_WAIT = 1.0
+
+def parse_limits(spec: str) -> Dict[str, RateLimit]:
+    """
+    Parses 'provider=rpm[/tpm],...', e.g. 'gemini=1000/4000000,tavily=100'.
+    0 leaves that dimension unlimited.
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = entry.partition("=")
+        rpm, _, tpm = values.partition("/")
+        try:
+            limits[name.strip().lower()] = RateLimit((int(rpm) or None) if rpm else None, (int(tpm) or None) if tpm else None)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit '{entry}'; expected provider=rpm[/tpm].")
+    return limits
+
+def configured_limits() -> Dict[str, RateLimit]:
+    return {**DEFAULT_LIMITS, **parse_limits(os.getenv("AVS_RATE_LIMITS", ""))}
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute, holding at most one minute's worth.
+    Callers reserve units up front and are told how long to wait for them, so waiting
+    callers queue in order instead of racing (the level may go negative while they wait).
+    """
+
+    def __init__(self, per_minute: int, level: Optional[float] = None, updated: Optional[float] = None):
+        self.rate = per_minute / 60
+        self.capacity = float(per_minute)
+        self.level = self.capacity if level is None else level
+        self.updated = time.time() if updated is None else updated
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes `amount` units and returns the seconds until they are actually available."""
+        self.level = min(self.capacity, self.level + max(now - self.updated, 0) * self.rate)
+        self.updated = now
+        # A request larger than the whole bucket waits for a full bucket, not forever
+        self.level -= min(amount, self.capacity)
+        return max(-self.level / self.rate, 0.0)
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one provider and API key.
+    With a state directory the buckets live in a lock-protected file, so every process
+    using the same key draws from the same quota.
+    """
+
+    def __init__(self, name: str, limit: RateLimit, state_file: Optional[Path] = None):
+        self.name = name
+        self.limit = limit
+        self.state_file = state_file if fcntl is not None else None
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, kind: str, per_minute: int, state: dict) -> TokenBucket:
+        if self.state_file is not None:
+            level, updated = state.get(kind, (None, None))
+            return TokenBucket(per_minute, level, updated)
+        return self.buckets.setdefault(kind, TokenBucket(per_minute))
+
+    def _reserve_in(self, state: dict, tokens: int, now: float) -> float:
+        wait = 0.0
+        for kind, per_minute, amount in (("requests", self.limit.rpm, 1), ("tokens", self.limit.tpm, tokens)):
+            if per_minute and amount:
+                bucket = self._bucket(kind, per_minute, state)
+                wait = max(wait, bucket.reserve(amount, now))
+                state[kind] = (bucket.level, bucket.updated)
+        return wait
+
+    def _reserve_shared(self, tokens: int) -> float:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_file, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                state = json.loads(raw) if raw.strip() else {}
+                wait = self._reserve_in(state, tokens, time.time())
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+        return wait
+
+    def reserve(self, tokens: int = 0) -> float:
+        if self.state_file is not None:
+            return self._reserve_shared(tokens)
+        return self._reserve_in({}, tokens, time.time())
+
+    async def acquire(self, tokens: int = 0):
+        """Waits until one more request of `tokens` fits the limits. Never rejects."""
+        if self.state_file is not None:
+            wait = await asyncio.to_thread(self.reserve, tokens)
+        else:
+            wait = self.reserve(tokens)
+        if wait >= REPORT_WAIT:
+            console.print(f"[dim]Rate limit ({self.name}): queued for {wait:.1f}s.[/dim]")
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+# One limiter per provider and API key, shared by every caller in the process
+limiters: Dict[str, RateLimiter] = {}
+
+def shared_state_dir() -> Optional[Path]:
+    """Where cross-process bucket state lives when AVS_RATE_LIMIT_SHARED is set."""
+    if os.getenv("AVS_RATE_LIMIT_SHARED", "").lower() in ("1", "true", "yes"):
+        return default_cache_dir() / "ratelimit"
+    return None
+
+def limiter_for(provider: str, api_key: Optional[str] = None) -> Optional[RateLimiter]:
+    limit = configured_limits().get(provider)
+    if limit is None or not (limit.rpm or limit.tpm):
+        return None
+    key = f"{provider}-{hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:12]}"
+    if key not in limiters:
+        state_dir = shared_state_dir()
+        limiters[key] = RateLimiter(provider, limit, state_dir / f"{key}.json" if state_dir else None)
+    return limiters[key]
+
+async def throttle(provider: str, api_key: Optional[str] = None, tokens: int = 0):
+    """Queues the caller until the provider's limits for this API key allow one more request."""
+    limiter = limiter_for(provider, api_key)
+    if limiter is not None:
+        await limiter.acquire(tokens)
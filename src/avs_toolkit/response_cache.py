@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import os
+from typing import AsyncIterator, Optional
+
+from rich.console import Console
+
+from .cache import DiskCache, canonical_hash, default_cache_dir
+from .prompt_cache import payload_hash
+from .providers.base import LLMProvider, UserPayload
+
+console = Console()
+
+DEFAULT_MAX_MB = 256
+
+def response_store() -> DiskCache:
+    """Responses live next to the assembly cache, capped by AVS_RESPONSE_CACHE_MAX_MB."""
+    max_mb = float(os.getenv("AVS_RESPONSE_CACHE_MAX_MB", DEFAULT_MAX_MB))
+    return DiskCache(default_cache_dir() / "responses", int(max_mb * 1024 * 1024))
+
+class CachedProvider(LLMProvider):
+    """
+    Wraps any LLMProvider and replays its responses for identical requests.
+    Keys hash (provider, model, system prompt, payload, generation config);
+    only complete, non-empty responses are stored.
+    """
+    def __init__(self, provider: LLMProvider, name: str, store: Optional[DiskCache] = None, ttl: Optional[float] = None):
+        self.provider = provider
+        self.name = name
+        self.store = store or response_store()
+        # Responses are kept until evicted unless AVS_RESPONSE_CACHE_TTL (seconds) is set
+        env_ttl = os.getenv("AVS_RESPONSE_CACHE_TTL")
+        self.ttl = ttl if ttl is not None else (float(env_ttl) if env_ttl else None)
+
+    def generation_config(self) -> dict:
+        return self.provider.generation_config()
+
+    def key(self, system_prompt: str, user_payload: UserPayload, model: str) -> str:
+        return canonical_hash({
+            "provider": self.name,
+            "model": model,
+            "system": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            "payload": payload_hash(user_payload),
+            "config": self.provider.generation_config(),
+        })
+
+    async def _lookup(self, system_prompt: str, user_payload: UserPayload, model: str):
+        key = await asyncio.to_thread(self.key, system_prompt, user_payload, model)
+        cached = await asyncio.to_thread(self.store.get, key)
+        if cached is not None:
+            console.print(f"[dim]Replaying cached response ({self.name}:{model}).[/dim]")
+        return key, cached
+
+    async def generate(self, system_prompt: str, user_payload: UserPayload, model: str) -> Optional[str]:
+        key, cached = await self._lookup(system_prompt, user_payload, model)
+        if cached is not None:
+            return cached
+        text = await self.provider.generate(system_prompt, user_payload, model)
+        if text:
+            await asyncio.to_thread(self.store.set, key, text, self.ttl)
+        return text
+
+    async def stream(self, system_prompt: str, user_payload: UserPayload, model: str) -> AsyncIterator[str]:
+        key, cached = await self._lookup(system_prompt, user_payload, model)
+        if cached is not None:
+            self.stream_finished = True
+            yield cached
+            return
+
+        self.stream_finished = False
+        chunks = []
+        async for chunk in self.provider.stream(system_prompt, user_payload, model):
+            chunks.append(chunk)
+            yield chunk
+        self.stream_finished = self.provider.stream_finished
+        if chunks and self.stream_finished:
+            await asyncio.to_thread(self.store.set, key, "".join(chunks), self.ttl)
@@ -0,0 +1,186 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from rich.console import Console
+
+from .providers.base import LLMProvider, UserPayload
+from .tracing import span
+
+console = Console()
+
+# Calls remembered per backend for its latency percentiles and error rate
+ROLLING_WINDOW = 50
+# Samples needed before a backend's p95 replaces the default hedge delay
+MIN_SAMPLES = 5
+HEDGE_DELAY = float(os.getenv("AVS_HEDGE_DELAY", 2.0))
+MIN_HEDGE_DELAY = 0.25
+# A backend failing at least this often is tried after the healthy ones
+UNHEALTHY_ERROR_RATE = 0.5
+
+class BackendStats:
+    """Rolling latency and outcome of the most recent calls to one backend."""
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((latency, ok))
+
+    @property
+    def calls(self) -> int:
+        return len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile of the successful calls, or None before any succeeded."""
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(q * len(latencies)) - 1)]
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    @property
+    def healthy(self) -> bool:
+        return self.calls < MIN_SAMPLES or self.error_rate < UNHEALTHY_ERROR_RATE
+
+# Process-wide, so every assembly and run in one process learns from the others
+backend_stats: Dict[str, BackendStats] = {}
+
+def stats_for(name: str) -> BackendStats:
+    return backend_stats.setdefault(name, BackendStats())
+
+def hedging_enabled() -> bool:
+    return os.getenv("AVS_HEDGE", "").lower() in ("1", "true", "yes", "on")
+
+class Backend(NamedTuple):
+    """One way to answer a request: a name for its stats and a call returning the answer or None."""
+    name: str
+    call: Callable[[], Awaitable[Optional[str]]]
+
+def ordered(backends: List[Backend]) -> List[Backend]:
+    """Declared order, with backends that keep failing moved behind the healthy ones."""
+    return sorted(backends, key=lambda backend: not stats_for(backend.name).healthy)
+
+def hedge_delay(name: str) -> float:
+    """How long to wait for a backend before also asking the next one: its p95 latency."""
+    stats = stats_for(name)
+    p95 = stats.p95
+    if p95 is None or stats.calls < MIN_SAMPLES:
+        return HEDGE_DELAY
+    return max(p95, MIN_HEDGE_DELAY)
+
+async def attempt(backend: Backend) -> Optional[str]:
+    """Calls one backend and records its latency and outcome. Errors count as failures."""
+    started = time.perf_counter()
+    with span("route.attempt", backend=backend.name) as s:
+        try:
+            result = await backend.call()
+        except asyncio.CancelledError:
+            s.set(cancelled=True)
+            raise
+        except Exception as e:
+            console.print(f"[yellow]{backend.name} failed:[/yellow] {e}")
+            result = None
+        s.set(ok=bool(result))
+    stats_for(backend.name).record(time.perf_counter() - started, bool(result))
+    return result
+
+async def route(backends: List[Backend], hedge: Optional[bool] = None) -> Optional[str]:
+    """
+    Returns the first non-empty answer, trying backends in order (see `ordered`).
+    With hedging (default: AVS_HEDGE), a backend that is still running after its p95 latency
+    is raced against the next one, and the slower call is cancelled once either answers.
+    """
+    queue = ordered(backends)
+    if hedge is None:
+        hedge = hedging_enabled()
+    if not hedge:
+        for backend in queue:
+            result = await attempt(backend)
+            if result:
+                return result
+        return None
+
+    running: Dict[asyncio.Task, Backend] = {}
+
+    def launch():
+        backend = queue.pop(0)
+        running[asyncio.create_task(attempt(backend))] = backend
+        return backend
+
+    latest = launch()
+    try:
+        while running:
+            timeout = hedge_delay(latest.name) if queue else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+                if task.result():
+                    return task.result()
+            if queue:
+                # Fail over, or hedge a call that has outlived its usual latency
+                if not done:
+                    console.print(f"[dim]{latest.name} is slower than usual; hedging with {queue[0].name}.[/dim]")
+                latest = launch()
+        return None
+    finally:
+        for task in running:
+            task.cancel()
+
+Route = Tuple[str, LLMProvider, Optional[str]]
+
+def ordered_routes(routes: List[Route]) -> List[Route]:
+    return sorted(routes, key=lambda route: not stats_for(route[0]).healthy)
+
+class RoutedProvider(LLMProvider):
+    """
+    Tries fallback providers when the primary fails (or, with hedging, is slower than its p95).
+    Routes are (name, provider, model); a None model uses the model of the call.
+    Streams fail over only if the failed provider produced no text, so a product never mixes answers.
+    """
+
+    def __init__(self, routes: List[Route], hedge: Optional[bool] = None):
+        self.routes = routes
+        self.hedge = hedge
+
+    def generation_config(self) -> dict:
+        primary = self.routes[0][1]
+        return {**primary.generation_config(), "fallbacks": [f"{name}:{model}" for name, _, model in self.routes[1:]]}
+
+    def _backends(self, call: Callable[[LLMProvider, str], Awaitable[Optional[str]]], model: str) -> List[Backend]:
+        return [
+            Backend(name, lambda provider=provider, route_model=route_model: call(provider, route_model or model))
+            for name, provider, route_model in self.routes
+        ]
+
+    async def generate(self, system_prompt: str, user_payload: UserPayload, model: str) -> Optional[str]:
+        backends = self._backends(lambda provider, m: provider.generate(system_prompt, user_payload, m), model)
+        return await route(backends, self.hedge)
+
+    async def stream(self, system_prompt: str, user_payload: UserPayload, model: str) -> AsyncIterator[str]:
+        self.stream_finished = False
+        routes = ordered_routes(self.routes)
+        for index, (name, provider, route_model) in enumerate(routes):
+            started = time.perf_counter()
+            produced = False
+            async for chunk in provider.stream(system_prompt, user_payload, route_model or model):
+                produced = True
+                yield chunk
+            stats_for(name).record(time.perf_counter() - started, produced and provider.stream_finished)
+            if produced:
+                self.stream_finished = provider.stream_finished
+                return
+            if index + 1 < len(routes):
+                console.print(f"[yellow]{name} produced nothing; trying {routes[index + 1][0]}.[/yellow]")
@@ -1,26 +1,87 @@
-import yaml
+import os
+import time
 import json
+import tempfile
 from pathlib import Path
+from typing import List, Optional, Tuple
 from rich.console import Console
 from rich.live import Live
 from rich.markdown import Markdown
 from rich.spinner import Spinner
 
+from .briefcase import load_briefcase
+from .map_reduce import DEFAULT_FAN_OUT, MAP_CHUNK_TOKENS, map_reduce_payload
+from .packing import (
+    context_fits, context_window as pack_window, estimate_tokens, num_ctx_for, ollama_num_ctx, output_reserve,
+    pack_context, print_pack_report
+)
+from .payload import build_user_payload, framing_tokens
+from .providers.base import UserPayload
+from .response_cache import CachedProvider
+from .routing import Route, RoutedProvider
+from .tracing import span
 from .providers.ollama import OllamaProvider
 from .providers.gemini import GeminiProvider
 
 console = Console()
 
-async def run_story(briefcase_path: str, model: str = "llama3"):
+def product_path(story: dict) -> Path:
+    """Resolves where the product of a story is written (relative to the working directory)."""
+    product_cfg = story.get('product', {})
+    raw_output_path = product_cfg.get('output_path', 'outputs')
+    output_path = Path(raw_output_path)
+    
+    # If output_path looks like a file (has an extension), use it directly
+    if output_path.suffix:
+        return output_path
+    filename = f"{story['metadata']['story_id']}_output.md"
+    return output_path / filename
+
+def product_save_path(story: dict) -> Path:
+    """Resolves the product path of a story, creating its directory."""
+    save_path = product_path(story)
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    return save_path
+
+async def stream_product(provider, system_prompt: str, user_payload: UserPayload, model: str, save_path: Path, label: str) -> Optional[int]:
     """
-    Executes a Value Story against the configured LLM provider.
-    Handles Prompt Construction, Execution, and Product Saving.
+    Streams the agent's answer to the console and appends each chunk to a temp file next to
+    the product as it arrives, so a long generation is never held only in memory. The temp
+    file replaces the product only once the stream finished; a stream cut short leaves any
+    previous product untouched.
+    Returns the number of characters written, or None if the stream was cut short.
     """
-    path = Path(briefcase_path)
-    with open(path, 'r') as f:
-        story = yaml.safe_load(f)
+    written = 0
+    started = time.perf_counter()
+    fd, tmp = tempfile.mkstemp(dir=save_path.parent, prefix=f".{save_path.name}.", suffix=".tmp")
+    live = Live(Spinner("dots", text=f"Agent ({label}) is thinking..."), refresh_per_second=10, transient=True)
+    live.start()
+    try:
+        with open(fd, "w") as product, span("llm.stream", model=model) as s:
+            async for chunk in provider.stream(system_prompt, user_payload, model):
+                if not written:
+                    live.stop()
+                    console.print(f"[dim]First token after {time.perf_counter() - started:.2f}s[/dim]\n")
+                    s.set(first_token_ms=round((time.perf_counter() - started) * 1000, 1))
+                s.add("chars_received", len(chunk))
+                product.write(chunk)
+                product.flush()
+                console.print(chunk, end="", markup=False, highlight=False)
+                written += len(chunk)
+            finished = getattr(provider, "stream_finished", True)
+            s.set(finished=finished)
+        if written and finished:
+            os.replace(tmp, save_path)
+    finally:
+        live.stop()
+        Path(tmp).unlink(missing_ok=True)
 
-    # 1. Construct the System Prompt (The Agile Persona)
+    if written:
+        console.print(f"\n[dim]Streamed {written} characters in {time.perf_counter() - started:.2f}s[/dim]")
+    return None if written and not finished else written
+
+def build_system_prompt(story: dict) -> str:
+    """The Agile Persona: goal, reasoning pattern and execution steps."""
     system_prompt = (
         f"You are operating as: {story['goal']['as_a']}\n"
         f"Your Goal: {story['goal']['i_want']}\n"
@@ -32,65 +93,161 @@ async def run_story(briefcase_path: str, model: str = "llama3"):
     steps = story['instructions'].get('execution_steps', [])
     for step in steps:
         system_prompt += f"- Step {step['step_number']}: {step['action']} (Validation: {step['validation_rule']})\n"
+    return system_prompt
 
-    # 2. Construct the Context Payload
-    user_payload = "CONTEXT ASSETS:\n"
-    for item in story['context_manifest']:
-        content = item.get('content', '[Context Missing - Assemble required]')
-        
-        # FIX: Handle cases where default_path is None (e.g., Web Research tasks)
-        raw_path = item.get('default_path')
-        if raw_path:
-            display_name = Path(raw_path).name
-        else:
-            # Fallback to key or search query snippet for the label
-            display_name = item.get('key') or "Web-Research-Result"
-            
-        user_payload += f"--- START {display_name} ---\n{content}\n--- END ---\n"
-
-    user_payload += "\n\nBased on the context above, produce the final product now."
-
-    # 3. Select Provider
-    metadata = story.get('metadata', {})
-    provider_name = metadata.get('provider', 'ollama').lower()
-    
+def provider_model(provider_name: str, model: Optional[str]) -> str:
+    """The model to use with a provider when the story's model is missing or meant for Ollama."""
     if provider_name == 'google-gemini':
-        provider = GeminiProvider()
         # Ensure model is appropriate for Gemini if not specified
         if not model or model == "llama3":
-            model = "gemini-2.5-flash" # Default fallback for cloud
+            return "gemini-2.5-flash" # Default fallback for cloud
+    return model or "llama3"
+
+def select_provider(story: dict, model: str) -> Tuple[str, str]:
+    """Returns the provider name and the model to use with it."""
+    metadata = story.get('metadata', {})
+    provider_name = metadata.get('provider', 'ollama').lower()
+    return provider_name, provider_model(provider_name, model)
+
+def make_provider(
+    provider_name: str,
+    num_ctx: Optional[int] = None,
+    prompt_cache: bool = False,
+    response_cache: bool = False,
+    fallbacks: Optional[List[Route]] = None,
+):
+    if provider_name == 'google-gemini':
+        provider = GeminiProvider(prompt_cache=prompt_cache)
+    else:
+        # Size Ollama's window to the prompt so it never truncates silently
+        provider = OllamaProvider(num_ctx=num_ctx, prompt_cache=prompt_cache)
+    if fallbacks:
+        provider = RoutedProvider([(provider_name, provider, None), *fallbacks])
+    return CachedProvider(provider, provider_name) if response_cache else provider
+
+def fallback_routes(story: dict, prompt_tokens: int, prompt_cache: bool = False) -> List[Route]:
+    """
+    Providers from `metadata.fallback_providers` ('provider' or 'provider:model').
+    The context was packed for the primary model, so fallbacks whose window cannot hold
+    the prompt are left out rather than sent a prompt they would truncate.
+    """
+    routes = []
+    for entry in story.get('metadata', {}).get('fallback_providers') or []:
+        name, _, model = entry.partition(":")
+        name = name.strip().lower()
+        model = provider_model(name, model.strip() or None)
+        window = pack_window(model)
+        reserve = output_reserve(window)
+        if prompt_tokens > window - reserve:
+            console.print(f"[yellow]Skipping fallback {name}:{model}: ~{prompt_tokens:,} prompt tokens exceed its {window:,}-token window.[/yellow]")
+            continue
+        routes.append((name, make_provider(name, num_ctx_for(prompt_tokens, reserve, window), prompt_cache), model))
+    return routes
+
+async def run_story(
+    briefcase_path: str,
+    model: str = "llama3",
+    stream: bool = False,
+    story: Optional[dict] = None,
+    context_window: Optional[int] = None,
+    map_reduce: bool = False,
+    fan_out: int = DEFAULT_FAN_OUT,
+    prompt_cache: bool = False,
+    response_cache: bool = False,
+) -> Optional[Path]:
+    """
+    Executes a Value Story against the configured LLM provider.
+    Handles Prompt Construction, Context Packing, Execution, and Product Saving.
+    With stream=True the answer is rendered live and written to the product file incrementally.
+    Pass the assembled `story` dict to skip reading the briefcase back from disk.
+    The context is packed into the model's token window (or `context_window`) before anything
+    is sent; ContextBudgetError is raised if it cannot fit.
+    With map_reduce=True a context larger than the window is instead split into chunks that are
+    processed concurrently (up to `fan_out` calls at once) and then synthesized by a final call.
+    With prompt_cache=True the context is sent ahead of the instructions and cached by the
+    provider (Gemini cachedContents, Ollama's loaded KV cache), so re-runs re-upload only changes.
+    With response_cache=True identical requests are answered from the local response cache.
+    Providers listed in `metadata.fallback_providers` take over when the primary fails
+    (see routing.route; AVS_HEDGE=1 also races them against a primary slower than its p95).
+    Returns the product path, or None if the agent produced nothing.
+    """
+    if story is None:
+        story = load_briefcase(Path(briefcase_path))
+
+    # 1. Construct the System Prompt (The Agile Persona)
+    with span("run.prompt") as s:
+        system_prompt = build_system_prompt(story)
+        provider_name, model = select_provider(story, model)
+        fixed_tokens = framing_tokens(story, system_prompt)
+        s.set(provider=provider_name, model=model, fixed_tokens=fixed_tokens)
+
+    if map_reduce and not context_fits(story['context_manifest'], model, fixed_tokens, context_window):
+        # 2-4. Map over window-sized chunks, then hand the partial results to the final call
+        window = pack_window(model, context_window)
+        reserve = output_reserve(window)
+        prompt_tokens = estimate_tokens(system_prompt)
+        budget = min(window - reserve - prompt_tokens, MAP_CHUNK_TOKENS)
+        provider = make_provider(
+            provider_name, num_ctx_for(prompt_tokens + budget, reserve, window), prompt_cache, response_cache,
+            fallback_routes(story, prompt_tokens + budget, prompt_cache)
+        )
+        with span("run.map_reduce", model=model, budget=budget, fan_out=fan_out):
+            user_payload = await map_reduce_payload(provider, system_prompt, story, Path(briefcase_path), model, budget, fan_out)
+        if user_payload is None:
+            console.print("[yellow]Agent returned an empty response for every part of the context.[/yellow]")
+            return None
     else:
-        provider = OllamaProvider()
+        # 2. Pack the context into the model's token budget, before paying for a doomed call
+        with span("run.pack", model=model) as s:
+            pack = pack_context(story['context_manifest'], model, fixed_tokens, context_window)
+            s.set(window=pack.window, input_tokens=pack.used_tokens, trimmed=len(pack.changed))
+        print_pack_report(pack)
+
+        # 3. Construct the Context Payload (large contents stay in their memory-mapped sidecar blobs)
+        with span("run.payload") as s:
+            user_payload = build_user_payload(story, Path(briefcase_path), pack)
+            s.set(bytes_sent=len(user_payload) if isinstance(user_payload, str) else user_payload.size())
+
+        # 4. Select Provider
+        provider = make_provider(
+            provider_name, ollama_num_ctx(pack), prompt_cache, response_cache,
+            fallback_routes(story, pack.used_tokens, prompt_cache)
+        )
+
+    # 5. Execute (streaming writes the product as it is generated)
+    if stream:
+        save_path = product_save_path(story)
+        written = await stream_product(provider, system_prompt, user_payload, model, save_path, f"{provider_name}:{model}")
+        if written is None:
+            console.print("\n[bold red]✗ The stream was cut short; the product was not saved.[/bold red]")
+            return None
+        if written:
+            console.print(f"\n[bold green]✓ Product Saved Successfully[/bold green]")
+            console.print(f"  Location: [bold]{save_path}[/bold]")
+            return save_path
+        save_path.unlink(missing_ok=True)
+        console.print("[yellow]Agent returned an empty response.[/yellow]")
+        return None
 
-    # 4. Execute
     generated_text = ""
     with Live(Spinner("dots", text=f"Agent ({provider_name}:{model}) is thinking..."), refresh_per_second=10, transient=True):
-        generated_text = await provider.generate(system_prompt, user_payload, model)
+        with span("llm.generate", provider=provider_name, model=model) as s:
+            generated_text = await provider.generate(system_prompt, user_payload, model)
+            s.set(chars_received=len(generated_text or ""))
 
-    # 5. The Filing Clerk: Save the Product
+    # 6. The Filing Clerk: Save the Product
     if generated_text:
-        product_cfg = story.get('product', {})
-        raw_output_path = product_cfg.get('output_path', 'outputs')
-        output_path = Path(raw_output_path)
-        
-        # If output_path looks like a file (has an extension), use it directly
-        if output_path.suffix:
-            save_path = output_path
-            output_dir = save_path.parent
-        else:
-            output_dir = output_path
-            filename = f"{story['metadata']['story_id']}_output.md"
-            save_path = output_dir / filename
-            
-        output_dir.mkdir(parents=True, exist_ok=True)
+        save_path = product_save_path(story)
         save_path.write_text(generated_text)
         
         console.print(f"\n[bold green]✓ Product Saved Successfully[/bold green]")
         console.print(f"  Location: [bold]{save_path}[/bold]")
         console.print("\n[dim]Preview of Generated Content:[/dim]")
         console.print(Markdown(generated_text[:500] + "..." if len(generated_text) > 500 else generated_text))
-    else:
-        console.print("[yellow]Agent returned an empty response.[/yellow]")
+        return save_path
+
+    console.print("[yellow]Agent returned an empty response.[/yellow]")
+    return None
 
 # Backward compatibility alias
 run_ollama_story = run_story
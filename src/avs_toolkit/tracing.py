@@ -0,0 +1,199 @@
+import contextvars
+import json
+import secrets
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+console = Console()
+
+TRACE_FORMATS = ("json", "otlp")
+WATERFALL_WIDTH = 24
+
+class Span:
+    """One timed stage of a run, with free-form attributes (bytes, tokens, names)."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def add(self, key: str, amount: Union[int, float]):
+        """Accumulates a counter, e.g. bytes received over a stream."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            **({"error": self.error} if self.error else {}),
+        }
+
+class NullSpan:
+    """Stands in for a span while tracing is off, so instrumented code needs no checks."""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, key: str, amount: Union[int, float]):
+        pass
+
+NULL_SPAN = NullSpan()
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("avs_span", default=None)
+
+class Tracer:
+    """
+    Records nested spans for one traced command. Spans follow the asyncio context,
+    so stages running in concurrent tasks nest under the span that started them.
+    Off by default; `span()` then costs one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_id = ""
+        self.spans: List[Span] = []
+
+    def start(self):
+        self.enabled = True
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+
+    def stop(self) -> List[Span]:
+        self.enabled = False
+        return self.spans
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Union[Span, NullSpan]]:
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        parent = _current.get()
+        span = Span(name, self.trace_id, parent.span_id if parent else None, attributes)
+        self.spans.append(span)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current.reset(token)
+
+tracer = Tracer()
+span = tracer.span
+
+def current_span() -> Union[Span, NullSpan]:
+    """The innermost open span, for adding attributes (e.g. token counts reported by a provider)."""
+    return (_current.get() if tracer.enabled else None) or NULL_SPAN
+
+def otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def otlp_trace(spans: List[Span]) -> dict:
+    """The spans as an OpenTelemetry OTLP/JSON export (one resource, one scope)."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "avs-toolkit"}}]},
+            "scopeSpans": [{
+                "scope": {"name": "avs_toolkit"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                        "attributes": [{"key": key, "value": otlp_value(value)} for key, value in s.attributes.items()],
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+def write_trace(path: Path, spans: List[Span], fmt: str = "json"):
+    """Writes the spans as a plain JSON trace or, with fmt='otlp', as OTLP/JSON."""
+    if fmt not in TRACE_FORMATS:
+        raise ValueError(f"Unknown trace format '{fmt}'; expected one of {', '.join(TRACE_FORMATS)}.")
+    if fmt == "otlp":
+        document = otlp_trace(spans)
+    else:
+        document = {"trace_id": spans[0].trace_id if spans else None, "spans": [s.to_dict() for s in spans]}
+    Path(path).write_text(json.dumps(document, indent=2))
+
+def ordered_spans(spans: List[Span]) -> List[tuple]:
+    """(depth, span) pairs in tree order, children by start time."""
+    children: Dict[Optional[str], List[Span]] = {}
+    ids = {s.span_id for s in spans}
+    for s in spans:
+        children.setdefault(s.parent_id if s.parent_id in ids else None, []).append(s)
+
+    rows = []
+    def visit(parent_id: Optional[str], depth: int):
+        for s in sorted(children.get(parent_id, []), key=lambda s: s.start_ns):
+            rows.append((depth, s))
+            visit(s.span_id, depth + 1)
+    visit(None, 0)
+    return rows
+
+SUMMARY_KEYS = ("bytes_sent", "bytes_received", "input_tokens", "output_tokens", "cached_tokens")
+
+def print_profile(spans: List[Span]):
+    """Prints the spans as a waterfall: one row per stage, bars placed on the run's timeline."""
+    if not spans:
+        return
+    origin = min(s.start_ns for s in spans)
+    total = max((s.end_ns or s.start_ns) for s in spans) - origin or 1
+
+    table = Table(title="Run profile", show_lines=False)
+    table.add_column("Stage", no_wrap=True, overflow="ellipsis")
+    table.add_column("Start", justify="right", no_wrap=True)
+    table.add_column("Duration", justify="right", no_wrap=True)
+    table.add_column("Timeline", no_wrap=True, min_width=WATERFALL_WIDTH)
+    table.add_column("Details", style="dim")
+    for depth, s in ordered_spans(spans):
+        offset = int((s.start_ns - origin) / total * WATERFALL_WIDTH)
+        width = max(1, int(((s.end_ns or s.start_ns) - s.start_ns) / total * WATERFALL_WIDTH))
+        label = " ".join(str(s.attributes[key]) for key in ("key", "server", "tool", "backend", "model") if key in s.attributes)
+        details = ", ".join(f"{key}={s.attributes[key]:,}" for key in SUMMARY_KEYS if key in s.attributes)
+        table.add_row(
+            f"{'  ' * depth}{s.name}" + (f" [dim]{escape(label)}[/dim]" if label else "") + (" [red]✗[/red]" if s.error else ""),
+            f"{(s.start_ns - origin) / 1e6:,.0f} ms",
+            f"{s.duration * 1000:,.0f} ms",
+            " " * offset + "█" * max(min(width, WATERFALL_WIDTH - offset), 1),
+            details,
+        )
+    console.print(table)
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import yaml
+from pydantic import BaseModel, Field
+from rich.console import Console
+from rich.table import Table
+
+from .main import assemble_story, load_story
+from .models import AssemblyLimits, ValueStory
+from .runner import product_path, run_story
+
+console = Console()
+
+class StreamStory(BaseModel):
+    """One Value Story in a stream definition."""
+    path: str = Field(..., description="Story file, relative to the stream file.")
+    model: Optional[str] = Field(None, description="Overrides the story's preferred model.")
+
+class StreamDefinition(BaseModel):
+    """
+    An Agentic Value Stream: a set of Value Stories whose products feed each other.
+    Dependencies are not declared; they are derived from product paths and context paths.
+    """
+    name: str = Field("stream", description="Human-readable name of the stream.")
+    stories: List[StreamStory]
+
+class StreamNode(BaseModel):
+    """A story in the dependency graph, with its resolved inputs and product."""
+    source: str
+    story: ValueStory
+    model: Optional[str] = None
+    product: Path
+    inputs: List[List[Path]] = Field(default_factory=list, description="Candidate paths per local context item.")
+    depends_on: Set[str] = Field(default_factory=set)
+    status: str = "pending"
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+def load_definition(path: Path) -> StreamDefinition:
+    """Reads a stream file. Stories may be plain paths or {path, model} mappings."""
+    data = yaml.safe_load(path.read_text()) or {}
+    stories = [{"path": s} if isinstance(s, str) else s for s in data.get("stories", [])]
+    return StreamDefinition(name=data.get("name", path.stem), stories=stories)
+
+def input_candidates(story_source: str, default_path: str) -> List[Path]:
+    """Mirrors assembly's lookup: the working directory first, then the story's own directory."""
+    candidates = [Path(default_path).resolve()]
+    sibling = (Path(story_source).parent / default_path).resolve()
+    if sibling not in candidates:
+        candidates.append(sibling)
+    return candidates
+
+async def build_graph(stream_file: Path) -> Dict[str, StreamNode]:
+    """
+    Loads every story in the stream and links Story A -> Story B whenever A's
+    product path is one of B's context_manifest default_path candidates.
+    """
+    definition = load_definition(stream_file)
+    sources = [str(stream_file.parent / entry.path) for entry in definition.stories]
+    stories = await asyncio.gather(*(load_story(source) for source in sources))
+
+    nodes: Dict[str, StreamNode] = {}
+    for entry, source, story in zip(definition.stories, sources, stories):
+        nodes[source] = StreamNode(
+            source=source,
+            story=story,
+            model=entry.model,
+            product=product_path(story.model_dump()).resolve(),
+            inputs=[
+                input_candidates(source, item.default_path)
+                for item in story.context_manifest
+                if item.default_path and not item.search_query and not item.mcp_tool_name
+            ],
+        )
+
+    producers = {node.product: node.source for node in nodes.values()}
+    for node in nodes.values():
+        for candidates in node.inputs:
+            for candidate in candidates:
+                producer = producers.get(candidate)
+                if producer and producer != node.source:
+                    node.depends_on.add(producer)
+                    break
+
+    ensure_acyclic(nodes)
+    return nodes
+
+def ensure_acyclic(nodes: Dict[str, StreamNode]):
+    """Raises ValueError naming the stories involved if the handoffs form a cycle."""
+    remaining = {source: set(node.depends_on) for source, node in nodes.items()}
+    while remaining:
+        ready = [source for source, deps in remaining.items() if not deps]
+        if not ready:
+            cycle = ", ".join(nodes[source].story.metadata.story_id for source in remaining)
+            raise ValueError(f"Stream contains a handoff cycle between: {cycle}")
+        for source in ready:
+            del remaining[source]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+def fingerprint(node: StreamNode) -> str:
+    """Hash of the story file and every local input that currently exists."""
+    digest = hashlib.sha256(Path(node.source).read_bytes())
+    for candidates in node.inputs:
+        for candidate in candidates:
+            if candidate.is_file():
+                digest.update(str(candidate).encode("utf-8"))
+                digest.update(hashlib.sha256(candidate.read_bytes()).digest())
+                break
+    return digest.hexdigest()
+
+def state_path(stream_file: Path) -> Path:
+    return stream_file.with_name(f".{stream_file.stem}.state.json")
+
+async def run_stream(
+    stream_file: Path,
+    concurrency: int = 4,
+    force: bool = False,
+    limits: Optional[AssemblyLimits] = None,
+    cache_mode: str = "default",
+) -> Dict[str, StreamNode]:
+    """
+    Executes a stream. Independent branches run concurrently (up to `concurrency` stories),
+    and each story starts as soon as all of its upstream stories have succeeded.
+    Stories whose file and inputs are unchanged since their last successful run are skipped.
+    """
+    nodes = await build_graph(stream_file)
+    state_file = state_path(stream_file)
+    state = {} if force or not state_file.exists() else json.loads(state_file.read_text())
+    slots = asyncio.Semaphore(concurrency)
+    done: Dict[str, asyncio.Future] = {source: asyncio.get_running_loop().create_future() for source in nodes}
+
+    async def execute(node: StreamNode):
+        try:
+            upstream = [await done[dep] for dep in node.depends_on]
+            if not all(upstream):
+                node.status = "blocked"
+                node.error = "An upstream story did not succeed."
+                return
+
+            story_id = node.story.metadata.story_id
+            current = fingerprint(node)
+            previous = state.get(node.source, {})
+            if previous.get("fingerprint") == current and node.product.exists():
+                node.status = "skipped"
+                console.print(f"  [dim]↷ {story_id} unchanged, skipping.[/dim]")
+                return
+
+            async with slots:
+                started = time.perf_counter()
+                console.print(f"\n[bold blue]▶ {story_id}[/bold blue]")
+                if node.story.is_assembled:
+                    briefcase, assembled = node.source, node.story
+                else:
+                    briefcase, assembled = await assemble_story(node.source, limits, cache_mode, node.story)
+                model = node.model or node.story.metadata.preferred_model or "llama3"
+                product = await run_story(str(briefcase), model=model, story=assembled.model_dump())
+                node.seconds = round(time.perf_counter() - started, 3)
+
+            if not product:
+                node.status = "failed"
+                node.error = "Agent returned an empty response."
+                return
+
+            node.status = "ok"
+            # The product just written feeds the fingerprint of downstream stories
+            state[node.source] = {
+                "fingerprint": current,
+                "product": str(product),
+                "completed_at": datetime.now().isoformat(),
+            }
+            state_file.write_text(json.dumps(state, indent=2))
+        except Exception as e:
+            node.status = "failed"
+            node.error = str(e) or type(e).__name__
+        finally:
+            done[node.source].set_result(node.status in ("ok", "skipped"))
+
+    await asyncio.gather(*(execute(node) for node in nodes.values()))
+    return nodes
+
+def print_stream_summary(name: str, nodes: Dict[str, StreamNode]):
+    table = Table(title=f"Stream: {name}", show_header=True, header_style="bold magenta")
+    table.add_column("Story", style="cyan")
+    table.add_column("Depends On")
+    table.add_column("Status", justify="center")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Product / Error")
+
+    styles = {"ok": "green", "skipped": "dim", "failed": "red", "blocked": "yellow"}
+    for node in nodes.values():
+        style = styles.get(node.status, "white")
+        depends = ", ".join(nodes[dep].story.metadata.story_id for dep in sorted(node.depends_on)) or "-"
+        table.add_row(
+            node.story.metadata.story_id,
+            depends,
+            f"[{style}]{node.status}[/{style}]",
+            f"{node.seconds:.2f}",
+            str(node.product) if node.status in ("ok", "skipped") else (node.error or "")[:80],
+        )
+    console.print(table)
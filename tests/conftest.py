@@ -1,5 +1,28 @@
 import pytest
 from pathlib import Path
+from avs_toolkit.ratelimit import limiters
+from avs_toolkit.routing import backend_stats
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keeps assembly caches out of the user's home directory during tests."""
+    cache_dir = tmp_path / "avs-cache"
+    monkeypatch.setenv("AVS_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+@pytest.fixture(autouse=True)
+def fresh_backend_stats():
+    """Routing stats are process-wide; each test starts without history."""
+    backend_stats.clear()
+    yield
+    backend_stats.clear()
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiters():
+    """Rate limiter buckets are process-wide; each test starts with full quotas."""
+    limiters.clear()
+    yield
+    limiters.clear()
 
 @pytest.fixture
 def project_root():
@@ -0,0 +1,66 @@
+import json
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+from avs_toolkit.main import app
+from avs_toolkit.batch import discover_stories
+
+runner = CliRunner()
+
+STORY = """
+metadata:
+  story_id: "{story_id}"
+  provider: "{provider}"
+goal:
+  as_a: "As a Builder"
+  i_want: "To run many stories in one batch"
+  so_that: "Nightly runs are cheap."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "research"
+    search_query: "Query for {story_id}"
+product:
+  output_path: "out"
+"""
+
+@pytest.fixture
+def story_dir(tmp_path):
+    stories = tmp_path / "stories"
+    stories.mkdir()
+    for i, provider in enumerate(["ollama", "google-gemini", "ollama"], 1):
+        (stories / f"VS-B{i}.md").write_text(STORY.format(story_id=f"VS-B{i}", provider=provider))
+    (stories / "broken.md").write_text("Not a story")
+    (stories / "VS-B1-assembled.yaml").write_text("ignored")
+    return stories
+
+def test_discover_stories_from_directory_and_manifest(story_dir, tmp_path):
+    names = [Path(p).name for p in discover_stories(str(story_dir))]
+    assert names == ["VS-B1.md", "VS-B2.md", "VS-B3.md", "broken.md"]
+
+    manifest = tmp_path / "nightly.txt"
+    manifest.write_text("# nightly\nstories/VS-B2.md\n\nstories/VS-B3.md\n")
+    assert discover_stories(str(manifest)) == [str(tmp_path / "stories/VS-B2.md"), str(tmp_path / "stories/VS-B3.md")]
+
+    glob_names = [Path(p).name for p in discover_stories(str(story_dir / "VS-B*.md"))]
+    assert glob_names == ["VS-B1.md", "VS-B2.md", "VS-B3.md"]
+
+def test_batch_command_writes_report(story_dir, tmp_path, mocker, monkeypatch):
+    """Valid stories are assembled and run; invalid ones are reported, not fatal to the others."""
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("avs_toolkit.main.dispatch_research", return_value="Mocked Research")
+    run_story = mocker.patch("avs_toolkit.batch.run_story", side_effect=lambda briefcase, model, story, response_cache: Path(briefcase).with_suffix(".out"))
+
+    report = tmp_path / "report.json"
+    result = runner.invoke(app, ["batch", str(story_dir), "--report", str(report), "--concurrency", "2"])
+
+    assert result.exit_code == 1  # broken.md is invalid
+    data = json.loads(report.read_text())
+    assert data["totals"] == {"total": 4, "ok": 3, "empty": 0, "failed": 0, "invalid": 1}
+    statuses = {Path(r["source"]).name: r["status"] for r in data["results"]}
+    assert statuses == {"VS-B1.md": "ok", "VS-B2.md": "ok", "VS-B3.md": "ok", "broken.md": "invalid"}
+    assert run_story.call_count == 3
+    assert (tmp_path / "out" / "VS-B2-assembled.yaml").exists()
@@ -0,0 +1,53 @@
+import pytest
+from avs_toolkit.briefcase import (
+    AVSB_MAGIC, FORMATS, briefcase_filename, convert_briefcase, detect_format, load_briefcase, save_briefcase
+)
+
+STORY = {
+    "metadata": {"story_id": "VS-BC", "provider": "ollama", "assembled_at": "2026-01-01T00:00:00"},
+    "goal": {"as_a": "As a Tester", "i_want": "To store briefcases compactly", "so_that": "Loads are fast."},
+    "instructions": {"execution_steps": [{"step_number": 1, "action": "Read", "validation_rule": "Read"}]},
+    "context_manifest": [
+        {"key": "notes", "content": "Line one\nLine two — with unicode ✓"},
+        {"key": "empty", "content": None},
+        {"key": "data", "content": "x" * 10000},
+    ],
+    "product": {"output_path": "out"},
+}
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip(tmp_path, fmt):
+    """Every format loads back to exactly the story that was saved."""
+    path = save_briefcase(STORY, tmp_path / briefcase_filename("VS-BC", fmt), fmt)
+
+    assert detect_format(path) == fmt
+    assert load_briefcase(path) == STORY
+
+def test_avsb_stores_content_outside_the_header(tmp_path):
+    """AVSB keeps large context content in the blob region, not the JSON header."""
+    path = save_briefcase(STORY, tmp_path / "VS-BC-assembled.avsb")
+    raw = path.read_bytes()
+
+    assert raw.startswith(AVSB_MAGIC)
+    assert b'{"$blob":' in raw
+    assert raw.endswith(b"x" * 10000)
+
+def test_detect_format_ignores_suffix(tmp_path):
+    """Detection sniffs content, so a renamed file still loads."""
+    path = save_briefcase(STORY, tmp_path / "briefcase.yaml", "json")
+
+    assert detect_format(path) == "json"
+    assert load_briefcase(path) == STORY
+
+def test_convert_briefcase(tmp_path):
+    """Converting writes a sibling file with the new suffix."""
+    source = save_briefcase(STORY, tmp_path / "VS-BC-assembled.yaml")
+
+    destination = convert_briefcase(source, "avsb")
+
+    assert destination == tmp_path / "VS-BC-assembled.avsb"
+    assert load_briefcase(destination) == STORY
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown briefcase format"):
+        convert_briefcase(save_briefcase(STORY, tmp_path / "a.yaml"), "xml")
@@ -0,0 +1,56 @@
+import os
+import time
+from avs_toolkit.cache import AssemblyCache, DiskCache
+
+def test_key_is_canonical():
+    """Argument order does not change the cache key."""
+    a = AssemblyCache.key("mcp", "scrape", {"url": "x", "formats": ["markdown"]}, "srv")
+    b = AssemblyCache.key("mcp", "scrape", {"formats": ["markdown"], "url": "x"}, "srv")
+    assert a == b
+    assert a != AssemblyCache.key("mcp", "scrape", {"url": "y"}, "srv")
+
+def test_entries_expire(tmp_path):
+    store = DiskCache(tmp_path)
+    store.set("k1", "value", ttl=-1)
+    assert store.get("k1") is None
+    store.set("k2", "value", ttl=60)
+    assert store.get("k2") == "value"
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    """When over the size cap, the least recently used entries are dropped first."""
+    store = DiskCache(tmp_path, max_bytes=10_000)
+    for i, key in enumerate(["old", "used", "new"]):
+        store.set(key, "x" * 3000)
+        os.utime(store._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+    store.get("used")  # touch: now most recent
+
+    store.set("latest", "x" * 3000)
+    assert store.get("old") is None
+    assert store.get("used") == "x" * 3000
+    assert store.get("latest") == "x" * 3000
+
+def test_modes(tmp_path):
+    store = DiskCache(tmp_path)
+    store.set("k", "cached", ttl=60)
+
+    assert AssemblyCache("refresh", store).get("k") is None
+    offline = AssemblyCache("offline", store)
+    assert offline.get("k") == "cached"
+    offline.set("other", "value", 60)
+    assert store.get("other") is None
+
+def test_concurrent_writes_of_one_key(tmp_path):
+    """Parallel sets of the same key each use their own temp file."""
+    from concurrent.futures import ThreadPoolExecutor
+    store = DiskCache(tmp_path)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda n: store.set("ab" + "0" * 62, f"value {n % 2}", 60), range(64)))
+    assert store.get("ab" + "0" * 62) in ("value 0", "value 1")
+    assert not list(tmp_path.glob("*/.*.tmp"))
+
+def test_failed_write_is_skipped(tmp_path):
+    """A cache that cannot be written to never fails its caller."""
+    (tmp_path / "ab").write_text("not a directory")
+    store = DiskCache(tmp_path)
+    store.set("ab" + "0" * 62, "value", 60)
+    assert store.get("ab" + "0" * 62) is None
@@ -103,4 +103,338 @@ product:
     assert output_file.exists()
     content = output_file.read_text()
     assert "Mocked Research" in content
-    assert "assembled_at" in content
\ No newline at end of file
+    assert "assembled_at" in content
+
+@pytest.mark.asyncio
+async def test_assembly_runs_items_concurrently_in_manifest_order(tmp_path, mocker):
+    """Research items are gathered concurrently but written back in manifest order."""
+    import asyncio
+    import time
+    import yaml
+    from avs_toolkit.main import perform_assembly
+    from avs_toolkit.models import AssemblyLimits
+
+    async def slow_research(query):
+        # Later items finish first to prove ordering does not depend on completion
+        await asyncio.sleep(0.05 * (4 - int(query[-1])))
+        return f"Answer {query}"
+
+    mocker.patch("avs_toolkit.main.dispatch_research", side_effect=slow_research)
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+
+    story_file = tmp_path / "VS-CONC.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-CONC"
+goal:
+  as_a: "As a Builder"
+  i_want: "To assemble a briefcase concurrently"
+  so_that: "It is fast."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - {key: "q1", search_query: "Query 1"}
+  - {key: "q2", search_query: "Query 2"}
+  - {key: "q3", search_query: "Query 3"}
+product:
+  output_path: ""
+""")
+
+    started = time.perf_counter()
+    output = await perform_assembly(str(story_file), AssemblyLimits(research=3))
+    elapsed = time.perf_counter() - started
+
+    assembled = yaml.safe_load(output.read_text())
+    assert [i["content"] for i in assembled["context_manifest"]] == ["Answer Query 1", "Answer Query 2", "Answer Query 3"]
+    # Sequential gathering would take 0.15 + 0.10 + 0.05 = 0.30s
+    assert elapsed < 0.25
+
+CACHED_STORY = """
+metadata:
+  story_id: "VS-CACHE"
+goal:
+  as_a: "As a Builder"
+  i_want: "To reuse research between assemblies"
+  so_that: "Re-assembly costs no network calls."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "research"
+    search_query: "Cached query"
+  - key: "fresh"
+    search_query: "Never cached"
+    cache_ttl: 0
+product:
+  output_path: ""
+"""
+
+def test_assemble_reuses_cached_research(tmp_path, mocker):
+    """A second assembly serves research from the cache; --offline makes no calls at all."""
+    research = mocker.patch("avs_toolkit.main.dispatch_research", return_value="Mocked Research")
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+    story_file = tmp_path / "VS-CACHE.md"
+    story_file.write_text(CACHED_STORY)
+
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    assert research.call_count == 2
+
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    assert research.call_count == 3  # only the cache_ttl: 0 item is fetched again
+
+    result = runner.invoke(app, ["assemble", str(story_file), "--offline"])
+    assert result.exit_code == 0
+    assert research.call_count == 3
+    assert "no cached result for fresh" in result.stdout
+
+    assert runner.invoke(app, ["assemble", str(story_file), "--refresh"]).exit_code == 0
+    assert research.call_count == 5
+
+def test_research_failure_is_flagged_not_guessed_from_text(tmp_path, mocker):
+    """Research that mentions an error is a result; only a raised ResearchError is a failure."""
+    from avs_toolkit.main import ResearchError
+    research = mocker.patch("avs_toolkit.main.dispatch_research", return_value="Fixed the ValueError in parse()")
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+    story_file = tmp_path / "VS-CACHE.md"
+    story_file.write_text(CACHED_STORY)
+
+    result = runner.invoke(app, ["assemble", str(story_file)])
+    assert "Research complete" in result.stdout and "failed" not in result.stdout
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    assert research.call_count == 3  # the cached answer was reused
+
+    research.side_effect = ResearchError("Error: Research failed.")
+    assert "Research failed" in runner.invoke(app, ["assemble", str(story_file), "--refresh"]).stdout
+
+def test_reassembly_only_refetches_changed_items(tmp_path, mocker, isolated_cache):
+    """Unchanged items are copied from the existing briefcase; a changed file is re-read."""
+    import shutil
+    import yaml
+    research = mocker.patch("avs_toolkit.main.dispatch_research", return_value="Mocked Research")
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+
+    notes = tmp_path / "notes.md"
+    notes.write_text("First draft")
+    story_file = tmp_path / "VS-INC.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-INC"
+goal:
+  as_a: "As a Builder"
+  i_want: "To re-assemble only what changed"
+  so_that: "Large stories assemble quickly."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "research"
+    search_query: "Slow query"
+  - key: "notes"
+    default_path: "notes.md"
+product:
+  output_path: ""
+""")
+    briefcase = tmp_path / "VS-INC-assembled.yaml"
+
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    first = yaml.safe_load(briefcase.read_text())["context_manifest"]
+    assert first[1]["fingerprint"]["sha256"]
+    assert first[0]["fingerprint"]["query_sha256"]
+
+    notes.write_text("Second draft, longer")
+    shutil.rmtree(isolated_cache)  # prove reuse does not come from the cache
+    result = runner.invoke(app, ["assemble", str(story_file)])
+    assert result.exit_code == 0
+    assert research.call_count == 1
+    assert "Unchanged:" in result.stdout
+
+    second = yaml.safe_load(briefcase.read_text())["context_manifest"]
+    assert second[0]["content"] == "Mocked Research"
+    assert second[1]["content"] == "Second draft, longer"
+
+    assert runner.invoke(app, ["assemble", str(story_file), "--refresh"]).exit_code == 0
+    assert research.call_count == 2
+
+def test_assemble_binary_briefcase_and_convert(tmp_path, mocker):
+    """--format avsb writes a binary briefcase that validate and convert can read."""
+    mocker.patch("avs_toolkit.main.dispatch_research", return_value="Mocked Research")
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+    story_file = tmp_path / "VS-CACHE.md"
+    story_file.write_text(CACHED_STORY)
+
+    assert runner.invoke(app, ["assemble", str(story_file), "--format", "avsb"]).exit_code == 0
+    briefcase = tmp_path / "VS-CACHE-assembled.avsb"
+    assert briefcase.read_bytes().startswith(b"AVSB")
+
+    assert runner.invoke(app, ["validate", str(briefcase)]).exit_code == 0
+
+    result = runner.invoke(app, ["convert", str(briefcase), "--to", "yaml"])
+    assert result.exit_code == 0
+    assert "Mocked Research" in (tmp_path / "VS-CACHE-assembled.yaml").read_text()
+
+    assert runner.invoke(app, ["assemble", str(story_file), "--format", "xml"]).exit_code != 0
+
+def test_assembly_spills_large_contents_to_sidecar_blobs(tmp_path, mocker, monkeypatch):
+    """Files above the blob threshold are copied to sidecar blobs and reused on re-assembly."""
+    import yaml
+    monkeypatch.setattr("avs_toolkit.blobs.BLOB_MIN_BYTES", 100)
+    mocker.patch("avs_toolkit.main.dispatch_research", return_value="Short research")
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+
+    (tmp_path / "big.md").write_text("x" * 500)
+    story_file = tmp_path / "VS-BLOB.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-BLOB"
+goal:
+  as_a: "As a Builder"
+  i_want: "To keep huge assets out of the briefcase"
+  so_that: "Memory stays flat."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "big"
+    default_path: "big.md"
+  - key: "research"
+    search_query: "Test"
+product:
+  output_path: ""
+""")
+    briefcase = tmp_path / "VS-BLOB-assembled.yaml"
+
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    items = yaml.safe_load(briefcase.read_text())["context_manifest"]
+    assert items[0]["content"] is None
+    assert (tmp_path / items[0]["content_ref"]["path"]).read_text() == "x" * 500
+    assert items[1]["content"] == "Short research"
+
+    result = runner.invoke(app, ["assemble", str(story_file)])
+    assert "Unchanged:" in result.stdout
+    assert yaml.safe_load(briefcase.read_text())["context_manifest"][0]["content_ref"] == items[0]["content_ref"]
+
+    (tmp_path / "big.md").write_text("small")
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    items = yaml.safe_load(briefcase.read_text())["context_manifest"]
+    assert items[0]["content"] == "small" and items[0]["content_ref"] is None
+    assert not (tmp_path / "VS-BLOB-assembled.yaml.blobs").exists()
+
+def test_assembly_stores_binary_mcp_parts_as_blobs(tmp_path, mocker):
+    """Image parts of an MCP result go to sidecar blobs referenced from the briefcase."""
+    import yaml
+    from avs_toolkit.models import ContentPart
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+    mocker.patch("avs_toolkit.main.connect_pool", return_value=None)
+    mocker.patch("avs_toolkit.main.MCPRuntime.start_server")
+    mocker.patch("avs_toolkit.main.MCPRuntime.call_tool_parts", return_value=[
+        ContentPart(type="text", text="Screenshot taken", size=16),
+        ContentPart(type="image", mime_type="image/png", data="iVBORw0KGgo=", size=8),
+    ])
+    story_file = tmp_path / "VS-PARTS.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-PARTS"
+goal:
+  as_a: "As a Builder"
+  i_want: "To keep screenshots from MCP tools"
+  so_that: "Binary results are not flattened away."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "shot"
+    mcp_tool_name: "screenshot"
+    mcp_server: "browser"
+mcp_servers:
+  - name: "browser"
+    command: "npx"
+product:
+  output_path: ""
+""")
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    item = yaml.safe_load((tmp_path / "VS-PARTS-assembled.yaml").read_text())["context_manifest"][0]
+    assert item["content"] == "Screenshot taken\n[image image/png, 8 bytes]"
+    part = item["parts"][0]
+    assert part["data"] is None and part["ref"]["path"].endswith(".png")
+    assert (tmp_path / part["ref"]["path"]).read_bytes() == b"\x89PNG\r\n\x1a\n"
+
+def test_assembly_expands_directory_paths(tmp_path, mocker):
+    """A directory default_path injects every text file in it, skipping binaries."""
+    import yaml
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "one.md").write_text("First note")
+    (notes / "two.md").write_bytes("Zweite Notiz: Größe".encode("cp1252"))
+    (notes / "logo.png").write_bytes(b"\x89PNG\x00\x00\x00")
+    story_file = tmp_path / "VS-DIR.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-DIR"
+goal:
+  as_a: "As a Builder"
+  i_want: "To inject a whole folder of notes"
+  so_that: "Nobody lists files by hand."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "notes"
+    default_path: "notes"
+product:
+  output_path: ""
+""")
+    result = runner.invoke(app, ["assemble", str(story_file)])
+    assert result.exit_code == 0
+    assert "Injected 2 files" in result.stdout
+    content = yaml.safe_load((tmp_path / "VS-DIR-assembled.yaml").read_text())["context_manifest"][0]["content"]
+    assert "First note" in content and "Zweite Notiz: Größe" in content and "PNG" not in content
+
+    mocker.patch("avs_toolkit.ingest.EXPAND_MAX_FILES", 2)
+    result = runner.invoke(app, ["assemble", str(story_file)])
+    assert "matches 3 files; only the first 2 are injected" in result.stdout
+    content = yaml.safe_load((tmp_path / "VS-DIR-assembled.yaml").read_text())["context_manifest"][0]["content"]
+    assert "First note" in content and "Zweite" not in content
+
+def test_files_mentioning_errors_are_fingerprinted(tmp_path, mocker):
+    """Only failed MCP/research calls count as errors; a log saying 'Error' is reused like any file."""
+    import yaml
+    mocker.patch("pathlib.Path.cwd", return_value=tmp_path)
+    (tmp_path / "log.md").write_text("Error: disk full")
+    story_file = tmp_path / "VS-LOG.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-LOG"
+goal:
+  as_a: "As a Builder"
+  i_want: "To inject an incident log"
+  so_that: "The post-mortem has the facts."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase now"
+      rule: "Done successfully"
+context_manifest:
+  - key: "log"
+    default_path: "log.md"
+product:
+  output_path: ""
+""")
+    assert runner.invoke(app, ["assemble", str(story_file)]).exit_code == 0
+    item = yaml.safe_load((tmp_path / "VS-LOG-assembled.yaml").read_text())["context_manifest"][0]
+    assert item["content"] == "Error: disk full" and item["fingerprint"]["sha256"]
+
+    assert "Unchanged:" in runner.invoke(app, ["assemble", str(story_file)]).stdout
@@ -0,0 +1,21 @@
+import time
+from avs_toolkit.fingerprint import is_unchanged, item_fingerprint
+from avs_toolkit.models import ContextManifestItem
+
+def aged(item, seconds):
+    fingerprint = item_fingerprint(item, "research")
+    fingerprint["fetched_at"] = time.time() - seconds
+    return fingerprint
+
+def test_results_expire_after_the_default_ttl(monkeypatch):
+    """Items without a cache_ttl use AVS_CACHE_TTL, as the assembly cache does."""
+    monkeypatch.setenv("AVS_CACHE_TTL", "60")
+    item = ContextManifestItem(key="news", search_query="Latest news")
+
+    assert is_unchanged(aged(item, 10), item, "research")
+    assert not is_unchanged(aged(item, 120), item, "research")
+    assert is_unchanged(aged(item, 120), item, "research", ttl=600)
+
+def test_zero_ttl_is_never_unchanged():
+    item = ContextManifestItem(key="news", search_query="Latest news", cache_ttl=0)
+    assert not is_unchanged(aged(item, 0), item, "research")
@@ -0,0 +1,64 @@
+import asyncio
+import httpx
+import pytest
+from avs_toolkit.http_client import HTTPClientManager
+
+def test_client_is_shared_within_a_loop_and_renewed_across_loops():
+    """Calls on one event loop reuse a client; a new loop gets a fresh one."""
+    manager = HTTPClientManager()
+
+    async def grab():
+        first, second = manager.client(), manager.client()
+        assert first is second
+        return first
+
+    client_a = asyncio.run(grab())
+    client_b = asyncio.run(grab())
+    assert client_a is not client_b
+
+@pytest.mark.asyncio
+async def test_host_slots_cap_concurrency_per_host():
+    manager = HTTPClientManager(max_per_host=2)
+    in_flight = {"api.example.com": 0, "other.example.com": 0}
+    peak = dict(in_flight)
+
+    async def hold(url, host):
+        async with manager.host_slot(url):
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+
+    await asyncio.gather(
+        *(hold(f"https://api.example.com/{i}", "api.example.com") for i in range(5)),
+        *(hold(f"https://other.example.com/{i}", "other.example.com") for i in range(5)),
+    )
+    assert peak == {"api.example.com": 2, "other.example.com": 2}
+    await manager.aclose()
+
+@pytest.mark.asyncio
+async def test_post_retries_rate_limited_and_server_errors(mocker):
+    """429 and 5xx responses are retried with backoff; other statuses are returned at once."""
+    manager = HTTPClientManager(retries=2)
+    sleep = mocker.patch("avs_toolkit.http_client.asyncio.sleep", new=mocker.AsyncMock())
+    limited = httpx.Response(429, headers={"Retry-After": "3"})
+    post = mocker.patch("httpx.AsyncClient.post", side_effect=[limited, httpx.Response(503), httpx.Response(200)])
+
+    response = await manager.post("https://api.example.com/generate", json={})
+    assert response.status_code == 200
+    assert post.call_count == 3
+    assert sleep.await_args_list[0].args == (3.0,)
+
+    post.side_effect = [httpx.Response(400)]
+    assert (await manager.post("https://api.example.com/generate", json={})).status_code == 400
+    await manager.aclose()
+
+@pytest.mark.asyncio
+async def test_retries_give_up_after_the_configured_attempts(mocker):
+    manager = HTTPClientManager(retries=1)
+    mocker.patch("avs_toolkit.http_client.asyncio.sleep", new=mocker.AsyncMock())
+    post = mocker.patch("httpx.AsyncClient.post", return_value=httpx.Response(500))
+
+    assert (await manager.post("https://api.example.com/generate", json={})).status_code == 500
+    assert post.call_count == 2
+    await manager.aclose()
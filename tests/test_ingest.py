@@ -0,0 +1,46 @@
+import codecs
+from avs_toolkit.ingest import detect_encoding, expand_paths, is_binary, limit_paths, read_text_file, stores_verbatim
+
+def test_detect_encoding():
+    """BOMs win, UTF-8 is tolerated when cut mid-character, anything else falls back."""
+    assert detect_encoding(codecs.BOM_UTF16_LE + "hi".encode("utf-16-le")) == "utf-16"
+    assert detect_encoding("naïve café".encode("utf-8")[:-1]) == "utf-8"
+    assert detect_encoding("naïve café".encode("cp1252")) != "utf-8"
+
+def test_read_text_file_decodes_legacy_encodings(tmp_path):
+    path = tmp_path / "legacy.txt"
+    path.write_bytes("Prix: 12 €".encode("cp1252"))
+    assert read_text_file(path) == "Prix: 12 €"
+    assert not stores_verbatim(path)
+
+def test_large_files_are_read_as_head_and_tail_excerpts(tmp_path):
+    path = tmp_path / "huge.log"
+    path.write_text("A" * 1000 + "B" * 1000 + "C" * 1000)
+    text = read_text_file(path, max_bytes=200)
+    assert text.startswith("A" * 100 + "\n\n[... 2,800 bytes omitted from huge.log ...]")
+    assert text.endswith("C" * 100)
+
+def test_expand_paths_globs_and_directories(tmp_path):
+    """Directories expand recursively without hidden entries; later bases are fallbacks."""
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / ".git").mkdir()
+    for name in ("a.md", "b.txt", "sub/c.md", ".git/config"):
+        (docs / name).write_text(name)
+
+    assert expand_paths("docs", [tmp_path]) == [docs / "a.md", docs / "b.txt", docs / "sub" / "c.md"]
+    assert expand_paths("docs/**/*.md", [tmp_path / "missing", tmp_path]) == [docs / "a.md", docs / "sub" / "c.md"]
+    assert expand_paths("nothing/*.md", [tmp_path]) == []
+    assert is_binary(b"\x89PNG\x00\x00") and not is_binary(b"plain text")
+
+def test_limit_paths_caps_files_and_bytes(tmp_path):
+    """An expansion stops at the file count or total size cap, keeping the leading files."""
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.md"
+        path.write_text("x" * 100)
+        paths.append(path)
+
+    assert limit_paths(paths, max_files=3, max_bytes=0) == paths[:3]
+    assert limit_paths(paths, max_files=0, max_bytes=250) == paths[:2]
+    assert limit_paths(paths, max_files=0, max_bytes=0) == paths
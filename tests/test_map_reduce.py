@@ -0,0 +1,57 @@
+import re
+import pytest
+from avs_toolkit.blobs import blob_dir, store_text
+from avs_toolkit.map_reduce import map_reduce_payload, split_context
+from avs_toolkit.packing import ContextBudgetError, estimate_tokens
+
+def test_split_context_covers_every_byte_of_a_blob(tmp_path):
+    """A blob larger than a chunk is split into consecutive byte ranges without loss."""
+    briefcase = tmp_path / "VS-1-assembled.yaml"
+    text = "".join(f"line {i} ✓\n" for i in range(3000))
+    ref = store_text(blob_dir(briefcase), text)
+    items = [{"key": "small", "content": "Short note"}, {"key": "big", "content_ref": ref}]
+
+    chunks = split_context(items, briefcase, chunk_tokens=2000)
+
+    assert len(chunks) > 3
+    assert all(estimate_tokens(str(chunk)) <= 2000 for chunk in chunks)
+    pieces = [re.search(r"--- START big \(part \d+/\d+\) ---\n(.*?)\n--- END ---", str(c), re.S) for c in chunks]
+    assert "".join(p.group(1) for p in pieces if p) == text
+
+class MergingProvider:
+    def __init__(self):
+        self.merges = 0
+
+    async def generate(self, system_prompt, user_payload, model):
+        if "Merge them" in user_payload:
+            self.merges += 1
+            return "merged"
+        return "finding " * 300
+
+@pytest.mark.asyncio
+async def test_partials_over_budget_are_merged_before_the_final_call():
+    provider = MergingProvider()
+    story = {"context_manifest": [{"key": f"d{i}", "content": "y" * 5000} for i in range(8)]}
+
+    payload = await map_reduce_payload(provider, "System", story, None, "llama3", budget=2000, fan_out=3)
+
+    assert provider.merges >= 2
+    assert payload.startswith("PARTIAL RESULTS:\n") and "merged" in payload
+    assert estimate_tokens(payload) <= 2000
+
+@pytest.mark.asyncio
+async def test_merges_that_make_no_progress_raise_instead_of_overflowing():
+    """Partials that no merge can shrink stop after one round rather than exceed the budget."""
+    class VerboseProvider:
+        calls = 0
+
+        async def generate(self, system_prompt, user_payload, model):
+            self.calls += 1
+            return "finding " * 300
+
+    provider = VerboseProvider()
+    story = {"context_manifest": [{"key": f"d{i}", "content": "y" * 3000} for i in range(4)]}
+
+    with pytest.raises(ContextBudgetError, match="could not merge 4 partial results"):
+        await map_reduce_payload(provider, "System", story, None, "llama3", budget=1000)
+    assert provider.calls == 8  # four maps, then one round of four merges
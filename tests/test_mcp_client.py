@@ -0,0 +1,282 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from mcp import types
+from avs_toolkit.mcp_client import MCPRuntime, MCPToolError, execute_mcp_item, render_text, result_parts
+from avs_toolkit.models import ContextManifestItem, MCPServerConfig
+
+def make_runtime(tools_by_server):
+    """Builds an MCPRuntime whose sessions are fakes exposing the given tool names."""
+    runtime = MCPRuntime([MCPServerConfig(name=name, command="npx") for name in tools_by_server])
+    sessions = {}
+    for name, tools in tools_by_server.items():
+        session = MagicMock()
+        listed = MagicMock()
+        listed.tools = [MagicMock() for _ in tools]
+        for tool, tool_name in zip(listed.tools, tools):
+            tool.name = tool_name
+        session.list_tools = AsyncMock(return_value=listed)
+        sessions[name] = session
+    runtime._get_session = AsyncMock(side_effect=lambda name: sessions[name])
+    return runtime, sessions
+
+@pytest.mark.asyncio
+async def test_tool_index_is_built_once():
+    """Repeated lookups hit the index instead of listing tools again."""
+    runtime, sessions = make_runtime({"search": ["search"], "scraper": ["scrape", "crawl"]})
+
+    assert await runtime.discover_server_for_tool("scrape") == "scraper"
+    assert await runtime.discover_server_for_tool("crawl") == "scraper"
+    assert await runtime.discover_server_for_tool("search") == "search"
+
+    for session in sessions.values():
+        session.list_tools.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_tool_index_prefers_first_declared_server():
+    """When two servers expose the same tool, manifest order decides."""
+    runtime, _ = make_runtime({"primary": ["scrape"], "secondary": ["scrape"]})
+    assert await runtime.discover_server_for_tool("scrape") == "primary"
+
+@pytest.mark.asyncio
+async def test_explicit_server_skips_discovery():
+    """An item naming its server never triggers discovery; its mcp_timeout goes with the call."""
+    runtime, sessions = make_runtime({"a": ["scrape"], "b": ["scrape"]})
+    runtime.call_tool = AsyncMock(return_value="scraped")
+
+    item = ContextManifestItem(key="page", mcp_tool_name="scrape", mcp_server="b", mcp_timeout=30)
+    assert await execute_mcp_item(runtime, item) == "scraped"
+
+    runtime.call_tool.assert_awaited_once_with(server_name="b", tool_name="scrape", tool_args={}, timeout=30)
+    for session in sessions.values():
+        session.list_tools.assert_not_awaited()
+
+def fake_host(delays):
+    """A stand-in for MCPRuntime._host_server: each server becomes ready after its delay (None: never)."""
+    launches = []
+
+    async def host(config, ready, stop):
+        launches.append(config.name)
+        if delays[config.name] is None:
+            await stop.wait()
+            return
+        await asyncio.sleep(delays[config.name])
+        ready.set_result(MagicMock())
+        await stop.wait()
+    return host, launches
+
+@pytest.mark.asyncio
+async def test_prewarm_starts_servers_concurrently():
+    """Startup latencies overlap instead of adding up."""
+    runtime = MCPRuntime([MCPServerConfig(name=name, command="npx") for name in ("a", "b", "c")])
+    runtime._host_server, launches = fake_host({"a": 0.2, "b": 0.2, "c": 0.2})
+
+    started = time.perf_counter()
+    assert await runtime.prewarm() == {"a": None, "b": None, "c": None}
+    assert time.perf_counter() - started < 0.5
+    assert sorted(runtime.sessions) == ["a", "b", "c"]
+    await runtime.shutdown()
+
+@pytest.mark.asyncio
+async def test_prewarm_reports_startup_timeout_per_server():
+    """A hung server is reported after its startup_timeout; the others still start."""
+    runtime = MCPRuntime([
+        MCPServerConfig(name="ok", command="npx"),
+        MCPServerConfig(name="hung", command="npx", startup_timeout=0.1),
+    ])
+    runtime._host_server, launches = fake_host({"ok": 0.01, "hung": None})
+
+    results = await runtime.prewarm(["ok", "hung", "unknown"])
+    assert results["ok"] is None
+    assert "did not start within 0.1s" in results["hung"]
+    assert "unknown" not in results
+    assert "hung" not in runtime._hosts
+
+    # Calls queued behind the failed launch fail fast instead of waiting again
+    with pytest.raises(TimeoutError):
+        await runtime._get_session("hung")
+    assert launches.count("hung") == 1
+    await runtime.shutdown()
+
+@pytest.mark.asyncio
+async def test_calls_to_a_server_that_never_starts_fail_fast():
+    """Concurrent calls share one startup timeout and report it, not the call timeout."""
+    config = MCPServerConfig(name="hung", command="npx", startup_timeout=0.1, idempotent_tools=["scrape"])
+    runtime = MCPRuntime([config])
+    runtime._host_server, launches = fake_host({"hung": None})
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(runtime.call_tool_parts("hung", "scrape", {}) for _ in range(4)), return_exceptions=True
+    )
+    assert time.perf_counter() - started < 0.5
+    assert launches == ["hung"]
+    for error in results:
+        assert isinstance(error, MCPToolError) and "did not start within 0.1s" in str(error)
+    await runtime.shutdown()
+
+@pytest.mark.asyncio
+async def test_call_tools_pipelines_up_to_in_flight_limit():
+    """Batched calls share one session concurrently, capped per server, and keep their order."""
+    runtime = MCPRuntime([MCPServerConfig(name="scraper", command="npx", max_in_flight=3)])
+    in_flight = peak = 0
+
+    async def call_tool(tool_name, arguments):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.002 * (5 - arguments["n"] % 5))
+        in_flight -= 1
+        content = MagicMock()
+        content.text = f"page {arguments['n']}"
+        return MagicMock(content=[content], isError=False)
+
+    session = MagicMock()
+    session.call_tool = call_tool
+    runtime._get_session = AsyncMock(return_value=session)
+
+    results = await runtime.call_tools("scraper", [("firecrawl_scrape", {"n": n}) for n in range(40)])
+    assert results == [f"page {n}" for n in range(40)]
+    assert peak == 3
+
+def test_result_parts_keep_binary_resources_and_structured_content():
+    """Images, embedded resources and structured content survive as typed parts."""
+    result = types.CallToolResult(
+        content=[
+            types.TextContent(type="text", text="Page title"),
+            types.ImageContent(type="image", data="iVBORw0KGgo=", mimeType="image/png"),
+            types.EmbeddedResource(type="resource", resource=types.BlobResourceContents(
+                uri="file:///report.pdf", blob="JVBERi0=", mimeType="application/pdf"
+            )),
+        ],
+        structuredContent={"status": 200},
+    )
+    parts = result_parts(result)
+    assert [part.type for part in parts] == ["text", "image", "resource", "structured"]
+    assert parts[1].size == 8 and parts[2].uri == "file:///report.pdf"
+    assert parts[3].text == '{"status": 200}'
+    assert render_text(parts, "scrape") == (
+        "Page title\n[image image/png, 8 bytes]\n[resource application/pdf, 5 bytes file:///report.pdf]"
+    )
+
+def test_result_parts_cap_total_size():
+    """Output beyond the cap is cut mid-part and the omission is recorded."""
+    result = types.CallToolResult(content=[
+        types.TextContent(type="text", text="a" * 60),
+        types.TextContent(type="text", text="b" * 60),
+        types.ImageContent(type="image", data="iVBORw0KGgo=", mimeType="image/png"),
+    ])
+    parts = result_parts(result, max_bytes=100)
+    assert [part.text for part in parts[:2]] == ["a" * 60, "b" * 40]
+    assert parts[2].text.startswith("[... 28 bytes of tool output omitted")
+
+def sessions_host(sessions):
+    """A stand-in for MCPRuntime._host_server that hands out the given sessions, one per launch."""
+    launches = iter(sessions)
+
+    async def host(config, ready, stop):
+        ready.set_result(next(launches))
+        await stop.wait()
+    return host
+
+def scripted_session(*replies):
+    """A session whose call_tool hangs (None) or returns a one-text-part result, per call."""
+    replies = iter(replies)
+    session = MagicMock()
+
+    async def call_tool(tool_name, arguments):
+        text = next(replies)
+        if text is None:
+            await asyncio.Event().wait()
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+    session.call_tool = call_tool
+    return session
+
+@pytest.mark.asyncio
+async def test_timed_out_call_restarts_server_and_retries_idempotent_tool(monkeypatch):
+    """A hung call is cancelled, the wedged server replaced, and an idempotent tool retried."""
+    monkeypatch.setattr("avs_toolkit.mcp_client.RETRY_BASE_DELAY", 0)
+    config = MCPServerConfig(name="scraper", command="npx", call_timeout=0.05, idempotent_tools=["scrape"])
+    runtime = MCPRuntime([config])
+    wedged, fresh = scripted_session(None), scripted_session("page")
+    runtime._host_server = sessions_host([wedged, fresh])
+
+    assert await runtime.call_tool("scraper", "scrape", {}) == "page"
+    assert runtime.sessions["scraper"] is fresh
+    await runtime.shutdown()
+
+@pytest.mark.asyncio
+async def test_timed_out_call_to_other_tools_is_not_retried():
+    """Tools not known to be idempotent fail after one attempt; the per-call timeout wins."""
+    runtime = MCPRuntime([MCPServerConfig(name="writer", command="npx", call_timeout=60)])
+    runtime._host_server = sessions_host([scripted_session(None, "unused")])
+
+    with pytest.raises(MCPToolError, match="timed out after 0.05s$"):
+        await runtime.call_tool_parts("writer", "create_page", {}, timeout=0.05)
+    assert "writer" not in runtime.sessions
+
+@pytest.mark.asyncio
+async def test_first_call_learns_idempotent_tools_without_discovery(monkeypatch):
+    """A server reached without discovery is asked for its tool hints, so read-only tools are retried."""
+    monkeypatch.setattr("avs_toolkit.mcp_client.RETRY_BASE_DELAY", 0)
+    runtime = MCPRuntime([MCPServerConfig(name="scraper", command="npx", call_timeout=0.05)])
+    listed = types.ListToolsResult(tools=[types.Tool(
+        name="scrape", inputSchema={"type": "object"}, annotations=types.ToolAnnotations(readOnlyHint=True)
+    )])
+    wedged, fresh = scripted_session(None), scripted_session("page", "again")
+    for session in (wedged, fresh):
+        session.list_tools = AsyncMock(return_value=listed)
+    runtime._host_server = sessions_host([wedged, fresh])
+
+    assert await runtime.call_tool("scraper", "scrape", {}) == "page"
+    assert await runtime.call_tool("scraper", "scrape", {}) == "again"
+    # Once per session: the listing is dropped with the server it came from
+    wedged.list_tools.assert_awaited_once()
+    fresh.list_tools.assert_awaited_once()
+    await runtime.shutdown()
+
+@pytest.mark.asyncio
+async def test_errors_reported_by_the_tool_raise_without_retry():
+    """A result flagged isError is a failure, whatever its text says, and is not retried."""
+    config = MCPServerConfig(name="scraper", command="npx", idempotent_tools=["scrape"])
+    runtime = MCPRuntime([config])
+    calls = []
+
+    async def call_tool(tool_name, arguments):
+        calls.append(tool_name)
+        return types.CallToolResult(content=[types.TextContent(type="text", text="404 Not Found")], isError=True)
+    session = MagicMock()
+    session.call_tool = call_tool
+    runtime._get_session = AsyncMock(return_value=session)
+
+    with pytest.raises(MCPToolError, match="404 Not Found"):
+        await runtime.call_tool_parts("scraper", "scrape", {})
+    assert calls == ["scrape"]
+
+@pytest.mark.asyncio
+async def test_restart_fails_other_in_flight_calls_at_once(monkeypatch):
+    """When one call times out, calls sharing its session are failed and retried, not left hanging."""
+    monkeypatch.setattr("avs_toolkit.mcp_client.RETRY_BASE_DELAY", 0)
+    config = MCPServerConfig(name="scraper", command="npx", call_timeout=30, idempotent_tools=["fetch"])
+    runtime = MCPRuntime([config])
+
+    def session(fetch_delay):
+        async def call_tool(tool_name, arguments):
+            await asyncio.sleep(3600 if tool_name == "hang" else fetch_delay)
+            return types.CallToolResult(content=[types.TextContent(type="text", text=f"{tool_name} ok")])
+        fake = MagicMock()
+        fake.call_tool = call_tool
+        return fake
+    runtime._host_server = sessions_host([session(2.0), session(0.0)])
+
+    started = time.perf_counter()
+    hung, fetched = await asyncio.gather(
+        runtime.call_tool_parts("scraper", "hang", {}, timeout=0.05),
+        runtime.call_tool_parts("scraper", "fetch", {}),
+        return_exceptions=True,
+    )
+    assert time.perf_counter() - started < 1.0
+    assert isinstance(hung, MCPToolError) and str(hung).endswith("timed out after 0.05s")
+    assert fetched[0].text == "fetch ok"
+    await runtime.shutdown()
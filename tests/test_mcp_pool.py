@@ -0,0 +1,140 @@
+import asyncio
+import json
+import socket
+import stat
+import pytest
+from unittest.mock import AsyncMock
+from avs_toolkit.mcp_client import MCPRuntime
+from avs_toolkit.mcp_pool import MCPPool, PoolClient, config_key, connect_pool, token_path
+from avs_toolkit.models import MCPServerConfig
+
+def test_config_key_ignores_server_name():
+    """Servers with the same launch command share one pool entry."""
+    a = MCPServerConfig(name="firecrawl", command="npx", args=["-y", "firecrawl-mcp"])
+    b = MCPServerConfig(name="scraper", command="npx", args=["-y", "firecrawl-mcp"])
+    c = MCPServerConfig(name="firecrawl", command="npx", args=["-y", "firecrawl-mcp"], env={"KEY": "x"})
+    assert config_key(a) == config_key(b)
+    assert config_key(a) != config_key(c)
+
+@pytest.mark.asyncio
+async def test_connect_pool_returns_none_when_not_running(tmp_path):
+    """Without a pool, assembly falls back to ephemeral launches."""
+    assert await connect_pool(tmp_path / "missing.sock") is None
+
+@pytest.mark.asyncio
+async def test_pool_round_trip_and_runtime_routing(tmp_path):
+    """MCPRuntime routes tool calls through a running pool instead of spawning servers."""
+    socket_path = tmp_path / "pool.sock"
+    pool = MCPPool()
+    pool.runtime.call_tool = AsyncMock(return_value="warm result")
+    serve_task = asyncio.create_task(pool.serve(socket_path))
+
+    client = None
+    for _ in range(50):
+        client = await connect_pool(socket_path)
+        if client:
+            break
+        await asyncio.sleep(0.02)
+    assert client is not None
+
+    config = MCPServerConfig(name="scraper", command="npx", args=["firecrawl-mcp"])
+    runtime = MCPRuntime([config], pool=client)
+    runtime._get_session = AsyncMock(side_effect=AssertionError("should not spawn locally"))
+
+    assert await runtime.call_tool("scraper", "scrape", {"url": "https://example.com"}, timeout=12) == "warm result"
+    pool.runtime.call_tool.assert_awaited_once_with(config_key(config), "scrape", {"url": "https://example.com"}, 12)
+
+    status = await client.status()
+    assert [s["key"] for s in status["servers"]] == [config_key(config)]
+
+    await client.stop()
+    await asyncio.wait_for(serve_task, 5)
+    assert not socket_path.exists()
+
+@pytest.mark.asyncio
+async def test_pool_evicts_idle_servers():
+    """Servers unused for longer than idle_timeout are stopped by the health check."""
+    pool = MCPPool(idle_timeout=0)
+    pool.runtime.sessions["abc"] = AsyncMock()
+    pool.last_used["abc"] = 0
+    pool.runtime.close_server = AsyncMock()
+
+    await pool.check_health()
+    pool.runtime.close_server.assert_awaited_once_with("abc")
+
+async def started(pool, socket_path):
+    """Serves the pool in the background and returns (serve task, client) once it answers."""
+    serve_task = asyncio.create_task(pool.serve(socket_path))
+    for _ in range(50):
+        client = await connect_pool(socket_path)
+        if client:
+            return serve_task, client
+        await asyncio.sleep(0.02)
+    raise AssertionError("pool did not start")
+
+@pytest.mark.asyncio
+async def test_pool_socket_is_private(tmp_path):
+    """Only the owner can reach the pool: a 0700 directory holding a 0600 socket."""
+    socket_path = tmp_path / "avs" / "pool.sock"
+    serve_task, client = await started(MCPPool(), socket_path)
+
+    assert stat.S_IMODE(socket_path.parent.stat().st_mode) == 0o700
+    assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+    await client.stop()
+    await asyncio.wait_for(serve_task, 5)
+
+@pytest.mark.asyncio
+async def test_tcp_pool_requires_its_token(tmp_path, monkeypatch):
+    """Without unix sockets the pool listens on TCP and rejects requests lacking the token."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setattr("avs_toolkit.mcp_pool.supports_unix_sockets", lambda: False)
+    monkeypatch.setenv("AVS_MCP_POOL_PORT", str(port))
+    socket_path = tmp_path / "pool.sock"
+    serve_task, client = await started(MCPPool(), socket_path)
+
+    assert stat.S_IMODE(token_path(socket_path).stat().st_mode) == 0o600
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(json.dumps({"op": "status"}).encode("utf-8") + b"\n")
+    response = json.loads(await reader.read())
+    writer.close()
+    assert not response["ok"] and "Unauthorized" in response["error"]
+
+    await client.stop()
+    await asyncio.wait_for(serve_task, 5)
+    assert not token_path(socket_path).exists()
+
+@pytest.mark.asyncio
+async def test_wedged_pool_falls_back_to_local_launches(tmp_path, monkeypatch):
+    """A pool that accepts a call but never answers is abandoned after the call's deadline."""
+    from mcp import types
+    monkeypatch.setattr("avs_toolkit.mcp_pool.REQUEST_MARGIN", 0)
+    socket_path = tmp_path / "pool.sock"
+
+    async def never_answer(reader, writer):
+        await reader.readline()
+        await asyncio.Event().wait()
+    wedged = await asyncio.start_unix_server(never_answer, str(socket_path))
+
+    config = MCPServerConfig(name="scraper", command="npx", startup_timeout=0.05, call_timeout=0.05, retries=0)
+    runtime = MCPRuntime([config], pool=PoolClient(socket_path))
+    session = AsyncMock()
+    session.call_tool.return_value = types.CallToolResult(content=[types.TextContent(type="text", text="local")])
+    runtime._get_session = AsyncMock(return_value=session)
+
+    parts = await asyncio.wait_for(runtime.call_tool_parts("scraper", "scrape", {}), 2)
+    assert parts[0].text == "local"
+    assert runtime.pool is None
+    wedged.close()
+
+def test_spawn_background_pool_closes_its_log_handle(tmp_path, mocker):
+    """The detached pool writes to the log; the spawning process keeps no handle open."""
+    from avs_toolkit.mcp_pool import spawn_background_pool
+    popen = mocker.patch("subprocess.Popen")
+    popen.return_value.pid = 4242
+
+    assert spawn_background_pool(600, 30, tmp_path / "pool.sock") == 4242
+    log_file = popen.call_args.kwargs["stdout"]
+    assert log_file.name == str(tmp_path / "pool.log") and log_file.closed
@@ -57,4 +57,22 @@ def test_metadata_provider_default():
     assert meta.provider == "ollama"
 
     meta_cloud = Metadata(story_id="TEST-CLOUD", provider="google-gemini")
-    assert meta_cloud.provider == "google-gemini"
\ No newline at end of file
+    assert meta_cloud.provider == "google-gemini"
+
+def test_valuestory_mcp_server_must_be_defined():
+    """Test that an item pinned to an unknown MCP server fails governance."""
+    with pytest.raises(ValidationError) as excinfo:
+        ValueStory(
+            metadata=Metadata(story_id="TEST-PIN"),
+            goal=Goal(as_a="Tester", i_want="To fail validation when a pinned server is missing", so_that="Safe"),
+            instructions=Instructions(execution_steps=[
+                {"step_number": 1, "action": "Perform a test action here", "validation_rule": "Verified successfully"}
+            ]),
+            context_manifest=[
+                ContextManifestItem(key="data", mcp_tool_name="scrape", mcp_server="missing")
+            ],
+            mcp_servers=[
+                MCPServerConfig(name="scraper", command="npx", args=["firecrawl"])
+            ]
+        )
+    assert "'missing', which is not defined" in str(excinfo.value)
@@ -0,0 +1,71 @@
+import pytest
+from avs_toolkit.models import ContextManifestItem
+from avs_toolkit.packing import (
+    ContextBudgetError, context_window, estimate_tokens, ollama_num_ctx, pack_context, trim_text
+)
+
+def item(key, tokens, **fields):
+    return {"key": key, "content": "x" * int(tokens * 3.5), **fields}
+
+def test_context_window_table(monkeypatch):
+    monkeypatch.delenv("AVS_CONTEXT_WINDOW", raising=False)
+    assert context_window("llama3") == 8_192
+    assert context_window("llama3.1:70b") == 131_072
+    assert context_window("gemini-2.5-flash") == 1_048_576
+    assert context_window("unknown-model") == 8_192
+    assert context_window("llama3", override=1000) == 1000
+    monkeypatch.setenv("AVS_CONTEXT_WINDOW", "2048")
+    assert context_window("llama3") == 2048
+
+def test_everything_fits():
+    pack = pack_context([item("a", 100), item("b", 100)], "llama3", fixed_tokens=100)
+
+    assert [i.action for i in pack.items] == ["kept", "kept"]
+    assert pack.used_tokens == 300
+    assert not pack.changed
+
+def test_priority_decides_what_is_trimmed_and_dropped():
+    """Higher priorities are admitted first; the rest is trimmed, then dropped."""
+    items = [
+        item("background", 3000),
+        item("notes", 3000, priority=5, truncation="tail"),
+        item("appendix", 3000, truncation="drop"),
+        item("brief", 1000, priority=10),
+    ]
+    pack = pack_context(items, "custom", fixed_tokens=500, window=8000)  # 6000 left after the reserve
+
+    actions = {i.label: i.action for i in pack.items}
+    assert actions == {"brief": "kept", "notes": "kept", "background": "trimmed", "appendix": "dropped"}
+    assert pack.used_tokens <= pack.window - pack.reserve
+
+def test_never_policy_fails_before_sending():
+    with pytest.raises(ContextBudgetError, match="'contract'"):
+        pack_context([item("contract", 10_000, truncation="never")], "llama3", fixed_tokens=100)
+
+def test_instructions_alone_over_budget():
+    with pytest.raises(ContextBudgetError, match="instructions alone"):
+        pack_context([], "phi3", fixed_tokens=5000)
+
+def test_blob_items_are_estimated_from_their_size():
+    blob = {"key": "big", "content": None, "content_ref": {"path": "b/x.txt", "size": 350_000, "sha256": "x"}}
+    pack = pack_context([blob], "llama3", fixed_tokens=100)
+
+    assert pack.items[0].tokens == 100_000
+    assert pack.items[0].action == "trimmed"
+
+def test_trim_text_keeps_head_or_tail():
+    pack = pack_context([item("a", 3000), item("b", 3000, truncation="tail")], "custom", fixed_tokens=0, window=5000)
+    head, tail = pack.items
+    text = "START" + "x" * 10_000 + "END"
+
+    assert trim_text(text, head).startswith("START") and "truncated" in trim_text(text, head)
+    assert trim_text(text, tail).endswith("END")
+    assert estimate_tokens(trim_text(text, tail)) <= tail.kept_tokens + 20
+
+def test_ollama_num_ctx_covers_prompt_and_answer():
+    pack = pack_context([item("a", 3000)], "llama3.1", fixed_tokens=100)
+    assert ollama_num_ctx(pack) == 8192  # 3100 prompt + 4096 reserve, rounded up
+
+def test_unknown_truncation_policy_is_rejected():
+    with pytest.raises(ValueError, match="truncation must be one of"):
+        ContextManifestItem(key="a", truncation="middle")
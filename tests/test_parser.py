@@ -62,3 +62,62 @@ key: [ unclosed list
 """
     data = parse_markdown_story(content)
     assert data == {} 
+
+def test_parse_story_returns_validated_story_and_spans(sample_markdown_story):
+    """The fast path validates once and reports where the YAML came from."""
+    from avs_toolkit.parser import parse_story
+
+    parsed = parse_story(sample_markdown_story.replace("\n", "\r\n"))
+    assert parsed.story.metadata.story_id == "TEST-002"
+    assert [(s.kind, s.start_line, s.end_line) for s in parsed.spans] == [("yaml_block", 4, 17)]
+
+def test_parse_story_accepts_assembled_yaml(sample_yaml_story):
+    from avs_toolkit.parser import parse_story
+
+    parsed = parse_story(sample_yaml_story.replace('status: "draft"', 'assembled_at: "2026-01-01"'))
+    assert parsed.story.is_assembled
+    assert parsed.spans[0].kind == "document"
+
+def test_parse_story_rejects_invalid_story():
+    from pydantic import ValidationError
+    from avs_toolkit.parser import parse_story
+
+    with pytest.raises(ValidationError):
+        parse_story("Not a story")
+
+def test_parse_story_keeps_context_item_options():
+    """Per-item routing, caching, packing and timeout options survive Markdown parsing."""
+    from avs_toolkit.parser import parse_story
+
+    parsed = parse_story("""
+# VS-OPTS: Item options
+
+```yaml
+metadata:
+  story_id: "VS-OPTS"
+goal:
+  as_a: "As a Builder"
+  i_want: "To tune each context item"
+  so_that: "Slow tools cannot stall assembly."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Assemble the briefcase"
+      validation_rule: "Briefcase written"
+context_manifest:
+  - key: "page"
+    mcp_tool_name: "scrape"
+    mcp_server: "firecrawl"
+    mcp_timeout: 7
+    cache_ttl: 60
+    priority: 2
+    truncation: "tail"
+mcp_servers:
+  - name: "firecrawl"
+    command: "npx"
+```
+""")
+    item = parsed.story.context_manifest[0]
+    assert (item.mcp_server, item.mcp_timeout, item.cache_ttl, item.priority, item.truncation) == (
+        "firecrawl", 7, 60, 2, "tail"
+    )
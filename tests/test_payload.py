@@ -0,0 +1,90 @@
+import json
+import pytest
+from avs_toolkit.blobs import blob_dir, iter_text, prune, store_file, store_text
+from avs_toolkit.payload import PromptPayload, json_request
+
+TEXT = "Zażółć gęślą jaźń ✓ " * 500
+
+def test_store_text_is_content_addressed(tmp_path):
+    directory = blob_dir(tmp_path / "VS-1-assembled.yaml")
+
+    first = store_text(directory, TEXT)
+    second = store_text(directory, TEXT)
+
+    assert first == second
+    assert first["path"] == f"VS-1-assembled.yaml.blobs/{first['sha256']}.txt"
+    assert first["size"] == len(TEXT.encode("utf-8"))
+    assert len(list(directory.iterdir())) == 1
+
+def test_briefcase_formats_keep_separate_blobs(tmp_path):
+    """Pruning the JSON briefcase's blobs leaves those of the YAML briefcase alone."""
+    yaml_ref = store_text(blob_dir(tmp_path / "VS-1-assembled.yaml"), TEXT)
+    prune(blob_dir(tmp_path / "VS-1-assembled.json"), [])
+
+    assert (tmp_path / yaml_ref["path"]).is_file()
+
+def test_store_file_matches_store_text(tmp_path):
+    source = tmp_path / "big.md"
+    source.write_text(TEXT, encoding="utf-8")
+
+    assert store_file(tmp_path / "blobs", source) == store_text(tmp_path / "blobs", TEXT)
+
+def test_concurrent_store_file_with_same_basename(tmp_path, monkeypatch):
+    """Files sharing a name are copied at once without clobbering each other's temp file."""
+    import hashlib
+    from concurrent.futures import ThreadPoolExecutor
+    monkeypatch.setattr("avs_toolkit.blobs.CHUNK_BYTES", 256)
+    sources = []
+    for n in range(8):
+        (tmp_path / f"dir{n}").mkdir()
+        source = tmp_path / f"dir{n}" / "data.md"
+        source.write_text(f"{n}" * 64 * 1024)
+        sources.append(source)
+
+    with ThreadPoolExecutor(8) as pool:
+        refs = list(pool.map(lambda source: store_file(tmp_path / "blobs", source), sources + sources))
+
+    for source, ref in zip(sources + sources, refs):
+        blob = (tmp_path / "blobs" / f"{ref['sha256']}.txt").read_bytes()
+        assert blob == source.read_bytes()
+        assert hashlib.sha256(blob).hexdigest() == ref["sha256"]
+    assert not list((tmp_path / "blobs").glob(".*"))
+
+def test_iter_text_never_splits_characters(tmp_path):
+    """Chunks cut through multi-byte characters are still decoded whole."""
+    ref = store_text(tmp_path / "blobs", TEXT)
+    chunks = list(iter_text(tmp_path / ref["path"], chunk_bytes=7))
+
+    assert "".join(chunks) == TEXT
+    assert "�" not in "".join(chunks)
+
+def test_prune_removes_unreferenced_blobs(tmp_path):
+    directory = tmp_path / "blobs"
+    keep = store_text(directory, "keep")
+    store_text(directory, "drop")
+
+    prune(directory, [keep["sha256"]])
+    assert [p.stem for p in directory.iterdir()] == [keep["sha256"]]
+
+    prune(directory, [])
+    assert not directory.exists()
+
+@pytest.mark.asyncio
+async def test_streamed_body_is_the_json_of_the_materialized_body(tmp_path):
+    """A payload with blobs streams exactly the JSON that `json=` would have sent."""
+    ref = store_text(tmp_path / "blobs", 'quotes " and \\ backslashes\n' + TEXT)
+    payload = PromptPayload()
+    payload.append("CONTEXT:\n")
+    payload.append_blob(tmp_path / ref["path"])
+    payload.append("\nEND")
+    body = {"model": "llama3", "prompt": payload, "options": {"temperature": 0.2}}
+
+    kwargs = json_request(body)
+    raw = b"".join([chunk async for chunk in kwargs["content"]])
+
+    assert kwargs["headers"]["Content-Type"] == "application/json"
+    assert json.loads(raw) == {**body, "prompt": str(payload)}
+
+def test_plain_string_payload_uses_json_body():
+    body = {"prompt": "hello"}
+    assert json_request(body) == {"json": body}
@@ -38,3 +38,152 @@ async def test_gemini_provider_call(mocker, monkeypatch):
     args, kwargs = mock_post.call_args
     assert "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent" in args[0]
     assert "key=test-key-123" in args[0]
+
+class FakeStreamResponse:
+    """Minimal stand-in for an httpx streaming response."""
+    def __init__(self, lines, status_code=200):
+        self.lines = lines
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    async def aread(self):
+        return b""
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            yield line
+
+def fake_stream(mocker, lines):
+    from contextlib import asynccontextmanager
+
+    calls = []
+
+    @asynccontextmanager
+    async def stream(self, method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        yield FakeStreamResponse(lines)
+
+    mocker.patch("httpx.AsyncClient.stream", stream)
+    return calls
+
+@pytest.mark.asyncio
+async def test_ollama_provider_stream(mocker):
+    """Test that OllamaProvider yields NDJSON chunks until done."""
+    calls = fake_stream(mocker, [
+        '{"response": "Hel", "done": false}',
+        '{"response": "lo", "done": false}',
+        '{"response": "", "done": true}',
+    ])
+
+    chunks = [chunk async for chunk in OllamaProvider().stream("System", "User Payload", "llama3")]
+
+    assert chunks == ["Hel", "lo"]
+    method, url, kwargs = calls[0]
+    assert url == "http://127.0.0.1:11434/api/generate"
+    assert kwargs["json"]["stream"] is True
+
+@pytest.mark.asyncio
+async def test_gemini_provider_stream(mocker, monkeypatch):
+    """Test that GeminiProvider parses Server-Sent Events from streamGenerateContent."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key-123")
+    calls = fake_stream(mocker, [
+        'data: {"candidates": [{"content": {"parts": [{"text": "Gemini "}]}}]}',
+        '',
+        'data: {"candidates": [{"content": {"parts": [{"text": "streams"}]}}]}',
+    ])
+
+    chunks = [chunk async for chunk in GeminiProvider().stream("System", "User Payload", "gemini-2.5-flash")]
+
+    assert chunks == ["Gemini ", "streams"]
+    assert ":streamGenerateContent?alt=sse&key=test-key-123" in calls[0][1]
+
+@pytest.mark.asyncio
+async def test_ollama_streams_prompt_payload_body(mocker, tmp_path):
+    """A PromptPayload is sent as a streamed JSON body instead of `json=`."""
+    import json
+    from avs_toolkit.blobs import store_text
+    from avs_toolkit.payload import PromptPayload
+
+    ref = store_text(tmp_path, "Blob context")
+    payload = PromptPayload()
+    payload.append_blob(tmp_path.parent / ref["path"])
+    mock_post = mocker.patch("httpx.AsyncClient.post", return_value=MagicMock(status_code=200, json=lambda: {"response": "ok"}))
+
+    assert await OllamaProvider().generate("System", payload, "llama3") == "ok"
+
+    kwargs = mock_post.call_args.kwargs
+    assert "json" not in kwargs
+    body = json.loads(b"".join([chunk async for chunk in kwargs["content"]]))
+    assert body["prompt"] == "Blob context"
+    assert body["system"] == "System"
+
+@pytest.mark.asyncio
+async def test_gemini_prompt_cache_uploads_context_once(mocker, monkeypatch):
+    """The context becomes a cachedContents resource; later calls send only the instructions."""
+    from avs_toolkit.prompt_cache import PromptCacheRegistry
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr("avs_toolkit.providers.gemini.PROMPT_CACHE_MIN_TOKENS", 10)
+    created = MagicMock(status_code=200, json=lambda: {"name": "cachedContents/abc"})
+    answer = MagicMock(status_code=200, json=lambda: {"candidates": [{"content": {"parts": [{"text": "Done"}]}}]})
+    mock_post = mocker.patch("httpx.AsyncClient.post", side_effect=[created, answer, answer])
+    provider = GeminiProvider(prompt_cache=True, registry=PromptCacheRegistry())
+    context = "Large stable context. " * 50
+
+    assert await provider.generate("Step 1: summarize", context, "gemini-2.5-flash") == "Done"
+    assert await provider.generate("Step 1: summarize briefly", context, "gemini-2.5-flash") == "Done"
+
+    urls = [call.args[0] for call in mock_post.call_args_list]
+    assert "/cachedContents?" in urls[0] and ":generateContent" in urls[1] and ":generateContent" in urls[2]
+    upload = mock_post.call_args_list[0].kwargs["json"]
+    assert upload["contents"][0]["parts"][0]["text"] == context
+    request = mock_post.call_args_list[2].kwargs["json"]
+    assert request["cachedContent"] == "cachedContents/abc"
+    assert "systemInstruction" not in request
+    assert request["contents"][0]["parts"][0]["text"].endswith("Step 1: summarize briefly")
+
+@pytest.mark.asyncio
+async def test_gemini_prompt_cache_reuploads_expired_context(mocker, monkeypatch):
+    from avs_toolkit.prompt_cache import PromptCacheRegistry, payload_hash
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr("avs_toolkit.providers.gemini.PROMPT_CACHE_MIN_TOKENS", 10)
+    registry = PromptCacheRegistry()
+    context = "Large stable context. " * 50
+    registry.put("google-gemini", "gemini-2.5-flash", payload_hash(context), "cachedContents/old", 3600)
+    gone = MagicMock(status_code=404, text="not found")
+    created = MagicMock(status_code=200, json=lambda: {"name": "cachedContents/new"})
+    answer = MagicMock(status_code=200, json=lambda: {"candidates": [{"content": {"parts": [{"text": "Done"}]}}]})
+    mock_post = mocker.patch("httpx.AsyncClient.post", side_effect=[gone, created, answer])
+
+    assert await GeminiProvider(prompt_cache=True, registry=registry).generate("System", context, "gemini-2.5-flash") == "Done"
+    assert mock_post.call_args_list[2].kwargs["json"]["cachedContent"] == "cachedContents/new"
+    assert registry.get("google-gemini", "gemini-2.5-flash", payload_hash(context)) == "cachedContents/new"
+
+@pytest.mark.asyncio
+async def test_ollama_prompt_cache_puts_context_first(mocker):
+    mock_post = mocker.patch("httpx.AsyncClient.post", return_value=MagicMock(status_code=200, json=lambda: {"response": "ok"}))
+
+    await OllamaProvider(prompt_cache=True).generate("Step 1: summarize", "CONTEXT", "llama3")
+
+    body = mock_post.call_args.kwargs["json"]
+    assert body["prompt"].startswith("CONTEXT") and body["prompt"].endswith("Step 1: summarize")
+    assert "system" not in body
+    assert body["keep_alive"]
+
+@pytest.mark.asyncio
+async def test_base_urls_are_configurable(mocker, monkeypatch):
+    """AVS_OLLAMA_URL / AVS_GEMINI_URL point the providers at another server (e.g. the benchmark stubs)."""
+    monkeypatch.setenv("AVS_OLLAMA_URL", "http://127.0.0.1:8808/")
+    monkeypatch.setenv("AVS_GEMINI_URL", "http://127.0.0.1:8808/v1beta")
+    monkeypatch.setenv("GEMINI_API_KEY", "fake")
+    mock_post = mocker.patch("httpx.AsyncClient.post", return_value=MagicMock(status_code=200, json=lambda: {"response": "ok"}))
+
+    await OllamaProvider().generate("System", "User Payload", "llama3")
+    await GeminiProvider().generate("System", "User Payload", "gemini-2.5-flash")
+
+    urls = [call.args[0] for call in mock_post.call_args_list]
+    assert urls[0] == "http://127.0.0.1:8808/api/generate"
+    assert urls[1].startswith("http://127.0.0.1:8808/v1beta/models/gemini-2.5-flash:generateContent")
@@ -0,0 +1,59 @@
+import pytest
+from avs_toolkit.ratelimit import RateLimit, RateLimiter, TokenBucket, limiter_for, parse_limits, throttle
+
+def test_bucket_allows_a_burst_then_queues_callers_in_order():
+    bucket = TokenBucket(per_minute=60, updated=0.0)  # one unit per second
+    waits = [bucket.reserve(1, now=0.0) for _ in range(62)]
+    assert waits[:60] == [0.0] * 60
+    assert waits[60:] == pytest.approx([1.0, 2.0])
+    # Refill: ten seconds later the two queued units are paid back, eight remain
+    assert bucket.reserve(8, now=10.0) == 0.0
+    assert bucket.reserve(1, now=10.0) == pytest.approx(1.0)
+
+def test_parse_limits():
+    assert parse_limits("gemini=1000/4000000, tavily=100,local=0") == {
+        "gemini": RateLimit(1000, 4_000_000),
+        "tavily": RateLimit(100, None),
+        "local": RateLimit(None, None),
+    }
+    with pytest.raises(ValueError):
+        parse_limits("gemini=fast")
+
+@pytest.mark.asyncio
+async def test_limiter_waits_on_the_tighter_of_requests_and_tokens(mocker):
+    sleep = mocker.patch("avs_toolkit.ratelimit.asyncio.sleep", new=mocker.AsyncMock())
+    limiter = RateLimiter("gemini", RateLimit(rpm=600, tpm=6_000))
+
+    await limiter.acquire(tokens=6_000)
+    sleep.assert_not_called()
+    await limiter.acquire(tokens=3_000)
+    assert sleep.await_args.args[0] == pytest.approx(30.0, rel=0.01)
+
+def test_limiters_are_per_provider_and_api_key(monkeypatch):
+    monkeypatch.setenv("AVS_RATE_LIMITS", "gemini=10")
+    assert limiter_for("gemini", "key-a") is limiter_for("gemini", "key-a")
+    assert limiter_for("gemini", "key-a") is not limiter_for("gemini", "key-b")
+    assert limiter_for("gemini", "key-a").limit == RateLimit(10, None)
+    assert limiter_for("ollama") is None
+
+def test_shared_state_file_spans_limiter_instances(tmp_path):
+    """Two limiters (as in two processes) on one state file draw from the same bucket."""
+    state = tmp_path / "gemini.json"
+    first, second = RateLimiter("gemini", RateLimit(rpm=2), state), RateLimiter("gemini", RateLimit(rpm=2), state)
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() == pytest.approx(30.0, rel=0.01)
+
+@pytest.mark.asyncio
+async def test_research_is_throttled_per_key(mocker):
+    mocker.patch.dict("os.environ", {"GEMINI_API_KEY": "fake_gemini", "AVS_RATE_LIMITS": "gemini=1"})
+    sleep = mocker.patch("avs_toolkit.ratelimit.asyncio.sleep", new=mocker.AsyncMock())
+    response = mocker.MagicMock(status_code=200)
+    response.json.return_value = {"candidates": [{"content": {"parts": [{"text": "Answer"}]}}]}
+    mocker.patch("httpx.AsyncClient.post", return_value=response)
+    from avs_toolkit.main import research_gemini
+
+    assert await research_gemini("first") == "Answer"
+    assert await research_gemini("second") == "Answer"
+    assert sleep.await_count == 1
+    assert sleep.await_args.args[0] == pytest.approx(60.0, rel=0.01)
@@ -0,0 +1,79 @@
+import pytest
+from avs_toolkit.cache import DiskCache
+from avs_toolkit.providers.base import LLMProvider
+from avs_toolkit.response_cache import CachedProvider
+
+class CountingProvider(LLMProvider):
+    def __init__(self, chunks=("Hello ", "world"), temperature=0.2):
+        self.chunks = list(chunks)
+        self.temperature = temperature
+        self.calls = 0
+
+    def generation_config(self):
+        return {"temperature": self.temperature}
+
+    async def generate(self, system_prompt, user_payload, model):
+        self.calls += 1
+        return "".join(self.chunks)
+
+    async def stream(self, system_prompt, user_payload, model):
+        self.calls += 1
+        self.stream_finished = False
+        for chunk in self.chunks:
+            yield chunk
+        self.stream_finished = True
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskCache(tmp_path / "responses")
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_replayed(store):
+    inner = CountingProvider()
+    cached = CachedProvider(inner, "ollama", store)
+
+    assert await cached.generate("System", "Payload", "llama3") == "Hello world"
+    assert await cached.generate("System", "Payload", "llama3") == "Hello world"
+    assert inner.calls == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("change", ["system", "payload", "model", "config"])
+async def test_any_input_change_misses(store, change):
+    await CachedProvider(CountingProvider(), "ollama", store).generate("System", "Payload", "llama3")
+
+    inner = CountingProvider(temperature=0.7 if change == "config" else 0.2)
+    await CachedProvider(inner, "ollama", store).generate(
+        "Other" if change == "system" else "System",
+        "Other" if change == "payload" else "Payload",
+        "mistral" if change == "model" else "llama3",
+    )
+    assert inner.calls == 1
+
+@pytest.mark.asyncio
+async def test_streams_are_recorded_only_when_complete(store):
+    inner = CountingProvider()
+    cached = CachedProvider(inner, "ollama", store)
+
+    assert [c async for c in cached.stream("System", "Payload", "llama3")] == ["Hello ", "world"]
+    assert [c async for c in cached.stream("System", "Payload", "llama3")] == ["Hello world"]
+    assert inner.calls == 1
+    assert cached.stream_finished
+
+    class CutShort(CountingProvider):
+        async def stream(self, system_prompt, user_payload, model):
+            self.stream_finished = False
+            yield "Hel"
+
+    broken = CachedProvider(CutShort(), "ollama", store)
+    assert [c async for c in broken.stream("System", "Other", "llama3")] == ["Hel"]
+    assert store.get(broken.key("System", "Other", "llama3")) is None
+    assert not broken.stream_finished
+
+@pytest.mark.asyncio
+async def test_empty_responses_are_not_cached(store):
+    inner = CountingProvider(chunks=[])
+    cached = CachedProvider(inner, "ollama", store)
+
+    await cached.generate("System", "Payload", "llama3")
+    await cached.generate("System", "Payload", "llama3")
+    assert inner.calls == 2
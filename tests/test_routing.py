@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from avs_toolkit.providers.base import LLMProvider
+from avs_toolkit.routing import Backend, BackendStats, RoutedProvider, hedge_delay, route, stats_for
+
+def answer(text, delay=0.0, calls=None):
+    async def call():
+        if calls is not None:
+            calls.append(text)
+        await asyncio.sleep(delay)
+        return text
+    return call
+
+def test_stats_track_error_rate_and_p95_of_successful_calls():
+    stats = BackendStats(window=20)
+    for latency in range(1, 21):
+        stats.record(latency / 10, ok=latency % 5 != 0)
+    assert stats.error_rate == pytest.approx(0.2)
+    assert stats.p95 == pytest.approx(1.9)
+    assert stats.healthy
+
+    for _ in range(20):
+        stats.record(0.1, ok=False)
+    assert stats.calls == 20  # rolling window
+    assert not stats.healthy
+
+@pytest.mark.asyncio
+async def test_route_fails_over_in_order_and_records_stats():
+    calls = []
+    result = await route(
+        [Backend("a", answer(None, calls=calls)), Backend("b", answer("B", calls=calls)), Backend("c", answer("C", calls=calls))],
+        hedge=False,
+    )
+    assert result == "B"
+    assert calls == [None, "B"]
+    assert stats_for("a").error_rate == 1.0
+    assert stats_for("b").error_rate == 0.0
+
+@pytest.mark.asyncio
+async def test_route_tries_a_failing_backend_last():
+    for _ in range(5):
+        stats_for("flaky").record(0.1, ok=False)
+    calls = []
+    result = await route([Backend("flaky", answer("F", calls=calls)), Backend("steady", answer("S", calls=calls))], hedge=False)
+    assert result == "S"
+    assert calls == ["S"]
+
+@pytest.mark.asyncio
+async def test_route_counts_exceptions_as_failures():
+    async def boom():
+        raise RuntimeError("unreachable")
+    assert await route([Backend("boom", boom), Backend("ok", answer("OK"))], hedge=False) == "OK"
+    assert stats_for("boom").error_rate == 1.0
+
+@pytest.mark.asyncio
+async def test_hedging_races_a_slow_primary_after_its_p95():
+    for _ in range(10):
+        stats_for("slow").record(0.02, ok=True)
+    assert hedge_delay("slow") == pytest.approx(0.25)  # floor of the hedge delay
+
+    calls = []
+    started = asyncio.get_running_loop().time()
+    result = await route([Backend("slow", answer("slow", 5, calls)), Backend("fast", answer("fast", 0, calls))], hedge=True)
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert result == "fast"
+    assert calls == ["slow", "fast"]
+    assert elapsed < 1
+    assert stats_for("slow").calls == 10  # the cancelled call is not recorded
+
+@pytest.mark.asyncio
+async def test_hedging_does_not_fire_when_the_primary_is_on_time():
+    calls = []
+    result = await route([Backend("p", answer("P", 0, calls)), Backend("s", answer("S", 0, calls))], hedge=True)
+    assert result == "P"
+    assert calls == ["P"]
+
+class ScriptedProvider(LLMProvider):
+    def __init__(self, chunks, finished=True):
+        self.chunks = chunks
+        self.finished = finished
+        self.models = []
+
+    async def generate(self, system_prompt, user_payload, model):
+        self.models.append(model)
+        return "".join(self.chunks) or None
+
+    async def stream(self, system_prompt, user_payload, model):
+        self.models.append(model)
+        self.stream_finished = False
+        for chunk in self.chunks:
+            yield chunk
+        self.stream_finished = self.finished
+
+@pytest.mark.asyncio
+async def test_routed_provider_uses_each_routes_model():
+    primary, fallback = ScriptedProvider([]), ScriptedProvider(["From fallback"])
+    provider = RoutedProvider([("ollama", primary, None), ("google-gemini", fallback, "gemini-2.5-flash")], hedge=False)
+
+    assert await provider.generate("sys", "ctx", "llama3") == "From fallback"
+    assert primary.models == ["llama3"]
+    assert fallback.models == ["gemini-2.5-flash"]
+
+@pytest.mark.asyncio
+async def test_routed_stream_fails_over_only_before_any_output():
+    fallback = ScriptedProvider(["unused"])
+    provider = RoutedProvider([("a", ScriptedProvider([]), None), ("b", ScriptedProvider(["x", "y"]), None)], hedge=False)
+    assert [chunk async for chunk in provider.stream("sys", "ctx", "m")] == ["x", "y"]
+    assert provider.stream_finished
+
+    cut_short = RoutedProvider([("a", ScriptedProvider(["partial"], finished=False), None), ("b", fallback, None)], hedge=False)
+    assert [chunk async for chunk in cut_short.stream("sys", "ctx", "m")] == ["partial"]
+    assert not cut_short.stream_finished
+    assert fallback.models == []
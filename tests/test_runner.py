@@ -0,0 +1,182 @@
+import pytest
+import yaml
+from avs_toolkit.runner import run_story
+
+BRIEFCASE = {
+    "metadata": {"story_id": "VS-RUN", "provider": "ollama", "assembled_at": "2026-01-01T00:00:00"},
+    "goal": {"as_a": "As a Tester", "i_want": "To run a story end to end", "so_that": "It works."},
+    "instructions": {"execution_steps": [{"step_number": 1, "action": "Write it", "validation_rule": "Written"}]},
+    "context_manifest": [{"key": "notes", "content": "Some context"}],
+    "product": {"output_path": "out"},
+}
+
+class FakeProvider:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def generate(self, system_prompt, user_payload, model):
+        return "".join(self.chunks)
+
+    async def stream(self, system_prompt, user_payload, model):
+        for chunk in self.chunks:
+            yield chunk
+
+@pytest.fixture
+def briefcase(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "VS-RUN-assembled.yaml"
+    path.write_text(yaml.dump(BRIEFCASE))
+    return path
+
+@pytest.mark.asyncio
+async def test_run_story_streams_into_product_file(briefcase, tmp_path, mocker):
+    """Streamed chunks are written to the product file as they arrive."""
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=FakeProvider(["# Report\n", "All ", "good."]))
+
+    await run_story(str(briefcase), stream=True)
+
+    assert (tmp_path / "out" / "VS-RUN_output.md").read_text() == "# Report\nAll good."
+
+@pytest.mark.asyncio
+async def test_run_story_stream_empty_leaves_no_product(briefcase, tmp_path, mocker):
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=FakeProvider([]))
+
+    await run_story(str(briefcase), stream=True)
+
+    assert not (tmp_path / "out" / "VS-RUN_output.md").exists()
+
+@pytest.mark.asyncio
+async def test_run_story_stream_cut_short_keeps_the_previous_product(briefcase, tmp_path, mocker):
+    """A stream that ends early fails the run instead of replacing the product with a fragment."""
+    class CutShort(FakeProvider):
+        async def stream(self, system_prompt, user_payload, model):
+            self.stream_finished = False
+            for chunk in self.chunks:
+                yield chunk
+
+    product = tmp_path / "out" / "VS-RUN_output.md"
+    product.parent.mkdir()
+    product.write_text("Previous report")
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=CutShort(["# Rep"]))
+
+    assert await run_story(str(briefcase), stream=True) is None
+    assert product.read_text() == "Previous report"
+    assert list(product.parent.iterdir()) == [product]
+
+@pytest.mark.asyncio
+async def test_run_story_streams_sidecar_blobs_to_the_provider(tmp_path, monkeypatch, mocker):
+    """Content stored in a sidecar blob reaches the provider as a lazily read PromptPayload."""
+    from avs_toolkit.blobs import blob_dir, store_text
+    from avs_toolkit.payload import PromptPayload
+
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "VS-RUN-assembled.yaml"
+    ref = store_text(blob_dir(path), "Very large context")
+    story = {**BRIEFCASE, "context_manifest": [{"key": "big", "content": None, "content_ref": ref}]}
+    path.write_text(yaml.dump(story))
+
+    provider = FakeProvider(["Done."])
+    provider.generate = mocker.AsyncMock(return_value="Done.")
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=provider)
+
+    await run_story(str(path))
+
+    user_payload = provider.generate.call_args.args[1]
+    assert isinstance(user_payload, PromptPayload)
+    assert "--- START big ---\nVery large context\n--- END ---" in str(user_payload)
+
+@pytest.mark.asyncio
+async def test_run_story_packs_context_before_sending(tmp_path, monkeypatch, mocker):
+    """Assets over the window are trimmed or dropped, and Ollama's num_ctx matches the pack."""
+    monkeypatch.chdir(tmp_path)
+    story = {**BRIEFCASE, "context_manifest": [
+        {"key": "keep", "content": "Important", "priority": 1},
+        {"key": "huge", "content": "y" * 100_000, "truncation": "drop"},
+    ]}
+    provider = FakeProvider(["Done."])
+    provider.generate = mocker.AsyncMock(return_value="Done.")
+    ollama = mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=provider)
+
+    await run_story(str(tmp_path / "VS-RUN-assembled.yaml"), story=story)
+
+    user_payload = provider.generate.call_args.args[1]
+    assert "Important" in user_payload
+    assert "--- START huge ---" not in user_payload
+    assert ollama.call_args.kwargs["num_ctx"] == 4096  # ~100 prompt + 2048 reserve, in 2K steps
+
+class RecordingProvider:
+    """Answers map calls with the part number it saw and records every call."""
+    def __init__(self):
+        self.calls = []
+
+    async def generate(self, system_prompt, user_payload, model):
+        text = str(user_payload)
+        self.calls.append(text)
+        if "PARTIAL RESULTS" in text:
+            return "Final product"
+        return "Findings from " + text.splitlines()[0]
+
+@pytest.mark.asyncio
+async def test_run_story_map_reduce_over_oversized_context(tmp_path, monkeypatch, mocker):
+    """Context over the window is mapped chunk by chunk, then reduced by one final call."""
+    monkeypatch.chdir(tmp_path)
+    story = {**BRIEFCASE, "context_manifest": [
+        {"key": f"doc{i}", "content": f"Document {i} " + "z" * 7000} for i in range(4)
+    ]}
+    provider = RecordingProvider()
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=provider)
+
+    product = await run_story(
+        str(tmp_path / "VS-RUN-assembled.yaml"), story=story, context_window=4096, map_reduce=True, fan_out=2
+    )
+
+    maps, final = provider.calls[:-1], provider.calls[-1]
+    assert len(maps) >= 4
+    assert all("Do not write the final product yet" in call for call in maps)
+    assert sum(call.count("Document ") for call in maps) == 4
+    assert "Findings from CONTEXT ASSETS (part 1 of" in final
+    assert product.read_text() == "Final product"
+
+@pytest.mark.asyncio
+async def test_map_reduce_skipped_when_context_fits(briefcase, tmp_path, mocker):
+    provider = RecordingProvider()
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=provider)
+
+    await run_story(str(briefcase), map_reduce=True)
+
+    assert len(provider.calls) == 1
+    assert provider.calls[0].startswith("CONTEXT ASSETS:\n")
+
+@pytest.mark.asyncio
+async def test_run_story_response_cache_replays_unchanged_runs(briefcase, mocker):
+    """With response_cache=True a second identical run never reaches the provider."""
+    provider = FakeProvider(["Done."])
+    provider.generate = mocker.AsyncMock(return_value="Done.")
+    provider.generation_config = lambda: {}
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=provider)
+
+    first = await run_story(str(briefcase), response_cache=True)
+    second = await run_story(str(briefcase), response_cache=True)
+
+    assert first == second
+    assert provider.generate.call_count == 1
+
+@pytest.mark.asyncio
+async def test_run_story_falls_back_when_the_primary_fails(tmp_path, monkeypatch, mocker):
+    """metadata.fallback_providers takes over from a failing primary; fallbacks too small for the prompt are skipped."""
+    monkeypatch.chdir(tmp_path)
+    story = {
+        **BRIEFCASE,
+        "metadata": {**BRIEFCASE["metadata"], "fallback_providers": ["ollama:phi3", "google-gemini"]},
+        "context_manifest": [{"key": "notes", "content": "x" * 20_000}],
+    }
+    ollama = FakeProvider([])
+    mocker.patch("avs_toolkit.runner.OllamaProvider", return_value=ollama)
+    gemini = FakeProvider(["From Gemini"])
+    gemini.generate = mocker.AsyncMock(return_value="From Gemini")
+    mocker.patch("avs_toolkit.runner.GeminiProvider", return_value=gemini)
+
+    saved = await run_story(str(tmp_path / "VS-RUN-assembled.yaml"), model="llama3.1", story=story)
+
+    assert saved.read_text() == "From Gemini"
+    assert gemini.generate.call_args.args[2] == "gemini-2.5-flash"
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+from typer.testing import CliRunner
+from avs_toolkit.main import app
+from avs_toolkit.tracing import NULL_SPAN, Tracer, current_span, otlp_trace, print_profile, span, tracer
+
+runner = CliRunner()
+
+@pytest.fixture
+def tracing():
+    tracer.start()
+    yield tracer
+    tracer.stop()
+
+def test_spans_are_free_when_tracing_is_off():
+    with span("stage", key="x") as s:
+        assert s is NULL_SPAN
+        assert current_span() is NULL_SPAN
+    assert tracer.spans == []
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_concurrent_tasks(tracing):
+    async def item(key):
+        with span("context.item", key=key) as s:
+            await asyncio.sleep(0.01)
+            current_span().set(bytes_received=len(key))
+            s.add("chunks", 1)
+
+    with span("assemble") as root:
+        await asyncio.gather(item("a"), item("bb"))
+
+    children = [s for s in tracing.spans if s.name == "context.item"]
+    assert {s.parent_id for s in children} == {root.span_id}
+    assert sorted(s.attributes["bytes_received"] for s in children) == [1, 2]
+    assert all(s.end_ns >= s.start_ns for s in tracing.spans)
+
+def test_errors_are_recorded_and_reraised(tracing):
+    with pytest.raises(ValueError):
+        with span("story.parse"):
+            raise ValueError("bad yaml")
+    assert tracing.spans[0].error == "ValueError: bad yaml"
+
+def test_otlp_export_shape():
+    local = Tracer()
+    local.start()
+    with local.span("avs run"):
+        with local.span("llm.generate", model="llama3", input_tokens=12):
+            pass
+    root, child = local.stop()
+
+    exported = otlp_trace([root, child])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(exported[0]["traceId"]) == 32 and len(exported[0]["spanId"]) == 16
+    assert "parentSpanId" not in exported[0]
+    assert exported[1]["parentSpanId"] == root.span_id
+    assert {"key": "input_tokens", "value": {"intValue": "12"}} in exported[1]["attributes"]
+    assert exported[1]["status"] == {"code": 1}
+    print_profile([root, child])
+
+def test_run_writes_trace_and_profile(tmp_path, mocker, monkeypatch):
+    """`run --trace --profile` records every stage, including token counts reported by the provider."""
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("avs_toolkit.main.dispatch_research", return_value="Mocked Research")
+    response = mocker.MagicMock(status_code=200, content=b"{}")
+    response.json.return_value = {"response": "The product.", "prompt_eval_count": 321, "eval_count": 45}
+    mocker.patch("httpx.AsyncClient.post", return_value=response)
+    story_file = tmp_path / "VS-TRC.md"
+    story_file.write_text("""
+metadata:
+  story_id: "VS-TRC"
+goal:
+  as_a: "As a Builder"
+  i_want: "To see where a run spends its time"
+  so_that: "It can be made faster."
+instructions:
+  execution_steps:
+    - step_number: 1
+      action: "Write the product now"
+      validation_rule: "Written"
+context_manifest:
+  - key: "research"
+    search_query: "Test"
+product:
+  output_path: "out"
+""")
+    trace_file = tmp_path / "trace.json"
+
+    result = runner.invoke(app, ["run", str(story_file), "--trace", str(trace_file), "--trace-format", "otlp", "--profile"])
+
+    assert result.exit_code == 0, result.stdout
+    assert "Run profile" in result.stdout
+    spans = json.loads(trace_file.read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    names = [s["name"] for s in spans]
+    for stage in ("avs run", "story.load", "story.parse", "assemble", "context.item", "briefcase.save", "run.pack", "llm.generate"):
+        assert stage in names
+    generate = next(s for s in spans if s["name"] == "llm.generate")
+    assert {"key": "output_tokens", "value": {"intValue": "45"}} in generate["attributes"]
+    assert not tracer.enabled
@@ -0,0 +1,88 @@
+import pytest
+import yaml
+from pathlib import Path
+from avs_toolkit.value_stream import build_graph, run_stream
+
+STORY = """
+metadata:
+  story_id: "{story_id}"
+goal:
+  as_a: "As a Builder"
+  i_want: "To chain stories into a value stream"
+  so_that: "Products become context."
+instructions:
+  execution_steps:
+    - step: 1
+      action: "Produce the deliverable {note}"
+      rule: "Done successfully"
+context_manifest:
+{context}
+product:
+  output_path: "{output}"
+"""
+
+def write_story(directory: Path, story_id: str, context: str, output: str, note: str = ""):
+    path = directory / f"{story_id}.md"
+    path.write_text(STORY.format(story_id=story_id, context=context, output=output, note=note))
+    return path
+
+@pytest.fixture
+def stream_file(tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("avs_toolkit.main.dispatch_research", return_value="Mocked Research")
+    write_story(tmp_path, "VS-A", '  - key: "news"\n    search_query: "News"', "products/research.md")
+    write_story(tmp_path, "VS-B", '  - key: "research"\n    default_path: "products/research.md"', "products/draft.md")
+    write_story(tmp_path, "VS-C", '  - key: "news"\n    search_query: "Other"', "products/other.md")
+    path = tmp_path / "stream.yaml"
+    path.write_text(yaml.dump({"name": "demo", "stories": ["VS-A.md", "VS-B.md", {"path": "VS-C.md", "model": "gemma2"}]}))
+    return path
+
+@pytest.fixture
+def fake_run(mocker):
+    """Writes a product derived from the briefcase, recording the run order."""
+    order = []
+
+    async def run_story(briefcase, model, story):
+        order.append(story["metadata"]["story_id"])
+        target = Path(story["product"]["output_path"])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"{story['metadata']['story_id']}: {story['instructions']['execution_steps'][0]['action']}")
+        return target
+
+    mocker.patch("avs_toolkit.value_stream.run_story", side_effect=run_story)
+    return order
+
+@pytest.mark.asyncio
+async def test_graph_links_products_to_context(stream_file):
+    nodes = await build_graph(stream_file)
+    deps = {node.story.metadata.story_id: {nodes[d].story.metadata.story_id for d in node.depends_on} for node in nodes.values()}
+    assert deps == {"VS-A": set(), "VS-B": {"VS-A"}, "VS-C": set()}
+
+@pytest.mark.asyncio
+async def test_stream_runs_downstream_after_upstream_and_skips_unchanged(stream_file, tmp_path, fake_run):
+    nodes = await run_stream(stream_file)
+    assert {n.story.metadata.story_id: n.status for n in nodes.values()} == {"VS-A": "ok", "VS-B": "ok", "VS-C": "ok"}
+    assert fake_run.index("VS-A") < fake_run.index("VS-B")
+
+    # Unchanged stories and inputs: nothing runs again
+    fake_run.clear()
+    nodes = await run_stream(stream_file)
+    assert fake_run == []
+    assert all(n.status == "skipped" for n in nodes.values())
+
+    # Editing the upstream story changes its product, so the downstream story re-runs too
+    write_story(tmp_path, "VS-A", '  - key: "news"\n    search_query: "News"', "products/research.md", note="v2")
+    fake_run.clear()
+    await run_stream(stream_file)
+    assert fake_run == ["VS-A", "VS-B"]
+
+@pytest.mark.asyncio
+async def test_stream_rejects_cycles(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_story(tmp_path, "VS-X", '  - key: "y"\n    default_path: "y.md"', "x.md")
+    write_story(tmp_path, "VS-Y", '  - key: "x"\n    default_path: "x.md"', "y.md")
+    stream = tmp_path / "cycle.yaml"
+    stream.write_text(yaml.dump({"stories": ["VS-X.md", "VS-Y.md"]}))
+
+    with pytest.raises(ValueError, match="handoff cycle"):
+        await build_graph(stream)